@@ -28,8 +28,20 @@ author: Justin Menga (@jmenga)
 options:
     stack_name:
         description:
-          - The name or id of the CloudFormation stack
-        required: true
+          - The name or id of the CloudFormation stack. One of C(stack_name), C(stack_names) or C(stack_prefix)
+            is required.
+        required: false
+    stack_names:
+        description:
+          - A list of names or ids of CloudFormation stacks to get facts about.
+        required: false
+        version_added: "2.3"
+    stack_prefix:
+        description:
+          - Get facts about every stack whose name starts with this prefix, for example a parent stack and all the
+            stacks nested in it.
+        required: false
+        version_added: "2.3"
     all_facts:
         description:
             - Get all stack information for the stack
@@ -55,6 +67,28 @@ options:
             - Get stack policy for the stack
         required: false
         default: false
+    max_events:
+        description:
+            - Return at most this many of the most recent stack events. Older events are not fetched at all.
+        required: false
+        default: null
+        version_added: "2.3"
+    since:
+        description:
+            - Only return stack events at or after this time, for example C(2016-11-30T12:00:00Z). Older events
+              are not fetched at all.
+            - Either an ISO 8601 time or a number of seconds since the epoch. A time without a UTC offset is
+              taken as UTC.
+        required: false
+        default: null
+        version_added: "2.3"
+    max_workers:
+        description:
+            - Number of API calls to run at the same time. Stack descriptions and the stack events, template,
+              resources and policy of each stack are fetched concurrently over a single connection.
+        required: false
+        default: 8
+        version_added: "2.3"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -81,6 +115,12 @@ EXAMPLES = '''
     stack_resources: true
     stack_policy: true
 
+# Get the outputs and the last 20 events of a stack and all the stacks nested in it
+- cloudformation_facts:
+    stack_prefix: my-cloudformation-stack
+    stack_events: true
+    max_events: 20
+
 # Example dictionary outputs for stack_outputs, stack_parameters and stack_resources:
 "stack_outputs": {
     "ApplicationDatabaseName": "dazvlpr01xj55a.ap-southeast-2.rds.amazonaws.com",
@@ -145,7 +185,10 @@ except ImportError:
 from ansible.module_utils.ec2 import get_aws_connection_info, ec2_argument_spec
 from ansible.module_utils.basic import AnsibleModule
 from functools import partial
+import datetime
 import json
+import re
+import threading
 import traceback
 
 class CloudFormationServiceManager:
@@ -164,61 +207,118 @@ class CloudFormationServiceManager:
         except Exception as e:
             self.module.fail_json(msg="Can't establish connection - " + str(e), exception=traceback.format_exc(e))
 
+    # The fetch methods below may run in worker threads, so they raise
+    # instead of calling fail_json; see FETCHES for their error messages.
+
     def describe_stack(self, stack_name):
-        try:
-            func = partial(self.client.describe_stacks,StackName=stack_name)
-            response = self.paginated_response(func, 'Stacks')
-            if response:
-                return response[0]
-            self.module.fail_json(msg="Error describing stack - an empty response was returned")
-        except Exception as e:
-            self.module.fail_json(msg="Error describing stack - " + str(e), exception=traceback.format_exc(e))
+        func = partial(self.client.describe_stacks,StackName=stack_name)
+        response = self.paginated_response(func, 'Stacks')
+        if response:
+            return response[0]
+        raise Exception("an empty response was returned")
+
+    def describe_stacks_with_prefix(self, prefix):
+        stacks = []
+        for stack in self.iterate_pages(self.client.describe_stacks, 'Stacks'):
+            if stack['StackName'].startswith(prefix):
+                stacks.append(stack)
+        return stacks
 
     def list_stack_resources(self, stack_name):
-        try:
-            func = partial(self.client.list_stack_resources,StackName=stack_name)
-            return self.paginated_response(func, 'StackResourceSummaries')
-        except Exception as e:
-            self.module.fail_json(msg="Error listing stack resources - " + str(e), exception=traceback.format_exc(e))
+        func = partial(self.client.list_stack_resources,StackName=stack_name)
+        return self.paginated_response(func, 'StackResourceSummaries')
 
-    def describe_stack_events(self, stack_name):
-        try:
-            func = partial(self.client.describe_stack_events,StackName=stack_name)
-            return self.paginated_response(func, 'StackEvents')
-        except Exception as e:
-            self.module.fail_json(msg="Error describing stack events - " + str(e), exception=traceback.format_exc(e))
+    def describe_stack_events(self, stack_name, max_events=None, since=None):
+        '''
+        Returns the stack events, most recent first. Paginating stops as soon as
+        max_events events were returned or an event older than since is reached.
+        '''
+        events = []
+        func = partial(self.client.describe_stack_events,StackName=stack_name)
+        for event in self.iterate_pages(func, 'StackEvents'):
+            if since is not None and event['Timestamp'] < since:
+                break
+            events.append(event)
+            if max_events is not None and len(events) >= max_events:
+                break
+        return events
 
     def get_stack_policy(self, stack_name):
-        try:
-            response = self.client.get_stack_policy(StackName=stack_name)
-            stack_policy = response.get('StackPolicyBody')
-            if stack_policy:
-                return json.loads(stack_policy)
-            return dict()
-        except Exception as e:
-            self.module.fail_json(msg="Error getting stack policy - " + str(e), exception=traceback.format_exc(e))
+        response = self.client.get_stack_policy(StackName=stack_name)
+        stack_policy = response.get('StackPolicyBody')
+        if stack_policy:
+            return json.loads(stack_policy)
+        return dict()
 
     def get_template(self, stack_name):
-        try:
-            response = self.client.get_template(StackName=stack_name)
-            return response.get('TemplateBody')
-        except Exception as e:
-            self.module.fail_json(msg="Error getting stack template - " + str(e), exception=traceback.format_exc(e))
+        response = self.client.get_template(StackName=stack_name)
+        return response.get('TemplateBody')
+
+    def iterate_pages(self, func, result_key):
+        '''
+        Yields the items of a paginated operation, fetching a page only once the
+        items of the previous one have been consumed.
+        '''
+        args = dict()
+        while True:
+            response = func(**args)
+            for item in response.get(result_key) or []:
+                yield item
+            next_token = response.get('NextToken')
+            if not next_token:
+                return
+            args['NextToken'] = next_token
 
     def paginated_response(self, func, result_key, next_token=None):
         '''
         Returns expanded response for paginated operations.
         The 'result_key' is used to define the concatenated results that are combined from each paginated response.
         '''
-        args=dict()
-        if next_token:
-            args['NextToken'] = next_token
-        response = func(**args)
-        result = response.get(result_key)
-        next_token = response.get('NextToken')
-        if not next_token:
-           return result
-        return result + self.paginated_response(func, result_key, next_token)
+        return list(self.iterate_pages(func, result_key))
+
+    def run_fetches(self, fetches, max_workers):
+        '''
+        Runs (key, function, error message) fetches with up to max_workers at a time.
+        Returns a dictionary of key to result; the first failure fails the module.
+        '''
+        pending = list(fetches)
+        results = dict()
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            while not errors:
+                with lock:
+                    if not pending:
+                        return
+                    key, func, error_msg = pending.pop(0)
+                try:
+                    results[key] = func()
+                except Exception as e:
+                    errors.append((error_msg + " - " + str(e), traceback.format_exc()))
+
+        threads = []
+        for i in range(max(1, min(max_workers, len(pending)))):
+            t = threading.Thread(target=worker)
+            t.daemon = True
+            t.start()
+            threads.append(t)
+        for t in threads:
+            t.join()
+
+        if errors:
+            self.module.fail_json(msg=errors[0][0], exception=errors[0][1])
+        return results
+
+
+# Optional facts: option, manager method and error message
+FETCHES = [
+    ('stack_resources', 'list_stack_resources', "Error listing stack resources"),
+    ('stack_template', 'get_template', "Error getting stack template"),
+    ('stack_policy', 'get_stack_policy', "Error getting stack policy"),
+    ('stack_events', 'describe_stack_events', "Error describing stack events"),
+]
+
 
 def to_dict(items, key, value):
     ''' Transforms a list of items to a Key/Value dictionary '''
@@ -227,52 +327,145 @@ def to_dict(items, key, value):
     else:
         return dict()
 
+
+def stack_description_facts(description):
+    facts = dict()
+    # Create stack output and stack parameter dictionaries
+    if description:
+        facts['stack_outputs'] = to_dict(description.get('Outputs'), 'OutputKey', 'OutputValue')
+        facts['stack_parameters'] = to_dict(description.get('Parameters'), 'ParameterKey', 'ParameterValue')
+
+    # normalize stack description API output
+    facts['stack_description'] = camel_dict_to_snake_dict(description)
+    # camel2snake doesn't handle NotificationARNs properly, so let's fix that
+    facts['stack_description']['notification_arns'] = facts['stack_description'].pop('notification_ar_ns', [])
+    return facts
+
+
+class FixedOffset(datetime.tzinfo):
+    """ A fixed offset from UTC, in minutes """
+
+    def __init__(self, minutes):
+        self.offset = datetime.timedelta(minutes=minutes)
+
+    def utcoffset(self, dt):
+        return self.offset
+
+    def dst(self, dt):
+        return datetime.timedelta(0)
+
+    def tzname(self, dt):
+        return None
+
+
+SINCE_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})(?:[T ](\d{2}:\d{2}(?::\d{2})?)(\.\d+)?)?'
+                      r'\s*(Z|[+-]\d{2}:?\d{2})?$')
+
+
+def parse_since(value):
+    '''
+    Parses value, an ISO 8601 time or seconds since the epoch, as a timezone
+    aware datetime comparable with the event timestamps boto3 returns, times
+    without an offset are taken as UTC.
+    '''
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        return datetime.datetime(1970, 1, 1, tzinfo=FixedOffset(0)) + datetime.timedelta(seconds=seconds)
+
+    match = SINCE_RE.match(value)
+    if not match:
+        raise ValueError("%s is not an ISO 8601 time" % value)
+    date, clock, fraction, offset = match.groups()
+    clock = clock or '00:00:00'
+    if clock.count(':') == 1:
+        clock += ':00'
+    since = datetime.datetime.strptime('%s %s' % (date, clock), '%Y-%m-%d %H:%M:%S')
+    if fraction:
+        since = since.replace(microsecond=int(fraction[1:7].ljust(6, '0')))
+    minutes = 0
+    if offset and offset != 'Z':
+        digits = offset[1:].replace(':', '')
+        minutes = int(digits[:2]) * 60 + int(digits[2:])
+        if offset[0] == '-':
+            minutes = -minutes
+    return since.replace(tzinfo=FixedOffset(minutes))
+
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(dict(
-        stack_name=dict(required=True, type='str' ),
+        stack_name=dict(required=False, type='str' ),
+        stack_names=dict(required=False, type='list' ),
+        stack_prefix=dict(required=False, type='str' ),
         all_facts=dict(required=False, default=False, type='bool'),
         stack_policy=dict(required=False, default=False, type='bool'),
         stack_events=dict(required=False, default=False, type='bool'),
         stack_resources=dict(required=False, default=False, type='bool'),
         stack_template=dict(required=False, default=False, type='bool'),
+        max_events=dict(required=False, type='int'),
+        since=dict(required=False, type='str'),
+        max_workers=dict(required=False, default=8, type='int'),
     ))
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False,
+                           required_one_of=[['stack_name', 'stack_names', 'stack_prefix']],
+                           mutually_exclusive=[['stack_name', 'stack_names', 'stack_prefix']])
 
     if not HAS_BOTO3:
       module.fail_json(msg='boto3 is required.')
 
-    # Describe the stack
+    since = module.params.get('since')
+    if since:
+        try:
+            since = parse_since(since)
+        except ValueError as e:
+            module.fail_json(msg="Unable to parse since - " + str(e))
+    max_workers = module.params.get('max_workers')
+
+    # Describe the stacks
     service_mgr = CloudFormationServiceManager(module)
-    stack_name = module.params.get('stack_name')
+    if module.params.get('stack_prefix'):
+        try:
+            descriptions = service_mgr.describe_stacks_with_prefix(module.params.get('stack_prefix'))
+        except Exception as e:
+            module.fail_json(msg="Error describing stacks - " + str(e), exception=traceback.format_exc(e))
+        descriptions = dict((stack['StackName'], stack) for stack in descriptions)
+        stack_names = sorted(descriptions)
+    else:
+        stack_names = module.params.get('stack_names') or [module.params.get('stack_name')]
+        descriptions = service_mgr.run_fetches(
+            [(stack_name, partial(service_mgr.describe_stack, stack_name), "Error describing stack")
+             for stack_name in stack_names], max_workers)
+
     result = {
-        'ansible_facts': { 'cloudformation': { stack_name:{} } }
+        'ansible_facts': { 'cloudformation': dict() }
     }
-    facts = result['ansible_facts']['cloudformation'][stack_name]
-    facts['stack_description'] = service_mgr.describe_stack(stack_name)
-
-    # Create stack output and stack parameter dictionaries
-    if facts['stack_description']:
-        facts['stack_outputs'] = to_dict(facts['stack_description'].get('Outputs'), 'OutputKey', 'OutputValue')
-        facts['stack_parameters'] = to_dict(facts['stack_description'].get('Parameters'), 'ParameterKey', 'ParameterValue')
-
-    # normalize stack description API output
-    facts['stack_description'] = camel_dict_to_snake_dict(facts['stack_description'])
-    # camel2snake doesn't handle NotificationARNs properly, so let's fix that
-    facts['stack_description']['notification_arns'] = facts['stack_description'].pop('notification_ar_ns', [])
+    for stack_name in stack_names:
+        result['ansible_facts']['cloudformation'][stack_name] = stack_description_facts(descriptions[stack_name])
 
     # Create optional stack outputs
     all_facts = module.params.get('all_facts')
-    if all_facts or module.params.get('stack_resources'):
-        facts['stack_resource_list'] = service_mgr.list_stack_resources(stack_name)
-        facts['stack_resources'] = to_dict(facts.get('stack_resource_list'), 'LogicalResourceId', 'PhysicalResourceId')
-    if all_facts or module.params.get('stack_template'):
-        facts['stack_template'] = service_mgr.get_template(stack_name)
-    if all_facts or module.params.get('stack_policy'):
-        facts['stack_policy'] = service_mgr.get_stack_policy(stack_name)
-    if all_facts or module.params.get('stack_events'):
-        facts['stack_events'] = service_mgr.describe_stack_events(stack_name)
+    fetches = []
+    for stack_name in stack_names:
+        for option, method, error_msg in FETCHES:
+            if all_facts or module.params.get(option):
+                func = partial(getattr(service_mgr, method), stack_name)
+                if option == 'stack_events':
+                    func = partial(func, max_events=module.params.get('max_events'), since=since)
+                fetches.append(((stack_name, option), func, error_msg))
+    fetched = service_mgr.run_fetches(fetches, max_workers)
+
+    for (stack_name, option), value in fetched.items():
+        facts = result['ansible_facts']['cloudformation'][stack_name]
+        if option == 'stack_resources':
+            facts['stack_resource_list'] = value
+            facts['stack_resources'] = to_dict(value, 'LogicalResourceId', 'PhysicalResourceId')
+        else:
+            facts[option] = value
 
     result['changed'] = False
     module.exit_json(**result)
@@ -32,6 +32,12 @@ options:
     description:
       - "A dictionary/hash of tags in the format { tag1_name: 'tag1_value', tag2_name: 'tag2_value' } to match against the auto scaling group(s) you are searching for."
     required: false
+  fields:
+    description:
+      - "List of keys to return for each group, for example C(auto_scaling_group_name) and C(desired_capacity).
+        Leaving C(instances) out saves listing every instance of every group. By default all keys are returned."
+    required: false
+    version_added: "2.3"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -56,6 +62,17 @@ EXAMPLES = '''
       env: production
   register: asgs
 
+# Find the capacity of the production groups, without their instances
+- ec2_asg_facts:
+    tags:
+      env: production
+    fields:
+      - auto_scaling_group_name
+      - desired_capacity
+      - min_size
+      - max_size
+  register: asgs
+
 # Find a group with matching name/prefix and tags
 - ec2_asg_facts:
     name: myproject
@@ -194,6 +211,8 @@ termination_policies:
     sample: ["Default"]
 '''
 
+import re
+
 try:
     import boto3
     from botocore.exceptions import ClientError
@@ -202,19 +221,73 @@ except ImportError:
     HAS_BOTO3 = False
 
 def match_asg_tags(tags_to_match, asg):
-    for key, value in tags_to_match.iteritems():
+    for key, value in tags_to_match.items():
         for tag in asg['Tags']:
             if key == tag['Key'] and value == tag['Value']:
                 break
         else: return False
     return True
 
-def find_asgs(conn, module, name=None, tags=None):
+# DescribeAutoScalingGroups accepts this many names per call
+NAMES_PER_CALL = 50
+
+FIRST_CAP_RE = re.compile('(.)([A-Z][a-z]+)')
+ALL_CAP_RE = re.compile('([a-z0-9])([A-Z])')
+
+
+def snake_case(name):
+    """ Key name as camel_dict_to_snake_dict converts it """
+    return ALL_CAP_RE.sub(r'\1_\2', FIRST_CAP_RE.sub(r'\1_\2', name)).lower()
+
+
+def project_asg(asg, fields):
+    """ Convert an ASG record, keeping only the requested keys """
+    if fields:
+        asg = dict((key, value) for key, value in asg.items() if snake_case(key) in fields)
+    return camel_dict_to_snake_dict(asg)
+
+
+def names_with_tags(conn, tags):
+    """ Names of the groups carrying all the given tags, looked up with describe_tags filters """
+    names = None
+    paginator = conn.get_paginator('describe_tags')
+    for key, value in tags.items():
+        filters = [{'Name': 'key', 'Values': [key]}, {'Name': 'value', 'Values': [str(value)]}]
+        tagged = set()
+        for page in paginator.paginate(Filters=filters):
+            for tag in page['Tags']:
+                if tag['ResourceType'] == 'auto-scaling-group':
+                    tagged.add(tag['ResourceId'])
+        if names is None:
+            names = tagged
+        else:
+            names &= tagged
+        if not names:
+            break
+    return sorted(names)
+
+
+def describe_asgs(conn, names=None):
+    """ Iterate over the groups, all of them or the named ones, page by page """
+    paginator = conn.get_paginator('describe_auto_scaling_groups')
+    if names is None:
+        for page in paginator.paginate():
+            for asg in page['AutoScalingGroups']:
+                yield asg
+        return
+    for i in range(0, len(names), NAMES_PER_CALL):
+        for page in paginator.paginate(AutoScalingGroupNames=names[i:i + NAMES_PER_CALL]):
+            for asg in page['AutoScalingGroups']:
+                yield asg
+
+
+def find_asgs(conn, module, name=None, tags=None, fields=None):
     """
     Args:
         conn (boto3.AutoScaling.Client): Valid Boto3 ASG client.
         name (str): Optional name of the ASG you are looking for.
         tags (dict): Optional dictionary of tags and values to search for.
+        fields (list): Optional list of keys to return for each group.
 
     Basic Usage:
         >>> name = 'public-webapp-production'
@@ -293,30 +366,35 @@ def find_asgs(conn, module, name=None, tags=None):
         ]
     """
 
-    try:
-        asgs = conn.describe_auto_scaling_groups()
-    except ClientError as e:
-        module.fail_json(msg=e.message, **camel_dict_to_snake_dict(e.response))
-
     matched_asgs = []
 
     if name is not None:
         # if the user didn't specify a name
         name_prog = re.compile(r'^' + name)
 
-    for asg in asgs['AutoScalingGroups']:
-        if name:
-            matched_name = name_prog.search(asg['AutoScalingGroupName'])
-        else:
-            matched_name = True
-
+    try:
+        # Let AWS pick the tagged groups rather than describing all of them
+        names = None
         if tags:
-            matched_tags = match_asg_tags(tags, asg)
-        else:
-            matched_tags = True
+            names = names_with_tags(conn, tags)
+            if not names:
+                return matched_asgs
 
-        if matched_name and matched_tags:
-            matched_asgs.append(camel_dict_to_snake_dict(asg))
+        for asg in describe_asgs(conn, names):
+            if name:
+                matched_name = name_prog.search(asg['AutoScalingGroupName'])
+            else:
+                matched_name = True
+
+            if tags:
+                matched_tags = match_asg_tags(tags, asg)
+            else:
+                matched_tags = True
+
+            if matched_name and matched_tags:
+                matched_asgs.append(project_asg(asg, fields))
+    except ClientError as e:
+        module.fail_json(msg=e.message, **camel_dict_to_snake_dict(e.response))
 
     return matched_asgs
 
@@ -328,6 +406,7 @@ def main():
         dict(
             name=dict(type='str'),
             tags=dict(type='dict'),
+            fields=dict(type='list'),
         )
     )
     module = AnsibleModule(argument_spec=argument_spec)
@@ -344,7 +423,7 @@ def main():
     except ClientError as e:
         module.fail_json(msg=e.message, **camel_dict_to_snake_dict(e.response))
 
-    results = find_asgs(autoscaling, module, name=asg_name, tags=asg_tags)
+    results = find_asgs(autoscaling, module, name=asg_name, tags=asg_tags, fields=module.params.get('fields'))
     module.exit_json(results=results)
 
 # import module snippets
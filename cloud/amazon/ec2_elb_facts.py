@@ -30,6 +30,12 @@ options:
     required: false
     default: null
     aliases: ['elb_ids', 'ec2_elbs']
+  max_workers:
+    description:
+      - Number of ELBs whose instance health is looked up at the same time.
+    required: false
+    default: 10
+    version_added: "2.3"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -74,14 +80,67 @@ EXAMPLES = '''
 
 '''
 
+import threading
+
 try:
     import boto.ec2.elb
-    from boto.ec2.tag import Tag
     from boto.exception import BotoServerError
     HAS_BOTO = True
 except ImportError:
     HAS_BOTO = False
 
+# DescribeLoadBalancers and DescribeTags accept at most 20 names per call
+NAMES_PER_CALL = 20
+
+
+def chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class ElbTagSet(dict):
+    """ The Tags of a DescribeTags member, handles its own nested members """
+
+    def __init__(self, connection=None):
+        dict.__init__(self)
+        self._key = None
+        self._value = None
+
+    def startElement(self, name, attrs, connection):
+        return None
+
+    def endElement(self, name, value, connection):
+        if name == 'Key':
+            self._key = value
+        elif name == 'Value':
+            self._value = value
+        elif name == 'member':
+            # Value may come before Key, so store the pair once both are read
+            self[self._key] = self._value or ''
+            self._key = None
+            self._value = None
+
+
+class ElbTagDescription(object):
+    """ One member of a DescribeTags response """
+
+    def __init__(self, connection=None):
+        self.load_balancer_name = None
+        self.tags = ElbTagSet()
+
+    def startElement(self, name, attrs, connection):
+        if name == 'Tags':
+            # Pushing a node for Tags keeps the close of its nested members
+            # from popping this one off the parser stack
+            self.tags = ElbTagSet(connection)
+            return self.tags
+        return None
+
+    def endElement(self, name, value, connection):
+        if name == 'LoadBalancerName':
+            self.load_balancer_name = value
+
+
 class ElbInformation(object):
     """ Handles ELB information """
 
@@ -89,21 +148,29 @@ class ElbInformation(object):
                  module,
                  names,
                  region,
+                 max_workers=10,
                  **aws_connect_params):
 
         self.module = module
         self.names = names
         self.region = region
+        self.max_workers = max_workers
         self.aws_connect_params = aws_connect_params
         self.connection = self._get_elb_connection()
 
-    def _get_tags(self, elbname):
-        params = {'LoadBalancerNames.member.1': elbname}
-        try:
-            elb_tags = self.connection.get_list('DescribeTags', params, [('member', Tag)])
-            return dict((tag.Key, tag.Value) for tag in elb_tags if hasattr(tag, 'Key'))
-        except:
-            return {}
+    def _get_tags(self, elbnames):
+        tags = {}
+        for chunk in chunks(elbnames, NAMES_PER_CALL):
+            params = {}
+            for i, name in enumerate(chunk):
+                params['LoadBalancerNames.member.%d' % (i + 1)] = name
+            try:
+                descriptions = self.connection.get_list('DescribeTags', params, [('member', ElbTagDescription)])
+            except BotoServerError:
+                continue
+            for description in descriptions:
+                tags[description.load_balancer_name] = dict(description.tags)
+        return tags
 
     def _get_elb_connection(self):
         try:
@@ -155,7 +222,7 @@ class ElbInformation(object):
             health_check_dict['ping_path'] = path
         return health_check_dict
 
-    def _get_elb_info(self, elb):
+    def _get_elb_info(self, elb, tags, instance_health):
         elb_info = {
             'name': elb.name,
             'zones': elb.availability_zones,
@@ -175,49 +242,111 @@ class ElbInformation(object):
             'instances_outofservice': [],
             'instances_outofservice_count': 0,
             'instances_inservice_percent': 0.0,
-            'tags': self._get_tags(elb.name)
+            'tags': tags.get(elb.name, {})
         }
 
         if elb.vpc_id:
             elb_info['vpc_id'] = elb.vpc_id
 
         if elb.instances:
-            try:
-                instance_health = self.connection.describe_instance_health(elb.name)
-            except BotoServerError as err:
-                self.module.fail_json(msg=err.message)
-            elb_info['instances_inservice'] = [inst.instance_id for inst in instance_health if inst.state == 'InService']
+            health = instance_health[elb.name]
+            elb_info['instances_inservice'] = [inst.instance_id for inst in health if inst.state == 'InService']
             elb_info['instances_inservice_count'] = len(elb_info['instances_inservice'])
-            elb_info['instances_outofservice'] = [inst.instance_id for inst in instance_health if inst.state == 'OutOfService']
+            elb_info['instances_outofservice'] = [inst.instance_id for inst in health if inst.state == 'OutOfService']
             elb_info['instances_outofservice_count'] = len(elb_info['instances_outofservice'])
             elb_info['instances_inservice_percent'] = float(elb_info['instances_inservice_count'])/(
                         float(elb_info['instances_inservice_count']) +
                         float(elb_info['instances_outofservice_count']))*100
         return elb_info
 
+    def _get_instance_health(self, elbs):
+        """ Describe the instance health of several ELBs at once
+
+        Up to max_workers lookups run in parallel, each worker on its own
+        connection as boto connections are not safe to share between threads.
+        The connections are opened here, failures of the lookups are collected
+        per ELB and reported once all workers are done.
+        """
+        pending = [elb.name for elb in elbs if elb.instances]
+        health = {}
+        errors = {}
+        lock = threading.Lock()
+
+        def worker(connection):
+            while True:
+                lock.acquire()
+                try:
+                    if not pending:
+                        return
+                    name = pending.pop()
+                finally:
+                    lock.release()
+                try:
+                    health[name] = connection.describe_instance_health(name)
+                except BotoServerError as err:
+                    errors[name] = err.message
+                except Exception as err:
+                    errors[name] = str(err)
+
+        connections = [self._get_elb_connection() for i in range(min(max(1, self.max_workers), len(pending)))]
+        threads = []
+        for connection in connections:
+            t = threading.Thread(target=worker, args=(connection,))
+            t.daemon = True
+            t.start()
+            threads.append(t)
+        for t in threads:
+            t.join()
+
+        if errors:
+            self.module.fail_json(msg="Failed to describe the instance health of %s: %s" % (
+                ', '.join(sorted(errors)), errors[sorted(errors)[0]]), errors=errors)
+        return health
+
+    def _get_elbs(self):
+        if not self.names:
+            return self.connection.get_all_load_balancers()
+
+        names = []
+        for name in self.names:
+            if name not in names:
+                names.append(name)
+
+        elbs = []
+        for chunk in chunks(names, NAMES_PER_CALL):
+            try:
+                elbs.extend(self.connection.get_all_load_balancers(load_balancer_names=chunk))
+            except BotoServerError as err:
+                if err.error_code != 'LoadBalancerNotFound':
+                    raise
+                # One unknown name fails the whole call, so look the
+                # names of this chunk up one by one and skip the missing ones
+                for name in chunk:
+                    try:
+                        elbs.extend(self.connection.get_all_load_balancers(load_balancer_names=[name]))
+                    except BotoServerError as err:
+                        if err.error_code != 'LoadBalancerNotFound':
+                            raise
+        return elbs
 
     def list_elbs(self):
-        elb_array = []
-
         try:
-            all_elbs = self.connection.get_all_load_balancers()
+            elb_array = self._get_elbs()
         except BotoServerError as err:
             self.module.fail_json(msg = "%s: %s" % (err.error_code, err.error_message))
 
-        if all_elbs:
-            if self.names:
-                for existing_lb in all_elbs:
-                    if existing_lb.name in self.names:
-                        elb_array.append(existing_lb)
-            else:
-                elb_array = all_elbs
-                    
-        return list(map(self._get_elb_info, elb_array))
+        if not elb_array:
+            return []
+
+        tags = self._get_tags([elb.name for elb in elb_array])
+        instance_health = self._get_instance_health(elb_array)
+        return [self._get_elb_info(elb, tags, instance_health) for elb in elb_array]
 
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(dict(
-            names={'default': [], 'type': 'list'}
+            names={'default': [], 'type': 'list'},
+            max_workers={'default': 10, 'type': 'int'},
         )
     )
     module = AnsibleModule(argument_spec=argument_spec)
@@ -234,6 +363,7 @@ def main():
     elb_information = ElbInformation(module,
                               names,
                               region,
+                              module.params['max_workers'],
                               **aws_connect_params)
 
     ec2_facts_result = dict(changed=False,
@@ -47,6 +47,13 @@ options:
       names and values are case sensitive.
     required: false
     default: {}
+  summary:
+    description:
+      - Instead of the snapshots themselves, return per volume the number of snapshots, their total size in GiB and the \
+      start times of the oldest and newest one.
+    required: false
+    default: false
+    version_added: "2.3"
 notes:
   - By default, the module will return all snapshots, including public ones. To limit results to snapshots owned by \
   the account use the filter 'owner-id'.
@@ -92,6 +99,13 @@ EXAMPLES = '''
     filters:
       status: error
 
+# Count the snapshots of each volume owned by the account, without fetching every record
+- ec2_snapshot_facts:
+    owner_ids:
+      - self
+    summary: true
+  register: snapshot_summary
+
 '''
 
 RETURN = '''
@@ -153,6 +167,11 @@ data_encryption_key_id:
     corresponds to the data encryption key that was used to encrypt the original volume or snapshot copy.
     type: string
     sample: "arn:aws:kms:ap-southeast-2:012345678900:key/74c9742a-a1b2-45cb-b3fe-abcdef123456"
+summary:
+    description: With summary, the snapshot count, total size in GiB and oldest and newest start time per volume ID.
+    type: dict
+    sample: "{ 'vol-01234567': { 'count': 2, 'size': 16, 'oldest': '2015-02-12T02:14:02+00:00', \
+    'newest': '2015-03-12T02:14:02+00:00' } }"
 
 '''
 
@@ -169,28 +188,69 @@ from ansible.module_utils.ec2 import (ansible_dict_to_boto3_filter_list,
         ec2_argument_spec, get_aws_connection_info)
 
 
+# Snapshots requested per page; without a page size DescribeSnapshots
+# returns every snapshot in a single response
+PAGE_SIZE = 1000
+
+
+def iterate_snapshots(connection, module):
+    params = dict(SnapshotIds=module.params.get("snapshot_ids"),
+                  OwnerIds=module.params.get("owner_ids"),
+                  RestorableByUserIds=module.params.get("restorable_by_user_ids"),
+                  Filters=ansible_dict_to_boto3_filter_list(module.params.get("filters")))
+    config = {}
+    # Snapshot IDs cannot be combined with a page size
+    if not module.params.get("snapshot_ids"):
+        config['PageSize'] = PAGE_SIZE
+
+    paginator = connection.get_paginator('describe_snapshots')
+    for page in paginator.paginate(PaginationConfig=config, **params):
+        for snapshot in page['Snapshots']:
+            yield snapshot
+
+
+def summarize_snapshots(snapshots):
+    summary = {}
+    for snapshot in snapshots:
+        start_time = snapshot['StartTime']
+        volume = summary.get(snapshot['VolumeId'])
+        if volume is None:
+            summary[snapshot['VolumeId']] = dict(count=1, size=snapshot['VolumeSize'],
+                                                 oldest=start_time, newest=start_time)
+            continue
+        volume['count'] += 1
+        volume['size'] += snapshot['VolumeSize']
+        if start_time < volume['oldest']:
+            volume['oldest'] = start_time
+        if start_time > volume['newest']:
+            volume['newest'] = start_time
+    for volume in summary.values():
+        volume['oldest'] = volume['oldest'].isoformat()
+        volume['newest'] = volume['newest'].isoformat()
+    return summary
+
+
 def list_ec2_snapshots(connection, module):
 
-    snapshot_ids = module.params.get("snapshot_ids")
-    owner_ids = module.params.get("owner_ids")
-    restorable_by_user_ids = module.params.get("restorable_by_user_ids")
-    filters = ansible_dict_to_boto3_filter_list(module.params.get("filters"))
+    if module.params.get("summary"):
+        try:
+            summary = summarize_snapshots(iterate_snapshots(connection, module))
+        except ClientError as e:
+            module.fail_json(msg=e.message)
+        module.exit_json(summary=summary)
 
     try:
-        snapshots = connection.describe_snapshots(SnapshotIds=snapshot_ids, OwnerIds=owner_ids, RestorableByUserIds=restorable_by_user_ids, Filters=filters)
+        # Turn the boto3 result in to ansible_friendly_snaked_names
+        snaked_snapshots = []
+        for snapshot in iterate_snapshots(connection, module):
+            snapshot = camel_dict_to_snake_dict(snapshot)
+            # Turn the boto3 result in to ansible friendly tag dictionary
+            if 'tags' in snapshot:
+                snapshot['tags'] = boto3_tag_list_to_ansible_dict(snapshot['tags'])
+            snaked_snapshots.append(snapshot)
     except ClientError as e:
         module.fail_json(msg=e.message)
 
-    # Turn the boto3 result in to ansible_friendly_snaked_names
-    snaked_snapshots = []
-    for snapshot in snapshots['Snapshots']:
-        snaked_snapshots.append(camel_dict_to_snake_dict(snapshot))
-
-    # Turn the boto3 result in to ansible friendly tag dictionary
-    for snapshot in snaked_snapshots:
-        if 'tags' in snapshot:
-            snapshot['tags'] = boto3_tag_list_to_ansible_dict(snapshot['tags'])
-
     module.exit_json(snapshots=snaked_snapshots)
 
 
@@ -202,7 +262,8 @@ def main():
             snapshot_ids=dict(default=[], type='list'),
             owner_ids=dict(default=[], type='list'),
             restorable_by_user_ids=dict(default=[], type='list'),
-            filters=dict(default={}, type='dict')
+            filters=dict(default={}, type='dict'),
+            summary=dict(default=False, type='bool'),
         )
     )
 
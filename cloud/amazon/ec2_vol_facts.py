@@ -27,6 +27,19 @@ options:
       - A dict of filters to apply. Each dict item consists of a filter key and a filter value. See U(http://docs.aws.amazon.com/AWSEC2/latest/APIReference/API_DescribeVolumes.html) for possible filters.
     required: false
     default: null
+  summary:
+    description:
+      - Instead of the volumes themselves, return per group of volumes (see C(summary_by)) the number of volumes, their total size in GiB and the create times of the oldest and newest one.
+    required: false
+    default: false
+    version_added: "2.3"
+  summary_by:
+    description:
+      - Volume attribute to group volumes by when C(summary) is set. C(instance_id) is empty for volumes that are not attached.
+    required: false
+    default: status
+    choices: ['status', 'type', 'zone', 'snapshot_id', 'instance_id']
+    version_added: "2.3"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -53,6 +66,13 @@ EXAMPLES = '''
     filters:
       attachment.status: attached
 
+# Count and size the volumes of each type that are not attached to anything
+- ec2_vol_facts:
+    filters:
+      status: available
+    summary: true
+    summary_by: type
+
 '''
 
 # TODO: Disabled the RETURN as it was breaking docs building. Someone needs to
@@ -61,6 +81,7 @@ RETURN = '''# '''
 
 try:
     import boto.ec2
+    from boto.ec2.volume import Volume
     from boto.exception import BotoServerError
     HAS_BOTO = True
 except ImportError:
@@ -95,27 +116,68 @@ def get_volume_info(volume):
     
     return volume_info
 
+# Volumes requested per page; without a page size DescribeVolumes
+# returns every volume in a single response
+PAGE_SIZE = 500
+
+
+def iterate_volumes(connection, filters):
+    params = {'MaxResults': PAGE_SIZE}
+    if filters:
+        connection.build_filter_params(params, filters)
+    while True:
+        volumes = connection.get_list('DescribeVolumes', params, [('item', Volume)], verb='POST')
+        for volume in volumes:
+            yield volume
+        if not volumes.next_token:
+            return
+        params['NextToken'] = volumes.next_token
+
+
+def summarize_volumes(volumes, summary_by):
+    summary = {}
+    for volume in volumes:
+        if summary_by == 'instance_id':
+            key = volume.attach_data.instance_id or ''
+        else:
+            key = getattr(volume, summary_by)
+        group = summary.get(key)
+        if group is None:
+            summary[key] = dict(count=1, size=volume.size,
+                                oldest=volume.create_time, newest=volume.create_time)
+            continue
+        group['count'] += 1
+        group['size'] += volume.size
+        if volume.create_time < group['oldest']:
+            group['oldest'] = volume.create_time
+        if volume.create_time > group['newest']:
+            group['newest'] = volume.create_time
+    return summary
+
+
 def list_ec2_volumes(connection, module):
 
     filters = module.params.get("filters")
-    volume_dict_array = []
 
     try:
-        all_volumes = connection.get_all_volumes(filters=filters)
+        if module.params.get("summary"):
+            result = dict(summary=summarize_volumes(iterate_volumes(connection, filters),
+                                                    module.params.get("summary_by")))
+        else:
+            result = dict(volumes=[get_volume_info(volume) for volume in iterate_volumes(connection, filters)])
     except BotoServerError as e:
         module.fail_json(msg=e.message)
 
-    for volume in all_volumes:
-        volume_dict_array.append(get_volume_info(volume))
-
-    module.exit_json(volumes=volume_dict_array)
+    module.exit_json(**result)
 
 
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(
         dict(
-            filters = dict(default=None, type='dict')
+            filters = dict(default=None, type='dict'),
+            summary = dict(default=False, type='bool'),
+            summary_by = dict(default='status', choices=['status', 'type', 'zone', 'snapshot_id', 'instance_id']),
         )
     )
 
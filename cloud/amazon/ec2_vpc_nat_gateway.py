@@ -266,6 +266,10 @@ DRY_RUN_ALLOCATION_UNCONVERTED = {
 
 DRY_RUN_MSGS = 'DryRun Mode:'
 
+# Ceiling of the delay between two status checks; a NAT gateway usually
+# takes a few minutes to become available or to be deleted
+STATUS_POLL_MAX_DELAY = 30
+
 
 def convert_to_lower(data):
     """Convert all uppercase keys in dict with lowercase_
@@ -388,6 +392,33 @@ def get_nat_gateways(client, subnet_id=None, nat_gateway_id=None,
     return gateways_retrieved, err_msg, existing_gateways
 
 
+THROTTLING_CODES = ('Throttling', 'ThrottlingException', 'RequestLimitExceeded')
+
+
+# The jittered exponential backoff of wait_with_backoff in kinesis_stream;
+# see there for the arguments and keep the two in step.
+def wait_with_backoff(check, wait_timeout, max_delay, initial_delay=1):
+    deadline = time.time() + wait_timeout
+    delay = initial_delay
+    result = dict()
+    while True:
+        try:
+            done, abort_msg, result = check()
+            if done:
+                return True, '', result
+            if abort_msg:
+                return False, abort_msg, result
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] not in THROTTLING_CODES:
+                return False, str(e), result
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False, "Wait time out reached, while waiting for results", result
+        time.sleep(min(remaining, random.uniform(delay / 2.0, delay)))
+        delay = min(delay * 2, max_delay)
+
+
 def wait_for_status(client, wait_timeout, nat_gateway_id, status,
                     check_mode=False):
     """Wait for the NAT Gateway to reach a status
@@ -427,50 +458,40 @@ def wait_for_status(client, wait_timeout, nat_gateway_id, status,
     Returns:
         Tuple (bool, str, dict)
     """
-    polling_increment_secs = 5
-    wait_timeout = time.time() + wait_timeout
-    status_achieved = False
-    nat_gateway = dict()
     states = ['pending', 'failed', 'available', 'deleting', 'deleted']
-    err_msg = ""
 
-    while wait_timeout > time.time():
-        try:
-            gws_retrieved, err_msg, nat_gateways = (
-                get_nat_gateways(
-                    client, nat_gateway_id=nat_gateway_id,
-                    states=states, check_mode=check_mode
-                )
+    def check():
+        gws_retrieved, err_msg, nat_gateways = (
+            get_nat_gateways(
+                client, nat_gateway_id=nat_gateway_id,
+                states=states, check_mode=check_mode
             )
-            if gws_retrieved and nat_gateways:
-                nat_gateway = nat_gateways[0]
-                if check_mode:
-                    nat_gateway['state'] = status
+        )
+        if not gws_retrieved or not nat_gateways:
+            # A gateway that was just created may not be visible yet
+            return False, '', dict()
 
-                if nat_gateway.get('state') == status:
-                    status_achieved = True
-                    break
+        nat_gateway = nat_gateways[0]
+        if check_mode:
+            nat_gateway['state'] = status
 
-                elif nat_gateway.get('state') == 'failed':
-                    err_msg = nat_gateway.get('failure_message')
-                    break
+        state = nat_gateway.get('state')
+        if state == status:
+            return True, '', nat_gateway
 
-                elif nat_gateway.get('state') == 'pending':
-                    if 'failure_message' in nat_gateway:
-                        err_msg = nat_gateway.get('failure_message')
-                        status_achieved = False
-                        break
+        # States from which the gateway will never reach the one awaited
+        elif state == 'failed':
+            return False, nat_gateway.get('failure_message') or 'NAT gateway failed', nat_gateway
 
-            else:
-                time.sleep(polling_increment_secs)
+        elif state == 'pending' and 'failure_message' in nat_gateway:
+            return False, nat_gateway.get('failure_message'), nat_gateway
 
-        except botocore.exceptions.ClientError as e:
-            err_msg = str(e)
+        elif state in ('deleting', 'deleted') and status not in ('deleting', 'deleted'):
+            return False, 'NAT gateway is {0}'.format(state), nat_gateway
 
-    if not status_achieved:
-        err_msg = "Wait time out reached, while waiting for results"
+        return False, '', nat_gateway
 
-    return status_achieved, err_msg, nat_gateway
+    return wait_with_backoff(check, wait_timeout, STATUS_POLL_MAX_DELAY)
 
 
 def gateway_in_subnet_exists(client, subnet_id, allocation_id=None,
@@ -75,6 +75,30 @@ options:
           - The number of times to check that the service is available
         required: false
         default: 10
+    wait:
+        description:
+          - Wait, after creating or updating the service, until its deployment has converged. That is when the
+            PRIMARY deployment runs as many tasks as it desires and the older deployments have drained.
+          - The service is polled with a delay that grows while nothing changes and starts over whenever the
+            deployments make progress.
+        required: false
+        default: false
+        version_added: "2.3"
+    wait_timeout:
+        description:
+          - How many seconds to wait for the deployment to converge, or for a service in state C(deleting) to become
+            inactive.
+          - When not set, waiting for the deployment (C(wait=yes)) gives up after 600 seconds and waiting in state
+            C(deleting) after C(delay) times C(repeat) seconds, as before this option existed.
+        required: false
+        default: null
+        version_added: "2.3"
+    max_placement_failures:
+        description:
+          - Stop waiting and fail once the service reports this many new events saying it was unable to place a task.
+        required: false
+        default: 3
+        version_added: "2.3"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -95,6 +119,15 @@ EXAMPLES = '''
     state: present
     cluster: new_cluster
 
+# Roll out a new task definition and wait until the old tasks are gone
+- ecs_service:
+    name: default
+    state: present
+    cluster: new_cluster
+    task_definition: new_cluster-task:2
+    desired_count: 4
+    wait: true
+    wait_timeout: 900
 # Simple example to delete
 - ecs_service:
     name: default
@@ -194,6 +227,11 @@ from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.ec2 import boto3_conn, ec2_argument_spec, get_aws_connection_info
 
 
+# Bounds, in seconds, of the delay between two polls of a service
+MIN_POLL_DELAY = 2
+MAX_POLL_DELAY = 30
+
+
 class EcsServiceManager:
     """Handles ECS Services"""
 
@@ -294,6 +332,68 @@ class EcsServiceManager:
     def delete_service(self, service, cluster=None):
         return self.ecs.delete_service(cluster=cluster, service=service)
 
+    def wait_for_service(self, cluster_name, service_name, is_done, timeout, service=None,
+                         max_placement_failures=None):
+        """Poll a service until is_done(service) holds.
+
+        The delay between polls doubles, up to MAX_POLL_DELAY, while the
+        deployments stay the same, and drops back to MIN_POLL_DELAY as
+        soon as they change. Events that were not in the given service
+        yet and report a task which could not be placed are counted, and
+        max_placement_failures of them end the wait early.
+
+        Returns the last service description and an error message, or
+        None when is_done was reached.
+        """
+        seen = set()
+        if service:
+            seen.update(e['id'] for e in service.get('events', []))
+        placement_failures = 0
+        deadline = time.time() + timeout
+        delay = MIN_POLL_DELAY
+        last_progress = None
+        while True:
+            service = self.describe_service(cluster_name, service_name)
+            if is_done(service):
+                return service, None
+            if service is None:
+                return service, "Service %s disappeared while waiting for it" % service_name
+
+            for event in service.get('events', []):
+                if event['id'] in seen:
+                    continue
+                seen.add(event['id'])
+                if 'unable to place a task' in event['message']:
+                    placement_failures += 1
+                    last_failure = event['message']
+            if max_placement_failures and placement_failures >= max_placement_failures:
+                return service, "Deployment of service %s is failing: %s" % (service_name, last_failure)
+
+            progress = [(d['id'], d['runningCount'], d['pendingCount']) for d in service.get('deployments', [])]
+            if progress != last_progress:
+                delay = MIN_POLL_DELAY
+            else:
+                delay = min(delay * 2, MAX_POLL_DELAY)
+            last_progress = progress
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return service, "Service %s did not settle within %d seconds" % (service_name, timeout)
+            time.sleep(min(delay, remaining))
+
+
+def deployment_converged(service):
+    if service is None:
+        return False
+    deployments = service.get('deployments', [])
+    if len(deployments) != 1 or deployments[0]['status'] != 'PRIMARY':
+        return False
+    return deployments[0]['runningCount'] == deployments[0]['desiredCount']
+
+
+def service_inactive(service):
+    return service is None or service['status'] == 'INACTIVE'
+
 def main():
 
     argument_spec = ec2_argument_spec()
@@ -307,7 +407,10 @@ def main():
         client_token=dict(required=False, type='str' ),
         role=dict(required=False, type='str' ),
         delay=dict(required=False, type='int', default=10),
-        repeat=dict(required=False, type='int', default=10)
+        repeat=dict(required=False, type='int', default=10),
+        wait=dict(required=False, type='bool', default=False),
+        wait_timeout=dict(required=False, type='int'),
+        max_placement_failures=dict(required=False, type='int', default=3)
     ))
 
     module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
@@ -378,6 +481,18 @@ def main():
 
                 results['service'] = response
 
+                if module.params['wait']:
+                    service, error = service_mgr.wait_for_service(module.params['cluster'],
+                        module.params['name'],
+                        deployment_converged,
+                        module.params['wait_timeout'] or 600,
+                        service=response,
+                        max_placement_failures=module.params['max_placement_failures'])
+                    if service:
+                        results['service'] = service_mgr.jsonize(service)
+                    if error:
+                        module.fail_json(msg=error, **results)
+
             results['changed'] = True
 
     elif module.params['state'] == 'absent':
@@ -408,19 +523,13 @@ def main():
             return
         # it exists, so we should delete it and mark changed.
         # return info about the cluster deleted
-        delay = module.params['delay']
-        repeat = module.params['repeat']
-        time.sleep(delay)
-        for i in range(repeat):
-            existing = service_mgr.describe_service(module.params['cluster'], module.params['name'])
-            status = existing['status']
-            if status == "INACTIVE":
-                results['changed'] = True
-                break
-            time.sleep(delay)
-        if i is repeat-1:
-            module.fail_json(msg="Service still not deleted after "+str(repeat)+" tries of "+str(delay)+" seconds each.")
+        timeout = module.params['wait_timeout'] or module.params['delay'] * module.params['repeat']
+        existing, error = service_mgr.wait_for_service(module.params['cluster'],
+            module.params['name'], service_inactive, timeout)
+        if error:
+            module.fail_json(msg="Service still not deleted after "+str(timeout)+" seconds.")
             return
+        results['changed'] = True
 
     module.exit_json(**results)
 
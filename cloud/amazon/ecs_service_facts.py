@@ -41,8 +41,15 @@ options:
         default: 'default'
     service:
         description:
-            - The service to get details for (required if details is true)
+            - The service, or a comma separated list or a list of services, to get details for. When details
+              is true and no service is given, every service of the cluster is described.
         required: false
+    max_workers:
+        description:
+            - Number of describe_services calls, of up to 10 services each, to run at the same time.
+        required: false
+        default: 4
+        version_added: "2.3"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -57,6 +64,11 @@ EXAMPLES = '''
     service: console-test-service
     details: true
 
+# Describe every service of a cluster
+- ecs_service_facts:
+    cluster: test-cluster
+    details: true
+
 # Basic listing example
 - ecs_service_facts:
     cluster: test-cluster
@@ -139,6 +151,8 @@ try:
 except ImportError:
     HAS_BOTO3 = False
 
+import threading
+
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.ec2 import boto3_conn, ec2_argument_spec, get_aws_connection_info
 
@@ -171,19 +185,57 @@ class EcsServiceManager:
         fn_args = dict()
         if cluster and cluster is not None:
             fn_args['cluster'] = cluster
-        response = self.ecs.list_services(**fn_args)
-        relevant_response = dict(services = response['serviceArns'])
+        services = []
+        paginator = self.ecs.get_paginator('list_services')
+        for page in paginator.paginate(**fn_args):
+            services.extend(page['serviceArns'])
+        relevant_response = dict(services = services)
         return relevant_response
 
-    def describe_services(self, cluster, services):
+    def describe_services(self, cluster, services, max_workers=4):
         fn_args = dict()
         if cluster and cluster is not None:
             fn_args['cluster'] = cluster
-        fn_args['services']=services.split(",")
-        response = self.ecs.describe_services(**fn_args)
-        relevant_response = dict(services = map(self.extract_service_from, response['services']))
-        if 'failures' in response and len(response['failures'])>0:
-            relevant_response['services_not_running'] = response['failures']
+
+        # describe_services takes at most 10 services per call
+        chunks = [services[i:i + 10] for i in range(0, len(services), 10)]
+        responses = [None] * len(chunks)
+        pending = list(range(len(chunks)))
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            while not errors:
+                with lock:
+                    if not pending:
+                        return
+                    i = pending.pop(0)
+                try:
+                    responses[i] = self.ecs.describe_services(services=chunks[i], **fn_args)
+                except Exception as e:
+                    errors.append(e)
+
+        threads = []
+        for i in range(max(1, min(max_workers, len(chunks)))):
+            t = threading.Thread(target=worker)
+            t.daemon = True
+            t.start()
+            threads.append(t)
+        for t in threads:
+            t.join()
+
+        if errors:
+            self.module.fail_json(msg=str(errors[0]))
+
+        relevant_response = dict(services = [])
+        failures = []
+        for response in responses:
+            if response is None:
+                continue
+            relevant_response['services'].extend(map(self.extract_service_from, response['services']))
+            failures.extend(response.get('failures', []))
+        if len(failures)>0:
+            relevant_response['services_not_running'] = failures
         return relevant_response
 
     def extract_service_from(self, service):
@@ -207,7 +259,8 @@ def main():
     argument_spec.update(dict(
         details=dict(required=False, type='bool', default=False ),
         cluster=dict(required=False, type='str' ),
-        service=dict(required=False, type='str' )
+        service=dict(required=False, type='list' ),
+        max_workers=dict(required=False, type='int', default=4 )
     ))
 
     module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
@@ -222,9 +275,10 @@ def main():
 
     task_mgr = EcsServiceManager(module)
     if show_details:
-        if 'service' not in module.params or not module.params['service']:
-            module.fail_json(msg="service must be specified for ecs_service_facts")
-        ecs_facts = task_mgr.describe_services(module.params['cluster'], module.params['service'])
+        services = module.params['service']
+        if not services:
+            services = task_mgr.list_services(module.params['cluster'])['services']
+        ecs_facts = task_mgr.describe_services(module.params['cluster'], services, module.params['max_workers'])
     else:
         ecs_facts = task_mgr.list_services(module.params['cluster'])
 
@@ -162,6 +162,7 @@ tags:
 
 from time import sleep
 from collections import defaultdict
+import threading
 
 try:
     from botocore.exceptions import ClientError
@@ -170,6 +171,10 @@ try:
 except ImportError as e:
     HAS_BOTO3 = False
 
+# Bound of concurrent API calls when looking up details of file systems
+MAX_WORKERS = 8
+
+
 class EFSConnection(object):
     STATE_CREATING = 'creating'
     STATE_AVAILABLE = 'available'
@@ -195,6 +200,21 @@ class EFSConnection(object):
             self.connection.describe_file_systems,
             **kwargs
         )
+        items = list(items)
+        available = [item for item in items if item['LifeCycleState'] == self.STATE_AVAILABLE]
+
+        """
+        Tags and mount targets of all file systems are looked up concurrently,
+        then the security groups of all their mount targets in one more pool
+        """
+        details = run_concurrently(
+            lambda item: (self.get_tags(FileSystemId=item['FileSystemId']),
+                          self.describe_mount_targets(FileSystemId=item['FileSystemId'])),
+            available
+        )
+        self.add_security_groups([target for (tags, targets) in details for target in targets])
+        details = dict((item['FileSystemId'], detail) for item, detail in zip(available, details))
+
         for item in items:
             item['CreationTime'] = str(item['CreationTime'])
             """
@@ -204,9 +224,8 @@ class EFSConnection(object):
             item['MountPoint'] = '.%s.efs.%s.amazonaws.com:/' % (item['FileSystemId'], self.region)
             if 'Timestamp' in item['SizeInBytes']:
                 item['SizeInBytes']['Timestamp'] = str(item['SizeInBytes']['Timestamp'])
-            if item['LifeCycleState'] == self.STATE_AVAILABLE:
-                item['Tags'] = self.get_tags(FileSystemId=item['FileSystemId'])
-                item['MountTargets'] = list(self.get_mount_targets(FileSystemId=item['FileSystemId']))
+            if item['FileSystemId'] in details:
+                item['Tags'], item['MountTargets'] = details[item['FileSystemId']]
             else:
                 item['Tags'] = {}
                 item['MountTargets'] = []
@@ -227,19 +246,33 @@ class EFSConnection(object):
         """
          Returns mount targets for selected instance of EFS
         """
-        targets = iterate_all(
+        targets = self.describe_mount_targets(**kwargs)
+        self.add_security_groups(targets)
+        return targets
+
+    def describe_mount_targets(self, **kwargs):
+        """
+         Returns mount targets for selected instance of EFS, without security groups
+        """
+        return list(iterate_all(
             'MountTargets',
             self.connection.describe_mount_targets,
             **kwargs
+        ))
+
+    def add_security_groups(self, targets):
+        """
+         Sets SecurityGroups of the mount targets, looked up concurrently
+        """
+        available = [target for target in targets if target['LifeCycleState'] == self.STATE_AVAILABLE]
+        security_groups = run_concurrently(
+            lambda target: list(self.get_security_groups(MountTargetId=target['MountTargetId'])),
+            available
         )
         for target in targets:
-            if target['LifeCycleState'] == self.STATE_AVAILABLE:
-                target['SecurityGroups'] = list(self.get_security_groups(
-                    MountTargetId=target['MountTargetId']
-                ))
-            else:
-                target['SecurityGroups'] = []
-            yield target
+            target['SecurityGroups'] = []
+        for target, groups in zip(available, security_groups):
+            target['SecurityGroups'] = groups
 
     def get_security_groups(self, **kwargs):
         """
@@ -261,17 +294,53 @@ def iterate_all(attr, map_method, **kwargs):
     while True:
         try:
             data = map_method(**args)
-            for elm in data[attr]:
-                yield elm
-            if 'NextMarker' in data:
-                args['Marker'] = data['Nextmarker']
-                continue
-            break
         except ClientError as e:
             if e.response['Error']['Code'] == "ThrottlingException" and wait < 600:
                 sleep(wait)
                 wait = wait * 2
                 continue
+            raise
+        wait = 1
+        for elm in data[attr]:
+            yield elm
+        if not data.get('NextMarker'):
+            break
+        args['Marker'] = data['NextMarker']
+
+
+def run_concurrently(func, items, max_workers=MAX_WORKERS):
+    """
+     Helper method to call func on every item with up to max_workers threads,
+     returns the results in the order of items
+    """
+    results = [None] * len(items)
+    pending = list(range(len(items)))
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        while not errors:
+            with lock:
+                if not pending:
+                    return
+                index = pending.pop()
+            try:
+                results[index] = func(items[index])
+            except Exception as e:
+                errors.append(e)
+
+    threads = []
+    for i in range(min(max_workers, len(items))):
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+    return results
 
 
 def prefix_to_attr(attr_id):
@@ -155,9 +155,14 @@ except ImportError:
 
 import re
 import datetime
+import random
 import time
 from functools import reduce
 
+# Ceiling of the delay between two status checks; creating, updating or
+# deleting a stream usually takes well under a minute
+STATUS_POLL_MAX_DELAY = 10
+
 
 def convert_to_lower(data):
     """Convert all uppercase keys in dict with lowercase_
@@ -344,6 +349,50 @@ def find_stream(client, stream_name, check_mode=False):
     return success, err_msg, results
 
 
+THROTTLING_CODES = ('Throttling', 'ThrottlingException', 'RequestLimitExceeded')
+
+
+def wait_with_backoff(check, wait_timeout, max_delay, initial_delay=1):
+    """Call check() until it reports the wait as over or time runs out.
+    Args:
+        check (callable): Returns a tuple (done, abort_msg, result). The wait
+            succeeds when done is True and stops early when abort_msg is set.
+        wait_timeout (int): Number of seconds to wait, until this timeout is reached.
+        max_delay (int): Ceiling, in seconds, of the delay between two checks.
+
+    Kwargs:
+        initial_delay (int): Delay, in seconds, before the second check.
+
+    The delay doubles after every check, up to max_delay, and each sleep is
+    drawn at random from the upper half of the delay so that many waiters
+    started together do not keep polling in lockstep. Throttled calls are
+    simply retried after the next delay. ec2_vpc_nat_gateway carries a copy
+    of this helper.
+
+    Returns:
+        Tuple (bool, str, dict)
+    """
+    deadline = time.time() + wait_timeout
+    delay = initial_delay
+    result = dict()
+    while True:
+        try:
+            done, abort_msg, result = check()
+            if done:
+                return True, '', result
+            if abort_msg:
+                return False, abort_msg, result
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] not in THROTTLING_CODES:
+                return False, str(e), result
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False, "Wait time out reached, while waiting for results", result
+        time.sleep(min(remaining, random.uniform(delay / 2.0, delay)))
+        delay = min(delay * 2, max_delay)
+
+
 def wait_for_status(client, stream_name, status, wait_timeout=300,
                     check_mode=False):
     """Wait for the the status to change for a Kinesis Stream.
@@ -366,43 +415,44 @@ def wait_for_status(client, stream_name, status, wait_timeout=300,
     Returns:
         Tuple (bool, str, dict)
     """
-    polling_increment_secs = 5
-    wait_timeout = time.time() + wait_timeout
-    status_achieved = False
-    stream = dict()
-    err_msg = ""
+    if check_mode:
+        find_success, find_msg, stream = (
+            find_stream(client, stream_name, check_mode=check_mode)
+        )
+        return True, "Status {0} achieved successfully".format(status), stream
 
-    while wait_timeout > time.time():
+    def check():
+        # Only the status is needed here, so skip listing the shards
         try:
-            find_success, find_msg, stream = (
-                find_stream(client, stream_name, check_mode=check_mode)
-            )
-            if check_mode:
-                status_achieved = True
-                break
-
-            elif status != 'DELETING':
-                if find_success and stream:
-                    if stream.get('StreamStatus') == status:
-                        status_achieved = True
-                        break
-
-            elif status == 'DELETING' and not check_mode:
-                if not find_success:
-                    status_achieved = True
-                    break
-
-            else:
-                time.sleep(polling_increment_secs)
+            stream = client.describe_stream(
+                StreamName=stream_name, Limit=1
+            )['StreamDescription']
         except botocore.exceptions.ClientError as e:
-            err_msg = str(e)
-
+            if e.response['Error']['Code'] != 'ResourceNotFoundException':
+                raise
+            # A stream that was just created may not be visible yet
+            return status == 'DELETING', '', dict()
+        if status != 'DELETING':
+            if stream['StreamStatus'] == status:
+                return True, '', stream
+            if stream['StreamStatus'] == 'DELETING':
+                return False, "Stream {0} is being deleted".format(stream_name), stream
+        return False, '', stream
+
+    status_achieved, err_msg, stream = (
+        wait_with_backoff(check, wait_timeout, STATUS_POLL_MAX_DELAY)
+    )
     if not status_achieved:
-        err_msg = "Wait time out reached, while waiting for results"
-    else:
-        err_msg = "Status {0} achieved successfully".format(status)
+        return status_achieved, err_msg, stream
 
-    return status_achieved, err_msg, stream
+    if status != 'DELETING':
+        find_success, find_msg, stream = (
+            find_stream(client, stream_name, check_mode=check_mode)
+        )
+        if not find_success:
+            return False, find_msg, stream
+
+    return True, "Status {0} achieved successfully".format(status), stream
 
 
 def tags_action(client, stream_name, tags, action='create', check_mode=False):
@@ -863,12 +913,16 @@ def create_stream(client, stream_name, number_of_shards=1, retention_period=None
             return success, changed, err_msg, results
 
     if stream_found and current_stream['StreamStatus'] == 'DELETING' and wait:
+        # Let the deletion finish, the stream is created again below
         wait_success, wait_msg, current_stream = (
             wait_for_status(
-                client, stream_name, 'ACTIVE', wait_timeout,
+                client, stream_name, 'DELETING', wait_timeout,
                 check_mode=check_mode
             )
         )
+        if not wait_success:
+            return wait_success, changed, wait_msg, results
+        stream_found = False
     if stream_found and current_stream['StreamStatus'] != 'DELETING':
         success, changed, err_msg = update(
             client, current_stream, stream_name, retention_period, tags,
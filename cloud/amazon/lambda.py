@@ -52,6 +52,16 @@ options:
     required: false
     default: null
     aliases: [ 'src' ]
+  src_dir:
+    description:
+      - A directory holding the deployment package sources. It is zipped into C(zip_file), or into a .zip file named
+        after the directory when C(zip_file) is not given, and that archive is uploaded.
+      - The archive is built with fixed timestamps and in sorted order, so the same sources always give the same
+        archive. A hash manifest of the sources is kept next to the archive as C(<archive>.manifest), and when no
+        source changed neither the archive is rebuilt nor the code uploaded again.
+    required: false
+    default: null
+    version_added: '2.3'
   s3_bucket:
     description:
       - Amazon S3 bucket name where the .zip file containing your deployment package is stored
@@ -122,6 +132,17 @@ tasks:
     - { name: HelloWorld, zip_file: 'hello-code.zip' }
     - { name: ByeBye, zip_file: 'bye-code.zip' }
 
+# Build the deployment package from a source tree, only when a source file changed
+- name: package and deploy
+  lambda:
+    name: Builder
+    state: present
+    src_dir: 'build/builder'
+    zip_file: 'build/builder.zip'
+    runtime: 'java8'
+    role: 'arn:aws:iam::987654321012:role/lambda_basic_execution'
+    handler: 'example.Builder::handleRequest'
+
 # Basic Lambda function deletion
 tasks:
 - name: Delete Lambda functions HelloWorld and ByeBye
@@ -159,11 +180,22 @@ output:
         'code_sha256': 'string',
         'version': 'string',
       }
+package_rebuilt:
+  description: whether the deployment package was (or, in check mode, would be) rebuilt from C(src_dir)
+  returned: when src_dir is given and state is present
+  type: bool
+  sample: true
 '''
 
 # Import from Python standard library
 import base64
 import hashlib
+import json
+import os
+import stat
+import sys
+import tempfile
+import zipfile
 
 try:
     import botocore
@@ -188,10 +220,17 @@ def get_current_function(connection, function_name, qualifier=None):
         return None
 
 
+CHUNK_SIZE = 64 * 1024
+
+# Timestamp given to every archive member, the earliest zip can store
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
 def sha256sum(filename):
     hasher = hashlib.sha256()
     with open(filename, 'rb') as f:
-        hasher.update(f.read())
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            hasher.update(chunk)
 
     code_hash = hasher.digest()
     code_b64 = base64.b64encode(code_hash)
@@ -200,6 +239,105 @@ def sha256sum(filename):
     return hex_digest
 
 
+def scan_src_dir(src_dir):
+    """Return {archive name: [size, mtime, mode]} for the files below src_dir."""
+    entries = {}
+    for root, dirs, files in os.walk(src_dir):
+        dirs.sort()
+        for name in files:
+            path = os.path.join(root, name)
+            st = os.stat(path)
+            arcname = os.path.relpath(path, src_dir).replace(os.sep, '/')
+            entries[arcname] = [st.st_size, st.st_mtime, stat.S_IMODE(st.st_mode)]
+    return entries
+
+
+def read_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return None
+
+
+def write_zip_member(archive, path, arcname, mode):
+    info = zipfile.ZipInfo(arcname, ZIP_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.create_system = 3
+    info.external_attr = (stat.S_IFREG | mode) << 16
+    with open(path, 'rb') as src:
+        if sys.version_info >= (3, 6):
+            with archive.open(info, 'w') as dest:
+                for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                    dest.write(chunk)
+        else:
+            archive.writestr(info, src.read())
+
+
+def build_zip(module, src_dir, zip_file):
+    """Zip src_dir into zip_file unless the sources are unchanged.
+
+    The manifest records size, mtime, mode and content hash of every
+    source, plus the hash of the archive built from them. Sources whose
+    size and mtime did not change are not hashed again, and when every
+    hash matches the existing archive is kept as it is.
+
+    Returns the base64 sha256 of the archive, like Lambda's CodeSha256,
+    and whether the archive was (or, in check mode, would be) rebuilt.
+    """
+    manifest_path = zip_file + '.manifest'
+    manifest = read_manifest(manifest_path) or {}
+    known = manifest.get('files', {})
+
+    entries = scan_src_dir(src_dir)
+    for arcname, entry in entries.items():
+        old = known.get(arcname)
+        if old and old[:3] == entry:
+            entry.append(old[3])
+        else:
+            entry.append(sha256sum(os.path.join(src_dir, arcname)))
+
+    def content(files):
+        return dict((arcname, entry[2:]) for arcname, entry in files.items())
+
+    if (os.path.exists(zip_file) and manifest.get('zip_sha256') and
+            content(known) == content(entries)):
+        if known != entries and not module.check_mode:
+            manifest['files'] = entries
+            write_manifest(module, manifest_path, manifest)
+        return manifest['zip_sha256'], False
+
+    if module.check_mode:
+        return None, True
+
+    dest_dir = os.path.dirname(os.path.abspath(zip_file))
+    fd, tmp = tempfile.mkstemp(suffix='.zip', dir=dest_dir)
+    os.close(fd)
+    try:
+        archive = zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED)
+        try:
+            for arcname in sorted(entries):
+                write_zip_member(archive, os.path.join(src_dir, arcname), arcname, entries[arcname][2])
+        finally:
+            archive.close()
+    except (IOError, OSError) as e:
+        os.remove(tmp)
+        module.fail_json(msg='Unable to build %s from %s: %s' % (zip_file, src_dir, e))
+    os.chmod(tmp, 0o644)
+    module.atomic_move(tmp, zip_file)
+
+    zip_sha256 = sha256sum(zip_file)
+    write_manifest(module, manifest_path, dict(files=entries, zip_sha256=zip_sha256))
+    return zip_sha256, True
+
+
+def write_manifest(module, path, manifest):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+    with os.fdopen(fd, 'w') as f:
+        json.dump(manifest, f, sort_keys=True)
+    module.atomic_move(tmp, path)
+
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(dict(
@@ -209,6 +347,7 @@ def main():
         role=dict(type='str', default=None),
         handler=dict(type='str', default=None),
         zip_file=dict(type='str', default=None, aliases=['src']),
+        src_dir=dict(type='path', default=None),
         s3_bucket=dict(type='str'),
         s3_key=dict(type='str'),
         s3_object_version=dict(type='str', default=None),
@@ -222,7 +361,10 @@ def main():
 
     mutually_exclusive = [['zip_file', 's3_key'],
                           ['zip_file', 's3_bucket'],
-                          ['zip_file', 's3_object_version']]
+                          ['zip_file', 's3_object_version'],
+                          ['src_dir', 's3_key'],
+                          ['src_dir', 's3_bucket'],
+                          ['src_dir', 's3_object_version']]
 
     required_together = [['s3_key', 's3_bucket', 's3_object_version'],
                          ['vpc_subnet_ids', 'vpc_security_group_ids']]
@@ -241,6 +383,7 @@ def main():
     s3_key = module.params.get('s3_key')
     s3_object_version = module.params.get('s3_object_version')
     zip_file = module.params.get('zip_file')
+    src_dir = module.params.get('src_dir')
     description = module.params.get('description')
     timeout = module.params.get('timeout')
     memory_size = module.params.get('memory_size')
@@ -278,6 +421,16 @@ def main():
         except (botocore.exceptions.ClientError, botocore.exceptions.ValidationError) as e:
             module.fail_json(msg=str(e))
 
+    # Build the deployment package from its sources when needed
+    local_checksum = None
+    package = {}
+    if src_dir and state == 'present':
+        if not os.path.isdir(src_dir):
+            module.fail_json(msg='src_dir %s is not a directory' % src_dir)
+        if not zip_file:
+            zip_file = src_dir.rstrip(os.sep) + '.zip'
+        local_checksum, package['package_rebuilt'] = build_zip(module, src_dir, zip_file)
+
     # Get function configuration if present, False otherwise
     current_function = get_current_function(client, name)
 
@@ -357,17 +510,21 @@ def main():
 
         # Compare local checksum, update remote code when different
         elif zip_file:
-            local_checksum = sha256sum(zip_file)
+            if not src_dir:
+                local_checksum = sha256sum(zip_file)
             remote_checksum = current_config['CodeSha256']
 
             # Only upload new code when local code is different compared to the remote code
             if local_checksum != remote_checksum:
-                try:
-                    with open(zip_file, 'rb') as f:
-                        encoded_zip = f.read()
-                    code_kwargs.update({'ZipFile': encoded_zip})
-                except IOError as e:
-                    module.fail_json(msg=str(e))
+                if check_mode:
+                    changed = True
+                else:
+                    try:
+                        with open(zip_file, 'rb') as f:
+                            encoded_zip = f.read()
+                        code_kwargs.update({'ZipFile': encoded_zip})
+                    except IOError as e:
+                        module.fail_json(msg=str(e))
 
         # Upload new code if needed (e.g. code checksum has changed)
         if len(code_kwargs) > 2:
@@ -385,7 +542,9 @@ def main():
             module.fail_json(msg='Unable to get function information after updating')
 
         # We're done
-        module.exit_json(changed=changed, **camel_dict_to_snake_dict(response))
+        result = camel_dict_to_snake_dict(response)
+        result.update(package)
+        module.exit_json(changed=changed, **result)
 
     # Function doesn't exists, create new Lambda function
     elif state == 'present':
@@ -395,6 +554,9 @@ def main():
                     'S3Key': s3_key}
             if s3_object_version:
                 code.update({'S3ObjectVersion': s3_object_version})
+        elif zip_file and check_mode and src_dir:
+            # The package is only built outside of check mode
+            code = {}
         elif zip_file:
             # If function is stored in local zipfile
             try:
@@ -442,7 +604,9 @@ def main():
         response = get_current_function(client, name, qualifier=current_version)
         if not response:
             module.fail_json(msg='Unable to get function information after creating')
-        module.exit_json(changed=changed, **camel_dict_to_snake_dict(response))
+        result = camel_dict_to_snake_dict(response)
+        result.update(package)
+        module.exit_json(changed=changed, **result)
 
     # Delete existing Lambda function
     if state == 'absent' and current_function:
@@ -112,6 +112,31 @@ options:
         'tags',
         ]
     default: 'list'
+  all_pages:
+    description:
+      - "Follow the pagination markers and return every item, instead of a single page.
+        Applies to query: record_sets and to the list methods of query: hosted_zone and
+        query: health_check. C(max_items) then sets the page size. Requests that are
+        throttled by Route53 are retried with a randomized exponential backoff."
+    required: false
+    default: false
+    version_added: "2.3"
+  fields:
+    description:
+      - "Only return these keys of each listed record set, hosted zone or health check,
+        for example C(Name), C(Type), C(TTL) and C(ResourceRecords). When set, the
+        ResourceRecords of a record set are returned as a plain list of values."
+    required: false
+    version_added: "2.3"
+  snapshot_dir:
+    description:
+      - "Directory in which to keep a snapshot of the record sets of each zone listed with
+        query: record_sets and C(all_pages). The snapshot is keyed on C(change_id): it is
+        used instead of listing the zone again only when it was taken for that same change
+        and the zone still holds the same number of record sets. Ignored when
+        C(change_id) is not given or C(start_record_name) is set."
+    required: false
+    version_added: "2.3"
 author: Karen Cheng(@Etherdaemon)
 extends_documentation_fragment: aws
 '''
@@ -152,6 +177,16 @@ EXAMPLES = '''
     health_check_id: '00000000-1111-2222-3333-12345678abcd'
   register: health_check_failure_reason
 
+- name: List every record set of a large zone, keeping only a few keys
+  route53_facts:
+    query: record_sets
+    hosted_zone_id: 'ZZZ1111112222'
+    all_pages: true
+    fields: [ 'Name', 'Type', 'ResourceRecords' ]
+    snapshot_dir: /var/tmp/route53
+    change_id: "{{ dns_update.change_id | default(omit) }}"
+  register: record_sets
+
 - name: Retrieve reusable delegation set details
   route53_facts:
     query: reusable_delegation_set
@@ -172,9 +207,76 @@ try:
 except ImportError:
     HAS_BOTO3 = False
 
+import json
+import os
+import random
+import tempfile
+import time
+
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.ec2 import boto3_conn, ec2_argument_spec, get_aws_connection_info
 
+# Items fetched per paginator run; a throttled run is retried from the
+# start of its chunk, so nothing is returned twice.
+CHUNK_SIZE = 1000
+THROTTLE_CODES = ('Throttling', 'ThrottlingException', 'PriorRequestNotComplete')
+MAX_BACKOFF = 60
+
+
+def paginate(client, method, result_key, page_size=None, **params):
+    """Yield every item of a paginated Route53 list call.
+
+    Pages are fetched through the boto3 paginator in chunks of CHUNK_SIZE
+    items. Route53 allows 5 requests per second per account, so a
+    throttled chunk is retried after a randomized, growing delay.
+    """
+    paginator = client.get_paginator(method)
+    token = None
+    wait = 1
+    while True:
+        config = dict(MaxItems=CHUNK_SIZE)
+        if page_size:
+            config['PageSize'] = int(page_size)
+        if token:
+            config['StartingToken'] = token
+        pages = paginator.paginate(PaginationConfig=config, **params)
+        chunk = []
+        try:
+            for page in pages:
+                chunk.extend(page[result_key])
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] in THROTTLE_CODES and wait <= MAX_BACKOFF:
+                time.sleep(wait + random.uniform(0, wait))
+                wait = wait * 2
+                continue
+            raise
+        wait = 1
+        for item in chunk:
+            yield item
+        token = pages.resume_token
+        if not token:
+            return
+
+
+def project(item, fields):
+    """Reduce a listed item to the requested keys."""
+    if not fields:
+        return item
+    result = dict((key, item[key]) for key in fields if key in item)
+    if 'ResourceRecords' in result:
+        result['ResourceRecords'] = [record['Value'] for record in result['ResourceRecords']]
+    return result
+
+
+def list_all(client, module, method, result_key, params):
+    params = dict(params)
+    params.pop('MaxItems', None)
+    params.pop('Marker', None)
+    fields = module.params.get('fields')
+    items = [project(item, fields)
+             for item in paginate(client, method, result_key, module.params.get('max_items'), **params)]
+    return {result_key: items, 'IsTruncated': False}
+
 
 def get_hosted_zone(client, module):
     params = dict()
@@ -217,6 +319,9 @@ def list_hosted_zones(client, module):
     if module.params.get('delegation_set_id'):
         params['DelegationSetId'] = module.params.get('delegation_set_id')
 
+    if module.params.get('all_pages'):
+        return list_all(client, module, 'list_hosted_zones', 'HostedZones', params)
+
     results = client.list_hosted_zones(**params)
     return results
 
@@ -307,6 +412,9 @@ def list_health_checks(client, module):
     if module.params.get('next_marker'):
         params['Marker'] = module.params.get('next_marker')
 
+    if module.params.get('all_pages'):
+        return list_all(client, module, 'list_health_checks', 'HealthChecks', params)
+
     results = client.list_health_checks(**params)
     return results
 
@@ -330,10 +438,64 @@ def record_sets_details(client, module):
     elif module.params.get('type'):
         params['StartRecordType'] = module.params.get('type')
 
+    if module.params.get('all_pages'):
+        if module.params.get('snapshot_dir') and module.params.get('change_id') and \
+                'StartRecordName' not in params:
+            return record_sets_snapshot(client, module, params)
+        return list_all(client, module, 'list_resource_record_sets', 'ResourceRecordSets', params)
+
     results = client.list_resource_record_sets(**params)
     return results
 
 
+def record_sets_snapshot(client, module, params):
+    """List every record set of a zone through an on-disk snapshot.
+
+    The snapshot is reused only if it was taken for the same change_id and
+    the zone still holds the same number of record sets; the count alone
+    does not reveal updates that replace records in place.
+    """
+    zone_id = params['HostedZoneId']
+    zone = client.get_hosted_zone(Id=zone_id)['HostedZone']
+    count = zone['ResourceRecordSetCount']
+    change_id = module.params.get('change_id')
+
+    snapshot_dir = os.path.expanduser(module.params.get('snapshot_dir'))
+    path = os.path.join(snapshot_dir, '%s.json' % zone_id.split('/')[-1])
+    snapshot = None
+    if os.path.exists(path):
+        try:
+            f = open(path)
+            try:
+                snapshot = json.load(f)
+            finally:
+                f.close()
+        except (IOError, ValueError):
+            snapshot = None
+
+    cached = (snapshot is not None and snapshot.get('count') == count and
+              snapshot.get('change_id') == change_id)
+    if cached:
+        record_sets = snapshot['record_sets']
+    else:
+        record_sets = list(paginate(client, 'list_resource_record_sets', 'ResourceRecordSets',
+                                    module.params.get('max_items'), HostedZoneId=zone_id))
+        snapshot = dict(zone_id=zone_id, count=count, change_id=change_id, record_sets=record_sets)
+        if not os.path.isdir(snapshot_dir):
+            os.makedirs(snapshot_dir)
+        fd, tmp = tempfile.mkstemp(dir=snapshot_dir)
+        f = os.fdopen(fd, 'w')
+        try:
+            json.dump(snapshot, f)
+        finally:
+            f.close()
+        module.atomic_move(tmp, path)
+
+    fields = module.params.get('fields')
+    return {'ResourceRecordSets': [project(item, fields) for item in record_sets],
+            'IsTruncated': False, 'snapshot': path, 'from_snapshot': cached}
+
+
 def health_check_details(client, module):
     health_check_invocations = {
         'list': list_health_checks,
@@ -399,6 +561,9 @@ def main():
             'count',
             'tags',
         ], default='list'),
+        all_pages=dict(type='bool', default=False),
+        fields=dict(type='list'),
+        snapshot_dir=dict(type='path'),
         )
     )
 
@@ -45,6 +45,19 @@ options:
     choices: ["create","status", "start", "stop", "pause", "unpause",
               "shutdown", "undefine", "destroy", "get_xml", "autostart",
               "freemem", "list_vms", "info", "nodeinfo", "virttype", "define"]
+  names:
+    description:
+      - list of guest VMs to change the state of or run a VM command (except C(define)) on in one go.
+      - The guests are handled up to C(max_workers) at a time.
+    required: false
+    default: null
+    version_added: "2.3"
+  max_workers:
+    description:
+      - maximum number of guests of C(names) handled at the same time.
+    required: false
+    default: 4
+    version_added: "2.3"
   uri:
     description:
       - libvirt connection uri
@@ -73,6 +86,14 @@ ansible host -m virt -a "name=alpha command=status"
 ansible host -m virt -a "name=alpha command=get_xml"
 ansible host -m virt -a "name=alpha command=create uri=lxc:///"
 
+# a playbook task shutting down several guests at once
+- virt:
+    names:
+      - alpha
+      - beta
+      - gamma
+    state: shutdown
+
 # a playbook example of defining and launching an LXC guest
 tasks:
   - name: define vm
@@ -106,6 +127,7 @@ VIRT_SUCCESS = 0
 VIRT_UNAVAILABLE=2
 
 import sys
+import threading
 
 try:
     import libvirt
@@ -160,8 +182,27 @@ class LibvirtConnection(object):
         """
         Extra bonus feature: vmid = -1 returns a list of everything
         """
+        if vmid == -1:
+            return self.find_vms()
+
+        try:
+            return self.conn.lookupByName(vmid)
+        except libvirt.libvirtError:
+            e = get_exception()
+            if e.get_error_code() == libvirt.VIR_ERR_NO_DOMAIN:
+                raise VMNotFound("virtual machine %s not found" % vmid)
+            raise
+
+    def find_vms(self, flags=0):
+        """
+        Returns running and defined domains, in one call where libvirt
+        supports listAllDomains (>= 0.9.13)
+        """
         conn = self.conn
 
+        if hasattr(conn, 'listAllDomains'):
+            return conn.listAllDomains(flags)
+
         vms = []
 
         # this block of code borrowed from virt-manager:
@@ -176,14 +217,59 @@ class LibvirtConnection(object):
             vm = conn.lookupByName(name)
             vms.append(vm)
 
-        if vmid == -1:
-            return vms
+        return vms
 
-        for vm in vms:
-            if vm.name() == vmid:
-                return vm
+    def find_vms_by_name(self, vmids):
+        """
+        Returns the domains of the given names, looked up from one listing
+        """
+        vms = dict((vm.name(), vm) for vm in self.find_vms())
+        for vmid in vmids:
+            if vmid not in vms:
+                raise VMNotFound("virtual machine %s not found" % vmid)
+        return [vms[vmid] for vmid in vmids]
 
-        raise VMNotFound("virtual machine %s not found" % vmid)
+    def get_all_stats(self, vms=None):
+        """
+        Returns (name, info) of the given domains or all of them, with info
+        laid out as virDomain.info() does. libvirt >= 1.2.8 collects them in
+        one call where the connection driver supports it (e.g. QEMU), other
+        versions and drivers (e.g. LXC, Xen) ask every domain.
+        """
+        records = None
+        if hasattr(self.conn, 'getAllDomainStats'):
+            stats = (libvirt.VIR_DOMAIN_STATS_STATE | libvirt.VIR_DOMAIN_STATS_CPU_TOTAL |
+                     libvirt.VIR_DOMAIN_STATS_BALLOON | libvirt.VIR_DOMAIN_STATS_VCPU)
+            try:
+                if vms is None:
+                    records = self.conn.getAllDomainStats(stats)
+                else:
+                    records = self.conn.domainListGetStats(vms, stats)
+            except libvirt.libvirtError:
+                e = get_exception()
+                if e.get_error_code() != libvirt.VIR_ERR_NO_SUPPORT:
+                    raise
+
+        if records is None:
+            if vms is None:
+                vms = self.find_vms()
+            return [(vm.name(), vm.info()) for vm in vms]
+
+        return [(vm.name(), [record.get('state.state'), record.get('balloon.maximum'),
+                             # inactive domains only report their configured memory
+                             record.get('balloon.current', record.get('balloon.maximum')),
+                             record.get('vcpu.current'),
+                             record.get('cpu.time', 0)])
+                for (vm, record) in records]
+
+    def get_autostart_names(self):
+        """
+        Returns the names of the domains started on boot
+        """
+        if hasattr(self.conn, 'listAllDomains'):
+            vms = self.conn.listAllDomains(libvirt.VIR_CONNECT_LIST_DOMAINS_AUTOSTART)
+            return set(vm.name() for vm in vms)
+        return set(vm.name() for vm in self.find_vms() if vm.autostart())
 
     def shutdown(self, vmid):
         return self.find_vm(vmid).shutdown()
@@ -255,9 +341,11 @@ class Virt(object):
     def __init__(self, uri, module):
         self.module = module
         self.uri = uri
+        self.conn = None
 
     def __get_conn(self):
-        self.conn = LibvirtConnection(self.uri, self.module)
+        if self.conn is None:
+            self.conn = LibvirtConnection(self.uri, self.module)
         return self.conn
 
     def get_vm(self, vmid):
@@ -265,18 +353,18 @@ class Virt(object):
         return self.conn.find_vm(vmid)
 
     def state(self):
-        vms = self.list_vms()
+        self.__get_conn()
         state = []
-        for vm in vms:
-            state_blurb = self.conn.get_status(vm)
+        for vm, data in self.conn.get_all_stats():
+            state_blurb = VIRT_STATE_NAME_MAP.get(data[0],"unknown")
             state.append("%s %s" % (vm,state_blurb))
         return state
 
     def info(self):
-        vms = self.list_vms()
+        self.__get_conn()
+        autostart = self.conn.get_autostart_names()
         info = dict()
-        for vm in vms:
-            data = self.conn.find_vm(vm).info()
+        for vm, data in self.conn.get_all_stats():
             # libvirt returns maxMem, memory, and cpuTime as long()'s, which
             # xmlrpclib tries to convert to regular int's during serialization.
             # This throws exceptions, so convert them to strings here and
@@ -289,7 +377,7 @@ class Virt(object):
                 "nrVirtCpu" : data[3],
                 "cpuTime"   : str(data[4]),
             }
-            info[vm]["autostart"] = self.conn.get_autostart(vm)
+            info[vm]["autostart"] = int(vm in autostart)
 
         return info
 
@@ -311,19 +399,10 @@ class Virt(object):
 
     def list_vms(self, state=None):
         self.conn = self.__get_conn()
-        vms = self.conn.find_vm(-1)
-        results = []
-        for x in vms:
-            try:
-                if state:
-                    vmstate = self.conn.get_status2(x)
-                    if vmstate == state:
-                        results.append(x.name())
-                else:
-                    results.append(x.name())
-            except:
-                pass
-        return results
+        if state:
+            return [vm for (vm, data) in self.conn.get_all_stats()
+                    if VIRT_STATE_NAME_MAP.get(data[0],"unknown") == state]
+        return [x.name() for x in self.conn.find_vm(-1)]
 
     def virttype(self):
         return self.__get_conn().get_type()
@@ -385,6 +464,15 @@ class Virt(object):
         self.__get_conn()
         return self.conn.get_status(vmid)
 
+    def statuses(self, vmids):
+        """
+        Return the status of each of the given vmids, collected in one go
+        """
+        self.__get_conn()
+        vms = self.conn.find_vms_by_name(vmids)
+        return dict((vm, VIRT_STATE_NAME_MAP.get(data[0],"unknown"))
+                    for (vm, data) in self.conn.get_all_stats(vms))
+
     def get_xml(self, vmid):
         """
         Receive a Vm id as input
@@ -417,6 +505,86 @@ class Virt(object):
         self.__get_conn()
         return self.conn.define_from_xml(xml)
 
+def run_concurrently(func, items, max_workers):
+    """
+    Call func on every item with up to max_workers threads, returns the
+    results and the errors by item
+    """
+    results = {}
+    errors = {}
+    pending = list(items)
+    pending.reverse()
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                if not pending:
+                    return
+                item = pending.pop()
+            try:
+                results[item] = func(item)
+            except Exception:
+                errors[item] = str(get_exception())
+
+    threads = []
+    for i in range(max(1, min(max_workers, len(pending)))):
+        t = threading.Thread(target=worker)
+        t.daemon = True
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+
+    return results, errors
+
+def apply_state(v, guest, state, status):
+    res = {'changed': False}
+    if state == 'running':
+        if status == 'paused':
+            res['changed'] = True
+            res['msg'] = v.unpause(guest)
+        elif status != 'running':
+            res['changed'] = True
+            res['msg'] = v.start(guest)
+    elif state == 'shutdown':
+        if status != 'shutdown':
+            res['changed'] = True
+            res['msg'] = v.shutdown(guest)
+    elif state == 'destroyed':
+        if status != 'shutdown':
+            res['changed'] = True
+            res['msg'] = v.destroy(guest)
+    elif state == 'paused':
+        if status == 'running':
+            res['changed'] = True
+            res['msg'] = v.pause(guest)
+    return res
+
+def core_batch(module, v, guests, state, command):
+
+    if not state and command == 'define':
+        module.fail_json(msg="define does not support names, it requires a single name")
+
+    # one lookup of all guests both validates the names and gives their status
+    statuses = v.statuses(guests)
+    if not state and command == 'status':
+        return VIRT_SUCCESS, { command: statuses }
+
+    if state:
+        func = lambda guest: apply_state(v, guest, state, statuses[guest])
+    else:
+        func = lambda guest: getattr(v, command)(guest)
+    results, errors = run_concurrently(func, guests, module.params.get('max_workers'))
+
+    if state:
+        res = {'changed': bool([r for r in results.values() if r['changed']]), 'results': results}
+    else:
+        res = { command: results }
+    if errors:
+        module.fail_json(msg="failed on guests %s" % ', '.join(sorted(errors)), errors=errors, **res)
+    return VIRT_SUCCESS, res
+
 def core(module):
 
     state      = module.params.get('state', None)
@@ -434,34 +602,17 @@ def core(module):
             res = { command: res }
         return VIRT_SUCCESS, res
 
+    if module.params.get('names') and (state or command in VM_COMMANDS):
+        return core_batch(module, v, module.params.get('names'), state, command)
+
     if state:
         if not guest:
             module.fail_json(msg = "state change requires a guest specified")
 
-        res['changed'] = False
-        if state == 'running':
-            if v.status(guest) is 'paused':
-                res['changed'] = True
-                res['msg'] = v.unpause(guest)
-            elif v.status(guest) is not 'running':
-                res['changed'] = True
-                res['msg'] = v.start(guest)
-        elif state == 'shutdown':
-            if v.status(guest) is not 'shutdown':
-                res['changed'] = True
-                res['msg'] = v.shutdown(guest)
-        elif state == 'destroyed':
-            if v.status(guest) is not 'shutdown':
-                res['changed'] = True
-                res['msg'] = v.destroy(guest)
-        elif state == 'paused':
-            if v.status(guest) is 'running':
-                res['changed'] = True
-                res['msg'] = v.pause(guest)
-        else:
+        if state not in ['running', 'shutdown', 'destroyed', 'paused']:
             module.fail_json(msg="unexpected state")
 
-        return VIRT_SUCCESS, res
+        return VIRT_SUCCESS, apply_state(v, guest, state, v.status(guest))
 
     if command:
         if command in VM_COMMANDS:
@@ -496,11 +647,15 @@ def main():
 
     module = AnsibleModule(argument_spec=dict(
         name = dict(aliases=['guest']),
+        names = dict(type='list'),
+        max_workers = dict(default=4, type='int'),
         state = dict(choices=['running', 'shutdown', 'destroyed', 'paused']),
         command = dict(choices=ALL_COMMANDS),
         uri = dict(default='qemu:///system'),
         xml = dict(),
-    ))
+    ),
+        mutually_exclusive=[['name', 'names']],
+    )
 
     if not HAS_VIRT:
         module.fail_json(
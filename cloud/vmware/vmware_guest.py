@@ -277,7 +277,7 @@ except ImportError:
 HAS_PYVMOMI = False
 try:
     import pyVmomi
-    from pyVmomi import vim
+    from pyVmomi import vim, vmodl
     HAS_PYVMOMI = True
 except ImportError:
     pass
@@ -300,128 +300,69 @@ class PyVmomiHelper(object):
         self.si = None
         self.smartconnect()
         self.datacenter = None
-        self.folders = None
-        self.foldermap = None
+        self.inventory = None
 
     def smartconnect(self):
         self.content = connect_to_api(self.module)
 
-    def _build_folder_tree(self, folder, tree={}, treepath=None):
-
-        tree = {'virtualmachines': [],
-                        'subfolders': {},
-                        'vimobj': folder,
-                        'name': folder.name}
-
-        children = None
-        if hasattr(folder, 'childEntity'):
-            children = folder.childEntity
-
-        if children:
-            for child in children:
-                if child == folder or child in tree:
-                    continue
-                if isinstance(child, vim.Folder):
-                    ctree = self._build_folder_tree(child)
-                    tree['subfolders'][child] = dict.copy(ctree)
-                elif isinstance(child, vim.VirtualMachine):
-                    tree['virtualmachines'].append(child)
-        else:
-            if isinstance(folder, vim.VirtualMachine):
-                return folder
-        return tree
+    def get_datacenter(self):
+        self.datacenter = get_obj(self.content, [vim.Datacenter], 
+                                   self.params['datacenter'])
 
+    def get_inventory_index(self):
 
-    def _build_folder_map(self, folder, vmap={}, inpath='/'):
+        ''' Index vms by name, and folders by path, in one property collector pass '''
 
-        ''' Build a searchable index for vms+uuids+folders '''
+        if self.inventory is not None:
+            return self.inventory
 
-        if isinstance(folder, tuple):
-            folder = folder[1]
+        objects = list(retrieve_properties(self.content, INVENTORY_PROPERTIES))
+        props = dict(objects)
 
-        if not 'names' in vmap:
-            vmap['names'] = {}
-        if not 'uuids' in vmap:
-            vmap['uuids'] = {}
-        if not 'paths' in vmap:
-            vmap['paths'] = {}
+        # (datacenter, /vm/foo/bar like folder path) of every object, relative
+        # to its datacenter, without reading the parents
+        located = {}
 
-        if inpath == '/':
-            thispath = '/vm'
-        else:
-            thispath = os.path.join(inpath, folder['name'])
-
-        if thispath not in vmap['paths']:
-            vmap['paths'][thispath] = []
-
-        # helpful for isolating folder objects later on
-        if not 'path_by_fvim' in vmap:
-            vmap['path_by_fvim'] = {}
-        if not 'fvim_by_path' in vmap:
-            vmap['fvim_by_path'] = {}
-        # store object by path and store path by object
-        vmap['fvim_by_path'][thispath] = folder['vimobj']
-        vmap['path_by_fvim'][folder['vimobj']] = thispath
-
-        # helpful for isolating vm objects later on
-        if not 'path_by_vvim' in vmap:
-            vmap['path_by_vvim'] = {}
-        if not 'vvim_by_path' in vmap:
-            vmap['vvim_by_path'] = {}
-        if thispath not in vmap['vvim_by_path']:
-            vmap['vvim_by_path'][thispath] = []
-    
-
-        for item in folder.items():
-            k = item[0]
-            v = item[1]
-
-            if k == 'name':
-                pass
-            elif k == 'subfolders':
-                for x in v.items():
-                    vmap = self._build_folder_map(x, vmap=vmap, inpath=thispath)
-            elif k == 'virtualmachines':
-                for x in v:
-                    if not x.config.name in vmap['names']:
-                        vmap['names'][x.config.name] = []
-                    vmap['names'][x.config.name].append(x.config.uuid)
-                    vmap['uuids'][x.config.uuid] = x.config.name
-                    vmap['paths'][thispath].append(x.config.uuid)
-
-                    if x not in vmap['vvim_by_path'][thispath]:
-                        vmap['vvim_by_path'][thispath].append(x)
-                    if x not in vmap['path_by_vvim']:
-                        vmap['path_by_vvim'][x] = thispath
-        return vmap
-
-    def getfolders(self):
+        def locate(obj):
+            if obj not in located:
+                parent = props[obj].get('parent')
+                if parent in props:
+                    datacenter, path = locate(parent)
+                else:
+                    datacenter, path = None, ''
+                if isinstance(obj, vim.Datacenter):
+                    # folders holding the datacenter are not part of its paths
+                    datacenter, path = obj, ''
+                elif isinstance(obj, vim.Folder):
+                    path = '%s/%s' % (path, props[obj]['name'])
+                located[obj] = (datacenter, path)
+            return located[obj]
+
+        self.inventory = {'names': {}, 'folders': [], 'located': located}
+        for obj, obj_props in objects:
+            datacenter, path = locate(obj)
+            if isinstance(obj, vim.VirtualMachine):
+                self.inventory['names'].setdefault(obj_props['name'], []).append(obj)
+            elif isinstance(obj, vim.Folder):
+                self.inventory['folders'].append((datacenter, path, obj))
+
+        return self.inventory
+
+    def find_folders(self, path, exact=True):
+
+        ''' Return (path, folder) of the datacenter's vm folders matching or ending with path '''
 
         if not self.datacenter:
             self.get_datacenter()
-        self.folders = self._build_folder_tree(self.datacenter.vmFolder)
-        self.folder_map = self._build_folder_map(self.folders)
-        return (self.folders, self.folder_map)
-
-    def compile_folder_path_for_object(self, vobj):
-        ''' make a /vm/foo/bar/baz like folder path for an object '''
-        paths = []
-        if isinstance(vobj, vim.Folder):
-            paths.append(vobj.name)
-
-        thisobj = vobj
-        while hasattr(thisobj, 'parent'):
-            thisobj = thisobj.parent
-            if isinstance(thisobj, vim.Folder):
-                paths.append(thisobj.name)
-        paths.reverse()
-        if paths[0] == 'Datacenters':
-            paths.remove('Datacenters')
-        return '/' + '/'.join(paths)
 
-    def get_datacenter(self):
-        self.datacenter = get_obj(self.content, [vim.Datacenter], 
-                                   self.params['datacenter'])
+        matches = []
+        for datacenter, folder_path, folder in self.get_inventory_index()['folders']:
+            # only the vmFolder tree, host/datastore/network folders cannot hold vms
+            if datacenter != self.datacenter or not (folder_path == '/vm' or folder_path.startswith('/vm/')):
+                continue
+            if folder_path == path or (not exact and folder_path.endswith(path)):
+                matches.append((folder_path, folder))
+        return matches
 
     def getvm(self, name=None, uuid=None, folder=None, name_match=None):
 
@@ -440,23 +381,21 @@ class PyVmomiHelper(object):
             if self.params['folder'].endswith('/'):
                 self.params['folder'] = self.params['folder'][0:-1]
 
-            # Build the absolute folder path to pass into the search method
+            # Build the datacenter relative folder path, and the absolute
+            # one to pass into the search method
             if self.params['folder'].startswith('/vm'):
-                searchpath = '%s' % self.params['datacenter']
-                searchpath += self.params['folder']
+                folder_path = self.params['folder']
             elif self.params['folder'].startswith('/'):
-                searchpath = '%s' % self.params['datacenter']
-                searchpath += '/vm' + self.params['folder']
+                folder_path = '/vm' + self.params['folder']
             else:
                 # need to look for matching absolute path
-                if not self.folders:
-                    self.getfolders()
-                paths = self.folder_map['paths'].keys()
-                paths = [x for x in paths if x.endswith(self.params['folder'])]
+                paths = [x[0] for x in self.find_folders(self.params['folder'], exact=False)]
                 if len(paths) > 1:
                     self.module.fail_json(msg='%s matches more than one folder. Please use the absolute path starting with /vm/' % self.params['folder'])
                 elif paths:
-                    searchpath = paths[0]
+                    folder_path = paths[0]
+            if folder_path:
+                searchpath = '%s%s' % (self.params['datacenter'], folder_path)
 
             if searchpath:
                 # get all objects for this path ...
@@ -473,43 +412,28 @@ class PyVmomiHelper(object):
 
         if not vm:
 
-            # FIXME - this is unused if folder has a default value
-            vmList = get_all_objs(self.content, [vim.VirtualMachine])
+            index = self.get_inventory_index()
+            matches = index['names'].get(name, [])
 
             # narrow down by folder
-            if folder:
-                if not self.folders:
-                    self.getfolders()
-
-                # compare the folder path of each VM against the search path
-                for item in vmList.items():
-                    vobj = item[0]
-                    if not isinstance(vobj.parent, vim.Folder):
-                        continue
-                    if self.compile_folder_path_for_object(vobj) == searchpath:
-                        return vobj
-
-            if name_match:
-                if name_match == 'first':
-                    vm = get_obj(self.content, [vim.VirtualMachine], name)
-                elif name_match == 'last':
-                    matches = []
-                    vmList = get_all_objs(self.content, [vim.VirtualMachine])
-                    for thisvm in vmList:
-                        if thisvm.config.name == name:
-                            matches.append(thisvm)
-                    if matches:
-                        vm = matches[-1]
-            else:            
-                matches = []
-                vmList = get_all_objs(self.content, [vim.VirtualMachine])
-                for thisvm in vmList:
-                    if thisvm.config.name == name:
-                        matches.append(thisvm)
-                    if len(matches) > 1:
-                        module.fail_json(msg='more than 1 vm exists by the name %s. Please specify a uuid, or a folder, or a datacenter or name_match' % name)
-                    if matches:
-                        vm = matches[0]
+            if folder and folder_path:
+                if not self.datacenter:
+                    self.get_datacenter()
+                for thisvm in matches:
+                    if index['located'][thisvm] == (self.datacenter, folder_path):
+                        return thisvm
+
+            if name_match == 'first':
+                if matches:
+                    vm = matches[0]
+            elif name_match == 'last':
+                if matches:
+                    vm = matches[-1]
+            else:
+                if len(matches) > 1:
+                    self.module.fail_json(msg='more than 1 vm exists by the name %s. Please specify a uuid, or a folder, or a datacenter or name_match' % name)
+                if matches:
+                    vm = matches[0]
 
         return vm
 
@@ -654,14 +578,9 @@ class PyVmomiHelper(object):
         if not datacenter:
             self.module.fail_json(msg='No datacenter named %s was found' % self.params['datacenter'])
 
-        if not self.foldermap:
-            self.folders, self.foldermap = self.getfolders()
-
         # find matching folders
-        if self.params['folder'].startswith('/'):
-            folders = [x for x in self.foldermap['fvim_by_path'].items() if x[0] == self.params['folder']]
-        else:
-            folders = [x for x in self.foldermap['fvim_by_path'].items() if x[0].endswith(self.params['folder'])]
+        folders = self.find_folders(self.params['folder'],
+                                    exact=self.params['folder'].startswith('/'))
 
         # throw error if more than one match or no matches
         if len(folders) == 0:
@@ -925,23 +844,21 @@ class PyVmomiHelper(object):
         # https://www.vmware.com/support/developer/vc-sdk/visdk25pubs/ReferenceGuide/vim.Task.html
         # https://www.vmware.com/support/developer/vc-sdk/visdk25pubs/ReferenceGuide/vim.TaskInfo.html
         # https://github.com/virtdevninja/pyvmomi-community-samples/blob/master/samples/tools/tasks.py
-        while task.info.state not in ['success', 'error']:
-            time.sleep(1)
-
-    def wait_for_vm_ip(self, vm, poll=100, sleep=5):            
-        ips = None
-        facts = {}
-        thispoll = 0
-        while not ips and thispoll <= poll:
-            newvm = self.getvm(uuid=vm.config.uuid)
-            facts = self.gather_facts(newvm)
-            if facts['ipv4'] or facts['ipv6']:
-                ips = True
-            else:
-                time.sleep(sleep)
-                thispoll += 1
+        self.wait_for_tasks([task])
 
-        return facts
+    def wait_for_tasks(self, tasks):
+        ''' Block until every task has finished, vcenter pushes the state changes '''
+        wait_for_updates(self.content, tasks, ['info.state'],
+                         lambda values: values.get('info.state') in ['success', 'error'])
+
+    def wait_for_vm_ip(self, vm, poll=100, sleep=5):
+        self.wait_for_vm_ips([vm], timeout=poll * sleep)
+        return self.gather_facts(vm)
+
+    def wait_for_vm_ips(self, vms, timeout=500):
+        ''' Block until every vm reports an ip address or the timeout expires '''
+        has_ip = lambda values: [ip for nic in values.get('guest.net') or [] for ip in nic.ipAddress if ip]
+        return wait_for_updates(self.content, vms, ['guest.net'], has_ip, timeout)
 
 
     def fetch_file_from_guest(self, vm, username, password, src, dest):
@@ -1201,6 +1118,98 @@ class PyVmomiHelper(object):
 
         return result
 
+# Properties read by the inventory index for each type of managed entity
+INVENTORY_PROPERTIES = {
+    'Datacenter': ['name', 'parent'],
+    'Folder': ['name', 'parent'],
+    'VirtualMachine': ['name', 'parent'],
+}
+
+
+def retrieve_properties(content, properties):
+    """
+    Yield (object, properties) of every object of the types in properties,
+    reading only the listed property paths in as few calls as possible
+    """
+    vimtypes = [getattr(vim, x) for x in properties]
+    collector = content.propertyCollector
+    view = content.viewManager.CreateContainerView(content.rootFolder, vimtypes, True)
+    try:
+        traversal_spec = vmodl.query.PropertyCollector.TraversalSpec(
+            name='traverseEntities', path='view', skip=False, type=vim.view.ContainerView)
+        obj_spec = vmodl.query.PropertyCollector.ObjectSpec(
+            obj=view, skip=True, selectSet=[traversal_spec])
+        prop_specs = [vmodl.query.PropertyCollector.PropertySpec(type=getattr(vim, x), pathSet=y, all=False)
+                      for (x, y) in properties.items()]
+        filter_spec = vmodl.query.PropertyCollector.FilterSpec(
+            objectSet=[obj_spec], propSet=prop_specs)
+        options = vmodl.query.PropertyCollector.RetrieveOptions()
+
+        result = collector.RetrievePropertiesEx([filter_spec], options)
+        while result:
+            for obj_content in result.objects:
+                yield obj_content.obj, dict((prop.name, prop.val) for prop in obj_content.propSet)
+            if not result.token:
+                break
+            result = collector.ContinueRetrievePropertiesEx(token=result.token)
+    finally:
+        view.Destroy()
+
+
+def wait_for_updates(content, objects, paths, is_done, timeout=None):
+    """
+    Watch the property paths of all objects with a property collector filter
+    until is_done returns true for the values of each of them or the timeout
+    (in seconds) expires. Returns the last known values per object.
+    """
+    # a private collector keeps the filter and its update versions separate
+    # from any other user of the session's collector
+    collector = content.propertyCollector.CreatePropertyCollector()
+    types = []
+    for obj in objects:
+        if obj.__class__ not in types:
+            types.append(obj.__class__)
+    filter_spec = vmodl.query.PropertyCollector.FilterSpec(
+        objectSet=[vmodl.query.PropertyCollector.ObjectSpec(obj=obj, skip=False) for obj in objects],
+        propSet=[vmodl.query.PropertyCollector.PropertySpec(type=x, pathSet=paths, all=False) for x in types])
+    property_filter = collector.CreateFilter(filter_spec, partialUpdates=False)
+
+    values = dict((obj, {}) for obj in objects)
+    pending = list(objects)
+    version = ''
+    deadline = None
+    if timeout is not None:
+        deadline = time.time() + timeout
+    try:
+        while pending:
+            options = vmodl.query.PropertyCollector.WaitOptions()
+            if deadline is not None:
+                remaining = int(deadline - time.time())
+                if remaining <= 0:
+                    break
+                options.maxWaitSeconds = remaining
+
+            update = collector.WaitForUpdatesEx(version, options)
+            if update is None:
+                # maxWaitSeconds expired without any change
+                continue
+            version = update.version
+            for filter_update in update.filterSet:
+                for obj_update in filter_update.objectSet:
+                    for change in obj_update.changeSet:
+                        if change.op == 'remove':
+                            values[obj_update.obj].pop(change.name, None)
+                        else:
+                            values[obj_update.obj][change.name] = change.val
+
+            pending = [obj for obj in pending if not is_done(values[obj])]
+    finally:
+        property_filter.Destroy()
+        collector.Destroy()
+
+    return values
+
+
 def get_obj(content, vimtype, name):
     """
     Return an object by name, if name is None the
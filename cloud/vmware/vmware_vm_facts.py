@@ -31,6 +31,21 @@ notes:
 requirements:
     - "python >= 2.6"
     - PyVmomi
+options:
+    key:
+        description:
+            - Which attribute of the virtual machine the returned dictionary is keyed by.
+            - Virtual machine names do not have to be unique across datacenters and folders, the BIOS UUID is.
+        required: false
+        default: name
+        choices: [ 'name', 'uuid' ]
+        version_added: "2.3"
+    page_size:
+        description:
+            - Maximum number of virtual machines retrieved by the property collector in one call.
+        required: false
+        default: 1000
+        version_added: "2.3"
 extends_documentation_fragment: vmware.documentation
 '''
 
@@ -41,6 +56,14 @@ EXAMPLES = '''
     hostname: esxi_or_vcenter_ip_or_hostname
     username: username
     password: password
+
+- name: Gather all registered virtual machines keyed by their UUID
+  local_action:
+    module: vmware_vm_facts
+    hostname: esxi_or_vcenter_ip_or_hostname
+    username: username
+    password: password
+    key: uuid
 '''
 
 try:
@@ -50,34 +73,84 @@ except ImportError:
     HAS_PYVMOMI = False
 
 
-# https://github.com/vmware/pyvmomi-community-samples/blob/master/samples/getallvms.py
-def get_all_virtual_machines(content):
-    virtual_machines = get_all_objs(content, [vim.VirtualMachine])
-    _virtual_machines = {}
+# Property paths fetched for every virtual machine, mapped to the returned keys
+VM_PROPERTIES = {
+    'name': 'name',
+    'config.guestFullName': 'guest_fullname',
+    'config.uuid': 'uuid',
+    'runtime.powerState': 'power_state',
+    'guest.ipAddress': 'ip_address',
+}
+
+
+def retrieve_properties(content, obj_type, path_set, page_size=1000):
+    """
+    Yield (object, properties) for every object of obj_type in the inventory.
+    Only the properties in path_set are fetched, in pages of page_size objects,
+    so the whole inventory is read in a few calls instead of one per property.
+    """
+    collector = content.propertyCollector
+    view = content.viewManager.CreateContainerView(content.rootFolder, [obj_type], True)
+    try:
+        traversal_spec = vmodl.query.PropertyCollector.TraversalSpec(
+            name='traverseEntities', path='view', skip=False, type=vim.view.ContainerView)
+        obj_spec = vmodl.query.PropertyCollector.ObjectSpec(
+            obj=view, skip=True, selectSet=[traversal_spec])
+        prop_spec = vmodl.query.PropertyCollector.PropertySpec(
+            type=obj_type, pathSet=list(path_set), all=False)
+        filter_spec = vmodl.query.PropertyCollector.FilterSpec(
+            objectSet=[obj_spec], propSet=[prop_spec])
+        options = vmodl.query.PropertyCollector.RetrieveOptions(maxObjects=page_size)
+
+        result = collector.RetrievePropertiesEx([filter_spec], options)
+        while result:
+            for obj_content in result.objects:
+                yield obj_content.obj, dict((prop.name, prop.val) for prop in obj_content.propSet)
+            if not result.token:
+                break
+            result = collector.ContinueRetrievePropertiesEx(token=result.token)
+    finally:
+        view.Destroy()
+
+
+def get_custom_field_names(content):
+    if content.customFieldsManager is None:
+        # Standalone ESXi hosts have no custom fields
+        return {}
+    return dict((field.key, field.name) for field in content.customFieldsManager.field)
+
+
+def get_all_virtual_machines(content, key='name', page_size=1000):
+    field_names = get_custom_field_names(content)
+    path_set = list(VM_PROPERTIES)
+    if field_names:
+        path_set.append('customValue')
 
-    for vm in virtual_machines:
-        _ip_address = ""
-        summary = vm.summary
-        if summary.guest is not None:
-            _ip_address = summary.guest.ipAddress
-            if _ip_address is None:
-                _ip_address = ""
-
-        virtual_machine = {
-            summary.config.name: {
-                "guest_fullname": summary.config.guestFullName,
-                "power_state": summary.runtime.powerState,
-                "ip_address": _ip_address
-            }
-        }
-
-        _virtual_machines.update(virtual_machine)
+    _virtual_machines = {}
+    for vm, props in retrieve_properties(content, vim.VirtualMachine, path_set, page_size):
+        virtual_machine = dict((name, props.get(path)) for (path, name) in VM_PROPERTIES.items())
+        if virtual_machine['ip_address'] is None:
+            virtual_machine['ip_address'] = ""
+        virtual_machine['custom_fields'] = dict(
+            (field_names[value.key], value.value) for value in props.get('customValue', [])
+            if value.key in field_names
+        )
+
+        key_value = virtual_machine.pop(key)
+        if key_value is None:
+            # Inaccessible virtual machines have no configuration to be keyed by
+            continue
+        _virtual_machines[key_value] = virtual_machine
     return _virtual_machines
 
 
 def main():
 
     argument_spec = vmware_argument_spec()
+    argument_spec.update(
+        key=dict(default='name', choices=['name', 'uuid']),
+        page_size=dict(default=1000, type='int'),
+    )
     module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
 
     if not HAS_PYVMOMI:
@@ -85,7 +158,8 @@ def main():
 
     try:
         content = connect_to_api(module)
-        _virtual_machines = get_all_virtual_machines(content)
+        _virtual_machines = get_all_virtual_machines(content, module.params['key'],
+                                                     module.params['page_size'])
         module.exit_json(changed=False, virtual_machines=_virtual_machines)
     except vmodl.RuntimeFault as runtime_fault:
         module.fail_json(msg=runtime_fault.msg)
@@ -41,7 +41,10 @@ options:
     required: true
   src:
     description:
-      - The file to push to vCenter
+      - The file to push to vCenter.
+      - Since Ansible 2.3 this can be a list of files, they are then pushed into the C(path) directory
+        under their own names, up to C(max_workers) at a time. The files must have distinct names.
+      - A string is always taken as a single file, even if it contains commas.
     required: true
   datacenter:
     description:
@@ -54,6 +57,7 @@ options:
   path:
     description:
       - The file to push to the datastore on the vCenter server.
+      - When C(src) lists more than one file, the directory on the datastore to push them to.
     required: true
   validate_certs:
     description:
@@ -62,11 +66,34 @@ options:
     required: false
     default: 'yes'
     choices: ['yes', 'no']
+  chunk_size:
+    description:
+      - Size in bytes of the blocks the files are read and sent in, when they are streamed.
+    required: false
+    default: 1048576
+    version_added: "2.3"
+  retries:
+    description:
+      - Number of times the upload of a file is retried after its connection failed.
+      - The datastore does not accept partial uploads, so a retried file is sent again from its start.
+      - A connection reset by the server, which means the file is in use, is not retried.
+    required: false
+    default: 3
+    version_added: "2.3"
+  max_workers:
+    description:
+      - Maximum number of files uploaded at the same time, each streamed upload uses its own keep-alive connection.
+    required: false
+    default: 4
+    version_added: "2.3"
 
 notes:
   - "This module ought to be run from a system that can access vCenter directly and has the file to transfer.
     It can be the normal remote target or you can change it either by using C(transport: local) or using C(delegate_to)."
   - Tested on vSphere 5.5
+  - Files are streamed over keep-alive connections opened directly to C(host). When an https proxy is
+    configured for C(host), or with python < 2.7.9, each file is instead sent in one request through
+    Ansible's URL handling, which honors the proxy and validates certificates on older pythons.
 '''
 
 EXAMPLES = '''
@@ -74,18 +101,72 @@ EXAMPLES = '''
   transport: local
 - vsphere_copy: host=vhost login=vuser password=vpass src=/other/local/file datacenter='DC2 Someplace' datastore=datastore2 path=other/remote/file
   delegate_to: other_system
+- vsphere_copy:
+    host: vhost
+    login: vuser
+    password: vpass
+    src:
+      - /some/local/template.vmdk
+      - /some/local/template-flat.vmdk
+    datacenter: DC1 Someplace
+    datastore: datastore1
+    path: templates/template
+  transport: local
 '''
 
-import atexit
-import urllib
-import mmap
+RETURN = '''
+size:
+    description: Total number of bytes uploaded
+    returned: success
+    type: int
+    sample: 1073741824
+duration:
+    description: Time in seconds spent uploading all files
+    returned: success
+    type: float
+    sample: 12.3
+bytes_per_sec:
+    description: Overall upload throughput
+    returned: success
+    type: int
+    sample: 87295000
+files:
+    description: Destination url, size, duration, throughput and number of attempts of every uploaded file
+    returned: success
+    type: list
+    sample: [{"src": "/some/local/file", "url": "https://vhost/folder/some/remote/file?dsName=datastore1",
+              "size": 1073741824, "duration": 12.3, "bytes_per_sec": 87295000, "attempts": 1,
+              "status": 201, "reason": "Created"}]
+'''
+
+import base64
 import errno
+import mmap
+import os
 import socket
+import ssl
+import threading
+import time
+import urllib
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.pycompat24 import get_exception
+from ansible.module_utils.six.moves import http_client
+from ansible.module_utils.six.moves.urllib.error import HTTPError, URLError
+from ansible.module_utils.six.moves.urllib.request import getproxies, proxy_bypass
 from ansible.module_utils.urls import open_url
 
+# Seconds a single send or receive may stall before the connection is considered dead
+SOCKET_TIMEOUT = 300
+
+
+class UploadError(Exception):
+    def __init__(self, msg, **kwargs):
+        Exception.__init__(self, msg)
+        self.msg = msg
+        self.details = kwargs
+
+
 def vmware_path(datastore, datacenter, path):
     ''' Constructs a URL path that VSphere accepts reliably '''
     path = "/folder/%s" % path.lstrip("/")
@@ -100,6 +181,175 @@ def vmware_path(datastore, datacenter, path):
     params = urllib.urlencode(params)
     return "%s?%s" % (path, params)
 
+def can_stream(host):
+    '''
+    Streaming needs ssl contexts (python >= 2.7.9) and a direct connection,
+    open_url takes care of proxies and older pythons
+    '''
+    if not hasattr(ssl, 'create_default_context'):
+        return False
+    return not getproxies().get('https') or bool(proxy_bypass(host))
+
+def connect(host, validate_certs):
+    ''' Opens a keep-alive connection reused for all uploads of one worker '''
+    if validate_certs:
+        context = ssl.create_default_context()
+    else:
+        context = ssl._create_unverified_context()
+    return http_client.HTTPSConnection(host, timeout=SOCKET_TIMEOUT, context=context)
+
+def upload_file(conn, host, src, remote_path, auth, chunk_size):
+    ''' Streams src to the datastore in chunk_size blocks over conn '''
+    size = os.path.getsize(src)
+    start = time.time()
+
+    conn.putrequest('PUT', remote_path, skip_accept_encoding=True)
+    conn.putheader('Authorization', 'Basic %s' % auth)
+    conn.putheader('Content-Type', 'application/octet-stream')
+    conn.putheader('Content-Length', str(size))
+    conn.endheaders()
+
+    fd = open(src, 'rb')
+    try:
+        while True:
+            chunk = fd.read(chunk_size)
+            if not chunk:
+                break
+            conn.send(chunk)
+    finally:
+        fd.close()
+
+    r = conn.getresponse()
+    # the body has to be consumed before the connection can be reused
+    body = r.read()
+    duration = time.time() - start
+    url = 'https://%s%s' % (host, remote_path)
+
+    if not 200 <= r.status < 300:
+        chunked = int(r.getheader('transfer-encoding', '').lower() == 'chunked')
+        raise UploadError('Failed to upload', errno=None, status=r.status, reason=r.reason,
+                          length=r.getheader('content-length'), headers=dict(r.getheaders()),
+                          chunked=chunked, url=url)
+
+    return dict(src=src, url=url, status=r.status, reason=r.reason, size=size,
+                duration=duration, bytes_per_sec=int(size / max(duration, 0.001)))
+
+def upload_file_open_url(host, src, remote_path, login, password, validate_certs):
+    ''' Sends src to the datastore in one request through open_url '''
+    size = os.path.getsize(src)
+    start = time.time()
+    url = 'https://%s%s' % (host, remote_path)
+
+    headers = {
+        "Content-Type": "application/octet-stream",
+        "Content-Length": str(size),
+    }
+
+    fd = open(src, 'rb')
+    try:
+        data = ''
+        if size:
+            data = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            r = open_url(url, data=data, headers=headers, method='PUT',
+                    url_username=login, url_password=password, validate_certs=validate_certs,
+                    force_basic_auth=True, timeout=SOCKET_TIMEOUT)
+        except HTTPError:
+            e = get_exception()
+            raise UploadError('Failed to upload', errno=None, status=e.code, reason=str(e.msg),
+                              headers=dict(e.headers or {}), url=url)
+        finally:
+            if size:
+                data.close()
+    finally:
+        fd.close()
+
+    duration = time.time() - start
+    return dict(src=src, url=url, status=r.getcode(), reason=r.msg, size=size,
+                duration=duration, bytes_per_sec=int(size / max(duration, 0.001)))
+
+def upload_with_retries(upload, url, retries, reset=None):
+    ''' Calls upload until it succeeds or failed to connect retries times more '''
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            result = upload()
+            result['attempts'] = attempt
+            return result
+        except (socket.error, http_client.HTTPException, URLError):
+            e = get_exception()
+            # start over on a fresh connection, the datastore keeps no partial upload
+            if reset:
+                reset()
+            error_code = getattr(e, 'errno', None)
+            if error_code is None and isinstance(e, URLError):
+                error_code = getattr(e.reason, 'errno', None)
+            if error_code == errno.ECONNRESET:
+                # VSphere resets connection if the file is in use and cannot be replaced,
+                # which another attempt does not change
+                raise UploadError('Failed to upload, image probably in use', status=None, errno=error_code,
+                                  reason=str(e), url=url)
+            if attempt <= retries:
+                time.sleep(min(2 ** attempt, 30))
+                continue
+            raise UploadError(str(e), status=None, errno=error_code, reason=str(e), url=url)
+
+def upload_files(uploads, host, login, password, validate_certs, chunk_size, retries, max_workers):
+    ''' Uploads (src, remote_path) pairs, up to max_workers at a time '''
+    auth = base64.b64encode(('%s:%s' % (login, password)).encode('utf-8')).decode('ascii')
+    stream = can_stream(host)
+    results = [None] * len(uploads)
+    pending = list(range(len(uploads)))
+    pending.reverse()
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        conn = None
+        try:
+            try:
+                if stream:
+                    conn = connect(host, validate_certs)
+                while not errors:
+                    lock.acquire()
+                    try:
+                        if not pending:
+                            return
+                        index = pending.pop()
+                    finally:
+                        lock.release()
+                    src, remote_path = uploads[index]
+                    url = 'https://%s%s' % (host, remote_path)
+                    if stream:
+                        results[index] = upload_with_retries(
+                            lambda: upload_file(conn, host, src, remote_path, auth, chunk_size),
+                            url, retries, conn.close)
+                    else:
+                        results[index] = upload_with_retries(
+                            lambda: upload_file_open_url(host, src, remote_path, login, password, validate_certs),
+                            url, retries)
+            except Exception:
+                errors.append(get_exception())
+        finally:
+            if conn is not None:
+                conn.close()
+
+    threads = []
+    for i in range(max(1, min(max_workers, len(uploads)))):
+        t = threading.Thread(target=worker)
+        t.daemon = True
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+
+    if errors:
+        raise errors[0]
+    if None in results:
+        raise UploadError('Failed to upload %s' % ', '.join([uploads[i][0] for i in range(len(uploads)) if results[i] is None]))
+    return results
+
 def main():
 
     module = AnsibleModule(
@@ -107,11 +357,14 @@ def main():
             host = dict(required=True, aliases=[ 'hostname' ]),
             login = dict(required=True, aliases=[ 'username' ]),
             password = dict(required=True, no_log=True),
-            src = dict(required=True, aliases=[ 'name' ]),
+            src = dict(required=True, type='raw', aliases=[ 'name' ]),
             datacenter = dict(required=True),
             datastore = dict(required=True),
             dest = dict(required=True, aliases=[ 'path' ]),
             validate_certs = dict(required=False, default=True, type='bool'),
+            chunk_size = dict(required=False, default=1048576, type='int'),
+            retries = dict(required=False, default=3, type='int'),
+            max_workers = dict(required=False, default=4, type='int'),
         ),
         # Implementing check-mode using HEAD is impossible, since size/date is not 100% reliable
         supports_check_mode = False,
@@ -126,52 +379,51 @@ def main():
     dest = module.params.get('dest')
     validate_certs = module.params.get('validate_certs')
 
-    fd = open(src, "rb")
-    atexit.register(fd.close)
+    # A plain string is one path, as before src accepted a list
+    if isinstance(src, basestring):
+        src = [src]
+    elif not isinstance(src, list) or not src:
+        module.fail_json(msg='src must be a file name or a non-empty list of file names')
+    else:
+        src = [str(path) for path in src]
 
-    data = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
-    atexit.register(data.close)
+    for path in src:
+        if not os.path.isfile(path):
+            module.fail_json(msg='Source %s does not exist or is not a file' % path)
 
-    remote_path = vmware_path(datastore, datacenter, dest)
-    url = 'https://%s%s' % (host, remote_path)
+    if len(src) > 1:
+        names = {}
+        for path in src:
+            name = os.path.basename(path)
+            if name in names:
+                module.fail_json(msg='Sources %s and %s would both be pushed to %s/%s' % (names[name], path, dest.rstrip('/'), name))
+            names[name] = path
 
-    headers = {
-        "Content-Type": "application/octet-stream",
-        "Content-Length": str(len(data)),
-    }
+    if len(src) == 1:
+        uploads = [(src[0], vmware_path(datastore, datacenter, dest))]
+    else:
+        uploads = [(path, vmware_path(datastore, datacenter, '%s/%s' % (dest.rstrip('/'), os.path.basename(path))))
+                   for path in src]
 
+    start = time.time()
     try:
-        r = open_url(url, data=data, headers=headers, method='PUT',
-                url_username=login, url_password=password, validate_certs=validate_certs,
-                force_basic_auth=True)
-    except socket.error:
+        files = upload_files(uploads, host, login, password, validate_certs,
+                             module.params.get('chunk_size'), module.params.get('retries'),
+                             module.params.get('max_workers'))
+    except UploadError:
         e = get_exception()
-        if isinstance(e.args, tuple) and e[0] == errno.ECONNRESET:
-            # VSphere resets connection if the file is in use and cannot be replaced
-            module.fail_json(msg='Failed to upload, image probably in use', status=None, errno=e[0], reason=str(e), url=url)
-        else:
-            module.fail_json(msg=str(e), status=None, errno=e[0], reason=str(e), url=url)
+        module.fail_json(msg=e.msg, **e.details)
     except Exception:
         e = get_exception()
-        error_code = -1
-        try:
-            if isinstance(e[0], int):
-                error_code = e[0]
-        except KeyError:
-            pass
-        module.fail_json(msg=str(e), status=None, errno=error_code, reason=str(e), url=url)
-
-    status = r.getcode()
-    if 200 <= status < 300:
-        module.exit_json(changed=True, status=status, reason=r.msg, url=url)
-    else:
-        length = r.headers.get('content-length', None)
-        if r.headers.get('transfer-encoding', '').lower() == 'chunked':
-            chunked = 1
-        else:
-            chunked = 0
+        module.fail_json(msg=str(e), status=None, errno=getattr(e, 'errno', -1), reason=str(e))
+    duration = time.time() - start
 
-        module.fail_json(msg='Failed to upload', errno=None, status=status, reason=r.msg, length=length, headers=dict(r.headers), chunked=chunked, url=url)
+    size = sum([f['size'] for f in files])
+    result = dict(changed=True, files=files, size=size, duration=duration,
+                  bytes_per_sec=int(size / max(duration, 0.001)))
+    if len(files) == 1:
+        result.update(status=files[0]['status'], reason=files[0]['reason'], url=files[0]['url'])
+    module.exit_json(**result)
 
 if __name__ == '__main__':
     main()
@@ -40,8 +40,10 @@ options:
     required: true
   format:
     description:
-      - The type of compression to use. Can be 'gz', 'bz2', or 'zip'.
-    choices: [ 'gz', 'bz2', 'zip' ]
+      - The type of compression to use. Can be 'gz', 'bz2', 'xz', 'zst', 'tar' or 'zip'.
+      - C(zst) requires the C(zstd) command on the target host. C(xz) requires either the C(xz) command or
+        Python's lzma support.
+    choices: [ 'gz', 'bz2', 'xz', 'zst', 'tar', 'zip' ]
     default: 'gz'
   dest:
     description:
@@ -54,11 +56,32 @@ options:
     type: bool
     required: false
     default: false
+  threads:
+    description:
+      - Number of compression threads. When greater than 1, or 0 for one thread per CPU, tar archives and single
+        files are streamed through a parallel compressor found on the target host (C(pigz) for I(gz), C(pbzip2)
+        for I(bz2), C(xz -T) for I(xz) and C(zstd -T) for I(zst)).
+      - If no parallel compressor is installed, I(gz), I(bz2) and I(xz) fall back to single threaded compression
+        in Python. C(1) always compresses in Python, except for I(zst).
+    required: false
+    default: 0
+    version_added: "2.3"
+  manifest:
+    description:
+      - Keep a content manifest in C(<dest>.manifest) recording the path, size, modification time and mode of
+        every archived entry together with its hash, and the size and modification time of the archive itself.
+      - When the manifest matches the current source tree and the archive has not been modified, the archive is
+        left alone and C(changed=False) is reported without reading or compressing any file data.
+      - Only used when archiving multiple files or trees.
+    type: bool
+    required: false
+    default: false
+    version_added: "2.3"
 
 author: "Ben Doherty (@bendoh)"
 notes:
     - requires tarfile, zipfile, gzip, and bzip2 packages on target host
-    - can produce I(gzip), I(bzip2) and I(zip) compressed files or archives
+    - can produce I(gzip), I(bzip2), I(xz), I(zstd) and I(zip) compressed files or archives
 '''
 
 EXAMPLES = '''
@@ -78,6 +101,14 @@ EXAMPLES = '''
         - /path/wong/foo
     dest: /path/file.tar.bz2
     format: bz2
+
+# Archive a large log tree with zstd on all cores and skip the work when nothing changed
+- archive:
+    path: /var/log/app
+    dest: /backup/app-logs.tar.zst
+    format: zst
+    threads: 0
+    manifest: yes
 '''
 
 RETURN = '''
@@ -104,6 +135,10 @@ arcroot:
 expanded_paths:
     description: The list of matching paths from paths argument.
     type: list
+manifest:
+    description: The path of the content manifest kept next to the archive.
+    type: string
+    returned: when manifest=yes
 '''
 
 import os
@@ -112,17 +147,204 @@ import glob
 import shutil
 import gzip
 import bz2
-import filecmp
 import zipfile
 import tarfile
+import subprocess
+
+try:
+    import hashlib
+    sha1 = hashlib.sha1
+except ImportError:
+    import sha
+    sha1 = sha.new
+
+try:
+    import lzma
+    HAS_LZMA = True
+except ImportError:
+    HAS_LZMA = False
+
+try:
+    import json
+except ImportError:
+    try:
+        import simplejson as json
+    except ImportError:
+        # Let snippet from module_utils/basic.py return a proper error in this case
+        pass
+
+# Parallel compressors: command line for a given thread count (0 = all CPUs)
+COMPRESSORS = {
+    'gz': ('pigz', lambda n: n and ['-p', str(n)] or []),
+    'bz2': ('pbzip2', lambda n: n and ['-p%d' % n] or []),
+    'xz': ('xz', lambda n: ['-T%d' % n]),
+    'zst': ('zstd', lambda n: ['-q', '-T%d' % n]),
+}
+
+BLOCK_SIZE = 1024 * 1024
+
+
+class HashingReader(object):
+    '''File wrapper hashing the data as tarfile reads it, so every file is read only once.'''
+
+    def __init__(self, f):
+        self.f = f
+        self.hash = sha1()
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.hash.update(data)
+        return data
+
+    def hexdigest(self):
+        return self.hash.hexdigest()
+
+
+def compressor_command(module, format, threads):
+    '''Return the parallel compressor command for format, or None to compress in Python.'''
+    if format not in COMPRESSORS or (threads == 1 and format != 'zst'):
+        return None
+
+    name, thread_args = COMPRESSORS[format]
+    path = module.get_bin_path(name, format == 'zst')
+    if path is None:
+        return None
+
+    return [path, '-c'] + thread_args(threads)
+
+
+def scan_sources(archive_paths, arcroot, dest):
+    '''
+    List (fullpath, arcname, is_file) for everything that goes into the archive,
+    in archive order, using only directory listings.
+    '''
+    sources = []
+    match_root = re.compile('^%s' % re.escape(arcroot))
+    # Never archive the archive or its manifest
+    skip = [os.path.realpath(dest), os.path.realpath(dest + '.manifest')]
+    for path in archive_paths:
+        if os.path.isdir(path):
+            # Recurse into directories
+            for dirpath, dirnames, filenames in os.walk(path, topdown=True):
+                if not dirpath.endswith(os.sep):
+                    dirpath += os.sep
+
+                for dirname in dirnames:
+                    fullpath = dirpath + dirname
+                    sources.append((fullpath, match_root.sub('', fullpath), False))
+
+                for filename in filenames:
+                    fullpath = dirpath + filename
+                    if os.path.realpath(fullpath) not in skip:
+                        sources.append((fullpath, match_root.sub('', fullpath), True))
+        else:
+            sources.append((path, match_root.sub('', path), True))
+
+    return sources
+
+
+def stat_entries(sources):
+    '''Map arcname to [size, mtime, mode] from lstat of every source, keeping sub-second mtimes.'''
+    entries = {}
+    for fullpath, arcname, is_file in sources:
+        st = os.lstat(fullpath)
+        entries[arcname] = [st.st_size, st.st_mtime, st.st_mode]
+    return entries
+
+
+def read_manifest(manifest_path):
+    try:
+        f = open(manifest_path, 'r')
+        try:
+            return json.load(f)
+        finally:
+            f.close()
+    except (IOError, ValueError):
+        return None
+
+
+def manifest_matches(manifest, dest, format, entries):
+    '''True if the archive and every source entry are as recorded in manifest.'''
+    if not manifest or manifest.get('format') != format or not os.path.exists(dest):
+        return False
+
+    st = os.stat(dest)
+    if manifest.get('archive') != [st.st_size, st.st_mtime]:
+        return False
+
+    recorded = manifest.get('files', {})
+    if len(recorded) != len(entries):
+        return False
+    for arcname, entry in entries.items():
+        if arcname not in recorded or recorded[arcname][:3] != entry:
+            return False
+
+    return True
+
+
+def write_manifest(module, manifest_path, dest, format, entries, hashes):
+    st = os.stat(dest)
+    files = {}
+    for arcname, entry in entries.items():
+        files[arcname] = entry + [hashes.get(arcname)]
+    data = dict(format=format, archive=[st.st_size, st.st_mtime], files=files)
+
+    tmp_path = manifest_path + '.tmp'
+    try:
+        f = open(tmp_path, 'w')
+        try:
+            json.dump(data, f)
+        finally:
+            f.close()
+        module.atomic_move(tmp_path, manifest_path)
+    except (IOError, OSError):
+        e = get_exception()
+        module.fail_json(msg='Unable to write manifest %s: %s' % (manifest_path, str(e)))
+
+
+def add_to_archive(arcfile, format, fullpath, arcname, hashes):
+    '''Add one entry, recording the hash of regular files in hashes.'''
+    if format == 'zip':
+        arcfile.write(fullpath, arcname)
+        if not os.path.isdir(fullpath):
+            hashes[arcname] = 'crc32:%08x' % arcfile.getinfo(arcname).CRC
+        return
+
+    tarinfo = arcfile.gettarinfo(fullpath, arcname)
+    if tarinfo is None:
+        # Sockets and other unsupported file types are skipped, as in tarfile.add()
+        return
+    if tarinfo.isreg():
+        f = open(fullpath, 'rb')
+        try:
+            reader = HashingReader(f)
+            arcfile.addfile(tarinfo, reader)
+            hashes[arcname] = 'sha1:%s' % reader.hexdigest()
+        finally:
+            f.close()
+    else:
+        arcfile.addfile(tarinfo)
+
+
+def open_compressed(format, dest):
+    '''Open dest for writing compressed data in Python.'''
+    if format == 'gz':
+        return gzip.open(dest, 'wb')
+    elif format == 'bz2':
+        return bz2.BZ2File(dest, 'wb')
+    elif format == 'xz' and HAS_LZMA:
+        return lzma.LZMAFile(dest, 'wb')
+    raise OSError("Invalid format or no compressor available for %s" % format)
 
 def main():
     module = AnsibleModule(
         argument_spec = dict(
             path = dict(type='list', required=True),
-            format  = dict(choices=['gz', 'bz2', 'zip', 'tar'], default='gz', required=False),
+            format  = dict(choices=['gz', 'bz2', 'xz', 'zst', 'zip', 'tar'], default='gz', required=False),
             dest = dict(required=False, type='path'),
             remove = dict(required=False, default=False, type='bool'),
+            threads = dict(required=False, default=0, type='int'),
+            manifest = dict(required=False, default=False, type='bool'),
         ),
         add_file_common_args=True,
         supports_check_mode=True,
@@ -133,6 +355,9 @@ def main():
     paths = params['path']
     dest = params['dest']
     remove = params['remove']
+    threads = params['threads']
+    use_manifest = params['manifest']
+    manifest_path = None
 
     expanded_paths = []
     format = params['format']
@@ -205,7 +430,7 @@ def main():
     # No source files were found but the named archive exists: are we 'compress' or 'archive' now?
     if len(missing) == len(expanded_paths) and dest and os.path.exists(dest):
         # Just check the filename to know if it's an archive or simple compressed file
-        if re.search(r'(\.tar|\.tar\.gz|\.tgz|.tbz2|\.tar\.bz2|\.zip)$', os.path.basename(dest), re.IGNORECASE):
+        if re.search(r'(\.tar|\.tar\.gz|\.tgz|.tbz2|\.tar\.bz2|\.txz|\.tar\.xz|\.tar\.zst|\.zip)$', os.path.basename(dest), re.IGNORECASE):
             state = 'archive'
         else:
             state = 'compress'
@@ -227,80 +452,91 @@ def main():
         if os.path.lexists(dest):
             size = os.path.getsize(dest)
 
-        if state != 'archive':
+        up_to_date = False
+        if state != 'archive' and use_manifest:
+            manifest_path = '%s.manifest' % dest
+            sources = scan_sources(archive_paths, arcroot, dest)
+            entries = stat_entries(sources)
+            # Nothing changed since the archive was written: leave it alone,
+            # but keep reporting an incomplete source list as such
+            up_to_date = manifest_matches(read_manifest(manifest_path), dest, format, entries)
+            if up_to_date:
+                if state != 'incomplete':
+                    state = 'archive'
+                # Report the recorded files as archived, so remove still deletes them
+                successes.extend([fullpath for fullpath, arcname, is_file in sources if is_file])
+
+        if state != 'archive' and not up_to_date:
             if check_mode:
                 changed = True
 
             else:
+                if not use_manifest:
+                    sources = scan_sources(archive_paths, arcroot, dest)
+                hashes = {}
+                compressor = None
+                arcfile = None
                 try:
                     # Slightly more difficult (and less efficient!) compression using zipfile module
                     if format == 'zip':
                         arcfile = zipfile.ZipFile(dest, 'w', zipfile.ZIP_DEFLATED)
 
-                    # Easier compression using tarfile module
-                    elif format == 'gz' or format == 'bz2':
-                        arcfile = tarfile.open(dest, 'w|' + format)
-
-                    # Or plain tar archiving
+                    # Plain tar archiving
                     elif format == 'tar':
                         arcfile = tarfile.open(dest, 'w')
 
-                    match_root = re.compile('^%s' % re.escape(arcroot))
-                    for path in archive_paths:
-                        if os.path.isdir(path):
-                            # Recurse into directories
-                            for dirpath, dirnames, filenames in os.walk(path, topdown=True):
-                                if not dirpath.endswith(os.sep):
-                                    dirpath += os.sep
-
-                                for dirname in dirnames:
-                                    fullpath = dirpath + dirname
-                                    arcname = match_root.sub('', fullpath)
-
-                                    try:
-                                        if format == 'zip':
-                                            arcfile.write(fullpath, arcname)
-                                        else:
-                                            arcfile.add(fullpath, arcname, recursive=False)
-
-                                    except Exception:
-                                        e = get_exception()
-                                        errors.append('%s: %s' % (fullpath, str(e)))
-
-                                for filename in filenames:
-                                    fullpath = dirpath + filename
-                                    arcname = match_root.sub('', fullpath)
-
-                                    if not filecmp.cmp(fullpath, dest):
-                                        try:
-                                            if format == 'zip':
-                                                arcfile.write(fullpath, arcname)
-                                            else:
-                                                arcfile.add(fullpath, arcname, recursive=False)
-
-                                            successes.append(fullpath)
-                                        except Exception:
-                                            e = get_exception()
-                                            errors.append('Adding %s: %s' % (path, str(e)))
+                    else:
+                        command = compressor_command(module, format, threads)
+
+                        # Stream the tar through a parallel compressor
+                        if command:
+                            out = open(dest, 'wb')
+                            try:
+                                compressor = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=out)
+                            finally:
+                                out.close()
+                            arcfile = tarfile.open(fileobj=compressor.stdin, mode='w|')
+
+                        # Easier compression using tarfile module
                         else:
-                            if format == 'zip':
-                                arcfile.write(path, match_root.sub('', path))
-                            else:
-                                arcfile.add(path, match_root.sub('', path), recursive=False)
+                            arcfile = tarfile.open(dest, 'w|' + format)
 
-                            successes.append(path)
+                    for fullpath, arcname, is_file in sources:
+                        try:
+                            add_to_archive(arcfile, format, fullpath, arcname, hashes)
+                            if is_file:
+                                successes.append(fullpath)
+                        except Exception:
+                            e = get_exception()
+                            errors.append('Adding %s: %s' % (fullpath, str(e)))
+
+                    arcfile.close()
+                    arcfile = None
+                    if compressor:
+                        compressor.stdin.close()
+                        if compressor.wait() != 0:
+                            raise OSError('%s exited with %d' % (command[0], compressor.returncode))
+                        compressor = None
 
                 except Exception:
                     e = get_exception()
+                    if compressor:
+                        try:
+                            compressor.stdin.close()
+                        except IOError:
+                            pass
+                        compressor.wait()
                     return module.fail_json(msg='Error when writing %s archive at %s: %s' % (format == 'zip' and 'zip' or ('tar.' + format), dest, str(e)))
 
-                if arcfile:
-                    arcfile.close()
-                    state = 'archive'
+                state = 'archive'
 
                 if len(errors) > 0:
                     module.fail_json(msg='Errors when writing archive at %s: %s' % (dest, '; '.join(errors)))
 
+                if use_manifest:
+                    write_manifest(module, manifest_path, dest, format, entries, hashes)
+                    changed = True
+
         if state in ['archive', 'incomplete'] and remove:
             for path in successes:
                 try:
@@ -354,15 +590,16 @@ def main():
 
                     else:
                         f_in = open(path, 'rb')
+                        command = compressor_command(module, format, threads)
 
-                        if format == 'gz':
-                            f_out = gzip.open(dest, 'wb')
-                        elif format == 'bz2':
-                            f_out = bz2.BZ2File(dest, 'wb')
+                        if command:
+                            f_out = open(dest, 'wb')
+                            rc = subprocess.call(command, stdin=f_in, stdout=f_out)
+                            if rc != 0:
+                                raise OSError('%s exited with %d' % (command[0], rc))
                         else:
-                            raise OSError("Invalid format")
-
-                        shutil.copyfileobj(f_in, f_out)
+                            f_out = open_compressed(format, dest)
+                            shutil.copyfileobj(f_in, f_out, BLOCK_SIZE)
 
                     successes.append(path)
 
@@ -396,7 +633,11 @@ def main():
 
     changed = module.set_fs_attributes_if_different(file_args, changed)
 
-    module.exit_json(archived=successes, dest=dest, changed=changed, state=state, arcroot=arcroot, missing=missing, expanded_paths=expanded_paths)
+    result = dict(archived=successes, dest=dest, changed=changed, state=state, arcroot=arcroot, missing=missing, expanded_paths=expanded_paths)
+    if manifest_path:
+        result['manifest'] = manifest_path
+
+    module.exit_json(**result)
 
 if __name__ == '__main__':
     main()
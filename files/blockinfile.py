@@ -100,6 +100,29 @@ options:
     description:
       - 'This flag indicates that filesystem links, if they exist, should be followed.'
     version_added: "2.1"
+  blocks:
+    required: false
+    default: null
+    description:
+      - A list of blocks to manage in the file at once. Each item is a
+        dictionary accepting C(marker), C(block), C(state), C(insertafter)
+        and C(insertbefore); missing keys default to the module parameters
+        of the same name. Every item needs its own C(marker).
+      - All marker pairs are located in a single scan of the file, every
+        insert, replace and remove is applied together and the result is
+        written and validated once. C(insertafter) and C(insertbefore)
+        expressions are matched against the original file content.
+    version_added: "2.3"
+  stream:
+    required: false
+    default: 'no'
+    choices: [ 'yes', 'no' ]
+    description:
+      - Only used with C(blocks). Process the file line by line in two
+        passes (one to locate the markers, one to write the result) instead
+        of loading it into memory, for files too large to hold comfortably.
+        Unchanged lines are copied with their original line endings.
+    version_added: "2.3"
 """
 
 EXAMPLES = r"""
@@ -144,6 +167,22 @@ EXAMPLES = r"""
       - { name: host1, ip: 10.10.1.10 }
       - { name: host2, ip: 10.10.1.11 }
       - { name: host3, ip: 10.10.1.12 }
+
+- name: Manage several blocks with one read, one validation and one write
+  blockinfile:
+    dest: /etc/ssh/sshd_config
+    validate: "/usr/sbin/sshd -T -f %s"
+    blocks:
+      - marker: "# {mark} ANSIBLE MANAGED BLOCK deploy"
+        block: |
+          Match User deploy
+          PasswordAuthentication no
+      - marker: "# {mark} ANSIBLE MANAGED BLOCK backup"
+        block: |
+          Match User backup
+          AllowTcpForwarding no
+      - marker: "# {mark} ANSIBLE MANAGED BLOCK legacy"
+        state: absent
 """
 
 import re
@@ -160,6 +199,11 @@ def write_changes(module, contents, dest):
     f.write(contents)
     f.close()
 
+    install_changes(module, tmpfile, dest)
+
+
+def install_changes(module, tmpfile, dest):
+
     validate = module.params.get('validate', None)
     valid = not validate
     if validate:
@@ -187,6 +231,248 @@ def check_file_attrs(module, changed, message):
     return message, changed
 
 
+BLOCK_KEYS = ('marker', 'block', 'state', 'insertafter', 'insertbefore')
+
+
+def block_specs(module, params):
+    """Turn the blocks parameter into a list of normalized block specs."""
+    specs = []
+    seen = {}
+    for item in params['blocks']:
+        if not isinstance(item, dict):
+            module.fail_json(msg='Each item in blocks must be a dictionary')
+        unknown = [k for k in item if k not in BLOCK_KEYS + ('content',)]
+        if unknown:
+            module.fail_json(msg='Unsupported block options: %s' % ', '.join(unknown))
+
+        spec = {}
+        for key in BLOCK_KEYS:
+            spec[key] = item.get(key, params[key])
+        if 'content' in item:
+            spec['block'] = item['content']
+        if 'insertafter' in item or 'insertbefore' in item:
+            if item.get('insertafter') is not None and item.get('insertbefore') is not None:
+                module.fail_json(msg='insertafter and insertbefore are mutually exclusive')
+            spec['insertafter'] = item.get('insertafter')
+            spec['insertbefore'] = item.get('insertbefore')
+        if spec['state'] not in ('present', 'absent'):
+            module.fail_json(msg='Invalid state %s' % spec['state'])
+        if spec['insertbefore'] is None and spec['insertafter'] is None:
+            spec['insertafter'] = 'EOF'
+
+        if spec['insertafter'] not in (None, 'EOF'):
+            spec['insertre'] = re.compile(to_bytes(spec['insertafter']))
+        elif spec['insertbefore'] not in (None, 'BOF'):
+            spec['insertre'] = re.compile(to_bytes(spec['insertbefore']))
+        else:
+            spec['insertre'] = None
+
+        marker = to_bytes(spec['marker'])
+        spec['marker0'] = re.sub(b(r'{mark}'), b('BEGIN'), marker)
+        spec['marker1'] = re.sub(b(r'{mark}'), b('END'), marker)
+        if spec['marker0'] in seen:
+            module.fail_json(msg='Marker %s is used by more than one block' % spec['marker'])
+        seen[spec['marker0']] = True
+
+        block = to_bytes(spec['block'] or '')
+        if spec['state'] == 'present' and block:
+            spec['blocklines'] = [spec['marker0']] + block.splitlines() + [spec['marker1']]
+        else:
+            spec['blocklines'] = []
+        specs.append(spec)
+    return specs
+
+
+def strip_eol(line):
+    if line.endswith(b('\r\n')):
+        return line[:-2]
+    if line.endswith(b('\n')) or line.endswith(b('\r')):
+        return line[:-1]
+    return line
+
+
+def scan_blocks(module, lines, specs):
+    """
+    Locate the markers of every block and the insertion points of the
+    missing ones in a single pass over lines. Returns the number of lines.
+    """
+    markers = {}
+    for i, spec in enumerate(specs):
+        spec['n0'] = spec['n1'] = spec['match'] = None
+        markers.setdefault(spec['marker0'], []).append((i, 'n0'))
+        markers.setdefault(spec['marker1'], []).append((i, 'n1'))
+    searching = [spec for spec in specs if spec['insertre'] is not None]
+
+    total = 0
+    for line in lines:
+        line = strip_eol(line)
+        for i, key in markers.get(line, ()):
+            specs[i][key] = total
+        for spec in searching:
+            if spec['insertre'].search(line):
+                spec['match'] = total
+        total += 1
+
+    spans = []
+    for spec in specs:
+        spec['span'] = spec['insert'] = None
+        if None not in (spec['n0'], spec['n1']):
+            spec['span'] = (min(spec['n0'], spec['n1']), max(spec['n0'], spec['n1']))
+            spans.append(spec['span'] + (spec['marker'],))
+        elif spec['insertre'] is not None:
+            if spec['match'] is None:
+                spec['insert'] = total
+            elif spec['insertafter'] is not None:
+                spec['insert'] = spec['match'] + 1
+            else:
+                spec['insert'] = spec['match']
+        elif spec['insertbefore'] is not None:
+            spec['insert'] = 0           # insertbefore=BOF
+        else:
+            spec['insert'] = total       # insertafter=EOF
+
+    spans.sort()
+    for i in range(1, len(spans)):
+        if spans[i][0] <= spans[i - 1][1]:
+            module.fail_json(msg='Blocks %s and %s overlap' % (spans[i - 1][2], spans[i][2]))
+
+    return total
+
+
+def render_blocks(lines, specs, total, eol):
+    """
+    Yield the resulting lines, replacing, removing and inserting every
+    block in one pass. Each spec gets 'changed' set once its part of the
+    file has been produced. Output lines end with eol, unless eol is
+    empty, in which case original line endings are kept.
+    """
+    starts = {}
+    inserts = {}
+    for spec in specs:
+        spec['changed'] = False
+        if spec['span'] is not None:
+            starts[spec['span'][0]] = spec
+        elif spec['blocklines']:
+            inserts.setdefault(spec['insert'], []).append(spec)
+            spec['changed'] = True
+
+    newline = eol or b('\n')
+    current = None
+    old = []
+    unterminated = False
+    for n, line in enumerate(lines):
+        for spec in inserts.get(n, ()):
+            for blockline in spec['blocklines']:
+                yield blockline + newline
+        if n in starts:
+            current = starts[n]
+            old = []
+            for blockline in current['blocklines']:
+                yield blockline + newline
+        if current is not None:
+            old.append(strip_eol(line))
+            if n == current['span'][1]:
+                current['changed'] = (old != current['blocklines'])
+                current = None
+            continue
+        if eol:
+            line = strip_eol(line) + eol
+        unterminated = (strip_eol(line) == line)
+        yield line
+    for spec in inserts.get(total, ()):
+        if unterminated:
+            # Blocks appended to a file without a final newline
+            yield newline
+            unterminated = False
+        for blockline in spec['blocklines']:
+            yield blockline + newline
+
+
+def block_results(specs):
+    return [dict(marker=spec['marker'], state=spec['state'], changed=spec['changed'])
+            for spec in specs]
+
+
+def manage_blocks(module, dest, path_exists):
+    """Apply every item of the blocks parameter with one write and one validation."""
+    params = module.params
+    specs = block_specs(module, params)
+
+    if not path_exists:
+        if not [spec for spec in specs if spec['blocklines']]:
+            module.exit_json(changed=False, msg="File not present", blocks=[])
+        original = None
+        lines = []
+    elif not module.boolean(params['stream']):
+        f = open(dest, 'rb')
+        original = f.read()
+        f.close()
+        lines = original.splitlines()
+
+    if path_exists and module.boolean(params['stream']):
+        f = open(dest, 'rb')
+        try:
+            total = scan_blocks(module, f, specs)
+        finally:
+            f.close()
+
+        # Nothing in the file ends up different: skip the second pass
+        if not [spec for spec in specs if spec['span'] is not None or spec['blocklines']]:
+            changed = False
+        elif module.check_mode:
+            f = open(dest, 'rb')
+            try:
+                for line in render_blocks(f, specs, total, b('')):
+                    pass
+            finally:
+                f.close()
+            changed = bool([spec for spec in specs if spec['changed']])
+        else:
+            tmpfd, tmpfile = tempfile.mkstemp(dir=os.path.dirname(dest))
+            out = os.fdopen(tmpfd, 'wb')
+            f = open(dest, 'rb')
+            try:
+                for line in render_blocks(f, specs, total, b('')):
+                    out.write(line)
+            finally:
+                f.close()
+                out.close()
+            changed = bool([spec for spec in specs if spec['changed']])
+            if changed:
+                if module.boolean(params['backup']):
+                    module.backup_local(dest)
+                install_changes(module, tmpfile, dest)
+            else:
+                os.remove(tmpfile)
+        msg = changed and 'Blocks changed' or ''
+    else:
+        total = scan_blocks(module, lines, specs)
+        lines = list(render_blocks(lines, specs, total, b('\n')))
+        result = b('').join(lines)
+        if lines and original is not None and not original.endswith(b('\n')):
+            result = result[:-1]
+        if original == result:
+            msg = ''
+            changed = False
+        elif original is None:
+            msg = 'File created'
+            changed = True
+        else:
+            msg = 'Blocks changed'
+            changed = True
+
+        if changed and not module.check_mode:
+            if module.boolean(params['backup']) and path_exists:
+                module.backup_local(dest)
+            write_changes(module, result, dest)
+
+    if module.check_mode and not path_exists:
+        module.exit_json(changed=changed, msg=msg, blocks=block_results(specs))
+
+    msg, changed = check_file_attrs(module, changed, msg)
+    module.exit_json(changed=changed, msg=msg, blocks=block_results(specs))
+
+
 def main():
     module = AnsibleModule(
         argument_spec=dict(
@@ -199,6 +485,8 @@ def main():
             create=dict(default=False, type='bool'),
             backup=dict(default=False, type='bool'),
             validate=dict(default=None, type='str'),
+            blocks=dict(default=None, type='list'),
+            stream=dict(default=False, type='bool'),
         ),
         mutually_exclusive=[['insertbefore', 'insertafter']],
         add_file_common_args=True,
@@ -215,10 +503,14 @@ def main():
                          msg='Destination %s is a directory !' % dest)
 
     path_exists = os.path.exists(dest)
+    if not path_exists and not module.boolean(params['create']):
+        module.fail_json(rc=257,
+                         msg='Destination %s does not exist !' % dest)
+
+    if params['blocks'] is not None:
+        manage_blocks(module, dest, path_exists)
+
     if not path_exists:
-        if not module.boolean(params['create']):
-            module.fail_json(rc=257,
-                             msg='Destination %s does not exist !' % dest)
         original = None
         lines = []
     else:
@@ -79,6 +79,24 @@ options:
     default: null
     choices: []
     aliases: []
+  fields:
+    description:
+      - List of attributes to collect for each object, for example
+        C(member) and C(object_status) for pools. Only these attributes
+        are requested from the device; attributes a category does not
+        have are ignored. Not applicable for software, certificate and
+        key fact categories. By default all attributes are collected.
+    required: false
+    default: null
+    version_added: "2.3"
+  max_workers:
+    description:
+      - Number of fact categories collected at the same time. Each
+        worker uses a BIG-IP session of its own, so more than one
+        worker implies C(session).
+    required: false
+    default: 4
+    version_added: "2.3"
 extends_documentation_fragment: f5
 '''
 
@@ -90,6 +108,15 @@ EXAMPLES = '''
       password: "secret"
       include: "interface,vlan"
   delegate_to: localhost
+
+- name: Collect pool membership and status only
+  bigip_facts:
+      server: "lb.mydomain.com"
+      user: "admin"
+      password: "secret"
+      include: "pool,virtual_server,node"
+      fields: "member,object_status,destination,default_pool_name"
+  delegate_to: localhost
 '''
 
 try:
@@ -101,8 +128,14 @@ else:
 
 import fnmatch
 import re
+import threading
 import traceback
 
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
 
 class F5(object):
     """F5 iControl class.
@@ -142,6 +175,26 @@ class F5(object):
     def get_active_folder(self):
         return self.api.System.Session.get_active_folder()
 
+    def enter_root_folder(self):
+        """Switch to the root folder with recursive queries enabled.
+
+        Returns the (folder, recursive query state) pair to hand back to
+        restore_folder() once collection is done.
+        """
+        saved = (self.get_active_folder(), self.get_recursive_query_state())
+        if saved[0] != "/":
+            self.set_active_folder("/")
+        if saved[1] != "STATE_ENABLED":
+            self.enable_recursive_query_state()
+        return saved
+
+    def restore_folder(self, saved):
+        folder, recursive_query_state = saved
+        if folder and folder != "/":
+            self.set_active_folder(folder)
+        if recursive_query_state and recursive_query_state != "STATE_ENABLED":
+            self.set_recursive_query_state(recursive_query_state)
+
 
 class Interfaces(object):
     """Interfaces class.
@@ -1371,10 +1424,17 @@ class ProvisionInfo(object):
         return result
 
 
-def generate_dict(api_obj, fields):
+def select_fields(fields, wanted):
+    if wanted is None:
+        return fields
+    return [field for field in fields if field in wanted]
+
+
+def generate_dict(api_obj, fields, wanted=None):
     result_dict = {}
     lists = []
     supported_fields = []
+    fields = select_fields(fields, wanted)
     if api_obj.get_list():
         for field in fields:
             try:
@@ -1391,9 +1451,9 @@ def generate_dict(api_obj, fields):
     return result_dict
 
 
-def generate_simple_dict(api_obj, fields):
+def generate_simple_dict(api_obj, fields, wanted=None):
     result_dict = {}
-    for field in fields:
+    for field in select_fields(fields, wanted):
         try:
             api_response = getattr(api_obj, "get_" + field)()
         except (MethodNotFound, WebFault):
@@ -1403,7 +1463,7 @@ def generate_simple_dict(api_obj, fields):
     return result_dict
 
 
-def generate_interface_dict(f5, regex):
+def generate_interface_dict(f5, regex, wanted=None):
     interfaces = Interfaces(f5.get_api(), regex)
     fields = ['active_media', 'actual_flow_control', 'bundle_state',
               'description', 'dual_media_state', 'enabled_state', 'if_index',
@@ -1415,29 +1475,29 @@ def generate_interface_dict(f5, regex):
               'sfp_media_state', 'stp_active_edge_port_state',
               'stp_enabled_state', 'stp_link_type',
               'stp_protocol_detection_reset_state']
-    return generate_dict(interfaces, fields)
+    return generate_dict(interfaces, fields, wanted)
 
 
-def generate_self_ip_dict(f5, regex):
+def generate_self_ip_dict(f5, regex, wanted=None):
     self_ips = SelfIPs(f5.get_api(), regex)
     fields = ['address', 'allow_access_list', 'description',
               'enforced_firewall_policy', 'floating_state', 'fw_rule',
               'netmask', 'staged_firewall_policy', 'traffic_group',
               'vlan', 'is_traffic_group_inherited']
-    return generate_dict(self_ips, fields)
+    return generate_dict(self_ips, fields, wanted)
 
 
-def generate_trunk_dict(f5, regex):
+def generate_trunk_dict(f5, regex, wanted=None):
     trunks = Trunks(f5.get_api(), regex)
     fields = ['active_lacp_state', 'configured_member_count', 'description',
               'distribution_hash_option', 'interface', 'lacp_enabled_state',
               'lacp_timeout_option', 'link_selection_policy', 'media_speed',
               'media_status', 'operational_member_count', 'stp_enabled_state',
               'stp_protocol_detection_reset_state']
-    return generate_dict(trunks, fields)
+    return generate_dict(trunks, fields, wanted)
 
 
-def generate_vlan_dict(f5, regex):
+def generate_vlan_dict(f5, regex, wanted=None):
     vlans = Vlans(f5.get_api(), regex)
     fields = ['auto_lasthop', 'cmp_hash_algorithm', 'description',
               'dynamic_forwarding', 'failsafe_action', 'failsafe_state',
@@ -1446,10 +1506,10 @@ def generate_vlan_dict(f5, regex):
               'sflow_poll_interval', 'sflow_poll_interval_global',
               'sflow_sampling_rate', 'sflow_sampling_rate_global',
               'source_check_state', 'true_mac_address', 'vlan_id']
-    return generate_dict(vlans, fields)
+    return generate_dict(vlans, fields, wanted)
 
 
-def generate_vs_dict(f5, regex):
+def generate_vs_dict(f5, regex, wanted=None):
     virtual_servers = VirtualServers(f5.get_api(), regex)
     fields = ['actual_hardware_acceleration', 'authentication_profile',
               'auto_lasthop', 'bw_controller_policy', 'clone_pool',
@@ -1467,10 +1527,10 @@ def generate_vs_dict(f5, regex):
               'source_address_translation_type', 'source_port_behavior',
               'staged_firewall_policy', 'translate_address_state',
               'translate_port_state', 'type', 'vlan', 'wildmask']
-    return generate_dict(virtual_servers, fields)
+    return generate_dict(virtual_servers, fields, wanted)
 
 
-def generate_pool_dict(f5, regex):
+def generate_pool_dict(f5, regex, wanted=None):
     pools = Pools(f5.get_api(), regex)
     fields = ['action_on_service_down', 'active_member_count',
               'aggregate_dynamic_ratio', 'allow_nat_state',
@@ -1484,10 +1544,10 @@ def generate_pool_dict(f5, regex):
               'queue_on_connection_limit_state', 'queue_time_limit',
               'reselect_tries', 'server_ip_tos', 'server_link_qos',
               'simple_timeout', 'slow_ramp_time']
-    return generate_dict(pools, fields)
+    return generate_dict(pools, fields, wanted)
 
 
-def generate_device_dict(f5, regex):
+def generate_device_dict(f5, regex, wanted=None):
     devices = Devices(f5.get_api(), regex)
     fields = ['active_modules', 'base_mac_address', 'blade_addresses',
               'build', 'chassis_id', 'chassis_type', 'comment',
@@ -1497,55 +1557,55 @@ def generate_device_dict(f5, regex):
               'optional_modules', 'platform_id', 'primary_mirror_address',
               'product', 'secondary_mirror_address', 'software_version',
               'timelimited_modules', 'timezone', 'unicast_addresses']
-    return generate_dict(devices, fields)
+    return generate_dict(devices, fields, wanted)
 
 
-def generate_device_group_dict(f5, regex):
+def generate_device_group_dict(f5, regex, wanted=None):
     device_groups = DeviceGroups(f5.get_api(), regex)
     fields = ['all_preferred_active', 'autosync_enabled_state', 'description',
               'device', 'full_load_on_sync_state',
               'incremental_config_sync_size_maximum',
               'network_failover_enabled_state', 'sync_status', 'type']
-    return generate_dict(device_groups, fields)
+    return generate_dict(device_groups, fields, wanted)
 
 
-def generate_traffic_group_dict(f5, regex):
+def generate_traffic_group_dict(f5, regex, wanted=None):
     traffic_groups = TrafficGroups(f5.get_api(), regex)
     fields = ['auto_failback_enabled_state', 'auto_failback_time',
               'default_device', 'description', 'ha_load_factor',
               'ha_order', 'is_floating', 'mac_masquerade_address',
               'unit_id']
-    return generate_dict(traffic_groups, fields)
+    return generate_dict(traffic_groups, fields, wanted)
 
 
-def generate_rule_dict(f5, regex):
+def generate_rule_dict(f5, regex, wanted=None):
     rules = Rules(f5.get_api(), regex)
     fields = ['definition', 'description', 'ignore_vertification',
               'verification_status']
-    return generate_dict(rules, fields)
+    return generate_dict(rules, fields, wanted)
 
 
-def generate_node_dict(f5, regex):
+def generate_node_dict(f5, regex, wanted=None):
     nodes = Nodes(f5.get_api(), regex)
     fields = ['address', 'connection_limit', 'description', 'dynamic_ratio',
               'monitor_instance', 'monitor_rule', 'monitor_status',
               'object_status', 'rate_limit', 'ratio', 'session_status']
-    return generate_dict(nodes, fields)
+    return generate_dict(nodes, fields, wanted)
 
 
-def generate_virtual_address_dict(f5, regex):
+def generate_virtual_address_dict(f5, regex, wanted=None):
     virtual_addresses = VirtualAddresses(f5.get_api(), regex)
     fields = ['address', 'arp_state', 'auto_delete_state', 'connection_limit',
               'description', 'enabled_state', 'icmp_echo_state',
               'is_floating_state', 'netmask', 'object_status',
               'route_advertisement_state', 'traffic_group']
-    return generate_dict(virtual_addresses, fields)
+    return generate_dict(virtual_addresses, fields, wanted)
 
 
-def generate_address_class_dict(f5, regex):
+def generate_address_class_dict(f5, regex, wanted=None):
     address_classes = AddressClasses(f5.get_api(), regex)
     fields = ['address_class', 'description']
-    return generate_dict(address_classes, fields)
+    return generate_dict(address_classes, fields, wanted)
 
 
 def generate_certificate_dict(f5, regex):
@@ -1558,7 +1618,7 @@ def generate_key_dict(f5, regex):
     return dict(zip(keys.get_list(), keys.get_key_list()))
 
 
-def generate_client_ssl_profile_dict(f5, regex):
+def generate_client_ssl_profile_dict(f5, regex, wanted=None):
     profiles = ProfileClientSSL(f5.get_api(), regex)
     fields = ['alert_timeout', 'allow_nonssl_state', 'authenticate_depth',
               'authenticate_once_state', 'ca_file', 'cache_size',
@@ -1579,10 +1639,10 @@ def generate_client_ssl_profile_dict(f5, regex):
               'server_name', 'session_ticket_state', 'sni_default_state',
               'sni_require_state', 'ssl_option', 'strict_resume_state',
               'unclean_shutdown_state', 'is_base_profile', 'is_system_profile']
-    return generate_dict(profiles, fields)
+    return generate_dict(profiles, fields, wanted)
 
 
-def generate_system_info_dict(f5):
+def generate_system_info_dict(f5, wanted=None):
     system_info = SystemInfo(f5.get_api())
     fields = ['base_mac_address',
               'blade_temperature', 'chassis_slot_information',
@@ -1592,7 +1652,7 @@ def generate_system_info_dict(f5):
               'product_information', 'pva_version', 'system_id',
               'system_information', 'time',
               'time_zone', 'uptime']
-    return generate_simple_dict(system_info, fields)
+    return generate_simple_dict(system_info, fields, wanted)
 
 
 def generate_software_list(f5):
@@ -1601,10 +1661,97 @@ def generate_software_list(f5):
     return software_list
 
 
-def generate_provision_dict(f5):
+def generate_provision_dict(f5, wanted=None):
     provisioned = ProvisionInfo(f5.get_api())
     fields = ['list', 'provisioned_list']
-    return generate_simple_dict(provisioned, fields)
+    return generate_simple_dict(provisioned, fields, wanted)
+
+
+COLLECTORS = {
+    'address_class': generate_address_class_dict,
+    'certificate': generate_certificate_dict,
+    'client_ssl_profile': generate_client_ssl_profile_dict,
+    'device': generate_device_dict,
+    'device_group': generate_device_group_dict,
+    'interface': generate_interface_dict,
+    'key': generate_key_dict,
+    'node': generate_node_dict,
+    'pool': generate_pool_dict,
+    'provision': generate_provision_dict,
+    'rule': generate_rule_dict,
+    'self_ip': generate_self_ip_dict,
+    'software': generate_software_list,
+    'system_info': generate_system_info_dict,
+    'traffic_group': generate_traffic_group_dict,
+    'trunk': generate_trunk_dict,
+    'virtual_address': generate_virtual_address_dict,
+    'virtual_server': generate_vs_dict,
+    'vlan': generate_vlan_dict,
+}
+
+# Categories which are not filtered by name and/or attribute
+UNFILTERED = ('provision', 'software', 'system_info')
+NO_FIELDS = ('certificate', 'key', 'software')
+
+
+def collect(f5, name, regex, wanted):
+    args = [f5]
+    if name not in UNFILTERED:
+        args.append(regex)
+    if name not in NO_FIELDS:
+        args.append(wanted)
+    return COLLECTORS[name](*args)
+
+
+class CollectorError(Exception):
+    def __init__(self, error, tb):
+        Exception.__init__(self, error)
+        self.error = error
+        self.traceback = tb
+
+
+def collect_facts(connect, include, regex, wanted, max_workers):
+    """Run the collectors for the included categories.
+
+    Up to max_workers categories are collected at once, each worker on
+    its own connection (see connect).
+    """
+    work = queue.Queue()
+    for name in include:
+        work.put(name)
+    facts = {}
+    errors = []
+
+    def worker():
+        f5 = None
+        saved = None
+        try:
+            while not errors:
+                try:
+                    name = work.get_nowait()
+                except queue.Empty:
+                    break
+                if f5 is None:
+                    f5 = connect()
+                    saved = f5.enter_root_folder()
+                facts[name] = collect(f5, name, regex, wanted)
+            if saved:
+                f5.restore_folder(saved)
+        except Exception as e:
+            errors.append((e, traceback.format_exc()))
+
+    threads = []
+    for i in range(max(1, min(max_workers, len(include)))):
+        t = threading.Thread(target=worker)
+        t.daemon = True
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+
+    if errors:
+        raise CollectorError(*errors[0])
+    return facts
 
 
 def main():
@@ -1614,6 +1761,8 @@ def main():
         session=dict(type='bool', default=False),
         include=dict(type='list', required=True),
         filter=dict(type='str', required=False),
+        fields=dict(type='list', required=False),
+        max_workers=dict(type='int', default=4),
     )
     argument_spec.update(meta_args)
 
@@ -1631,6 +1780,7 @@ def main():
     validate_certs = module.params['validate_certs']
     session = module.params['session']
     fact_filter = module.params['filter']
+    max_workers = module.params['max_workers']
 
     if validate_certs:
         import ssl
@@ -1641,7 +1791,10 @@ def main():
         regex = fnmatch.translate(fact_filter)
     else:
         regex = None
-    include = [x.lower() for x in module.params['include']]
+    include = []
+    for x in module.params['include']:
+        if x.lower() not in include:
+            include.append(x.lower())
     valid_includes = ('address_class', 'certificate', 'client_ssl_profile',
                       'device', 'device_group', 'interface', 'key', 'node',
                       'pool', 'provision', 'rule', 'self_ip', 'software',
@@ -1651,66 +1804,27 @@ def main():
     if not all(include_test):
         module.fail_json(msg="value of include must be one or more of: %s, got: %s" % (",".join(valid_includes), ",".join(include)))
 
+    wanted = module.params['fields']
+    if wanted is not None:
+        wanted = set(x.lower() for x in wanted)
+
+    # Active folder and recursive query state are per session, so
+    # concurrent workers each need a session of their own.
+    use_session = session or min(max_workers, len(include)) > 1
+
+    def connect():
+        return F5(server, user, password, use_session, validate_certs, server_port)
+
     try:
         facts = {}
 
         if len(include) > 0:
-            f5 = F5(server, user, password, session, validate_certs, server_port)
-            saved_active_folder = f5.get_active_folder()
-            saved_recursive_query_state = f5.get_recursive_query_state()
-            if saved_active_folder != "/":
-                f5.set_active_folder("/")
-            if saved_recursive_query_state != "STATE_ENABLED":
-                f5.enable_recursive_query_state()
-
-            if 'interface' in include:
-                facts['interface'] = generate_interface_dict(f5, regex)
-            if 'self_ip' in include:
-                facts['self_ip'] = generate_self_ip_dict(f5, regex)
-            if 'trunk' in include:
-                facts['trunk'] = generate_trunk_dict(f5, regex)
-            if 'vlan' in include:
-                facts['vlan'] = generate_vlan_dict(f5, regex)
-            if 'virtual_server' in include:
-                facts['virtual_server'] = generate_vs_dict(f5, regex)
-            if 'pool' in include:
-                facts['pool'] = generate_pool_dict(f5, regex)
-            if 'provision' in include:
-                facts['provision'] = generate_provision_dict(f5)
-            if 'device' in include:
-                facts['device'] = generate_device_dict(f5, regex)
-            if 'device_group' in include:
-                facts['device_group'] = generate_device_group_dict(f5, regex)
-            if 'traffic_group' in include:
-                facts['traffic_group'] = generate_traffic_group_dict(f5, regex)
-            if 'rule' in include:
-                facts['rule'] = generate_rule_dict(f5, regex)
-            if 'node' in include:
-                facts['node'] = generate_node_dict(f5, regex)
-            if 'virtual_address' in include:
-                facts['virtual_address'] = generate_virtual_address_dict(f5, regex)
-            if 'address_class' in include:
-                facts['address_class'] = generate_address_class_dict(f5, regex)
-            if 'software' in include:
-                facts['software'] = generate_software_list(f5)
-            if 'certificate' in include:
-                facts['certificate'] = generate_certificate_dict(f5, regex)
-            if 'key' in include:
-                facts['key'] = generate_key_dict(f5, regex)
-            if 'client_ssl_profile' in include:
-                facts['client_ssl_profile'] = generate_client_ssl_profile_dict(f5, regex)
-            if 'system_info' in include:
-                facts['system_info'] = generate_system_info_dict(f5)
-
-            # restore saved state
-            if saved_active_folder and saved_active_folder != "/":
-                f5.set_active_folder(saved_active_folder)
-            if saved_recursive_query_state and \
-               saved_recursive_query_state != "STATE_ENABLED":
-                f5.set_recursive_query_state(saved_recursive_query_state)
+            facts = collect_facts(connect, include, regex, wanted, max_workers)
 
         result = {'ansible_facts': facts}
 
+    except CollectorError as e:
+        module.fail_json(msg="received exception: %s\ntraceback: %s" % (e.error, e.traceback))
     except Exception as e:
         module.fail_json(msg="received exception: %s\ntraceback: %s" % (e, traceback.format_exc()))
 
@@ -31,6 +31,9 @@ notes:
       sockets configured for level 'admin'. For example, you can add the line
       'stats socket /var/run/haproxy.sock level admin' to the general section of
       haproxy.cfg. See http://haproxy.1wt.eu/download/1.5/doc/configuration.txt.
+    - All commands of a task are sent over a single interactive (prompt mode)
+      socket session. 'show stat' is read once and waits only refresh the rows
+      of the servers they wait for.
 options:
   backend:
     description:
@@ -39,9 +42,16 @@ options:
     default: auto-detected
   host:
     description:
-      - Name of the backend host to change.
-    required: true
+      - Name of the backend host to change. Required unless C(hosts) is given.
+    required: false
+    default: null
+  hosts:
+    description:
+      - List of backend hosts to change in one call, as an alternative to
+        C(host). All hosts share one socket session and one stats snapshot.
+    required: false
     default: null
+    version_added: "2.3"
   shutdown_sessions:
     description:
       - When disabling a server, immediately terminate all the sessions attached
@@ -126,6 +136,13 @@ EXAMPLES = '''
 # enable server in 'www' backend pool with change server(s) weight
 - haproxy: state=enabled host={{ inventory_hostname }} socket=/var/run/haproxy.sock weight=10 backend=www
 
+# disable many servers at once, in every backend they are part of
+- haproxy:
+    state: disabled
+    hosts: "{{ groups['web'] }}"
+    wait: yes
+  delegate_to: lb01
+
 author: "Ravi Bhure (@ravibhure)"
 '''
 
@@ -137,6 +154,9 @@ from string import Template
 
 DEFAULT_SOCKET_LOCATION="/var/run/haproxy.sock"
 RECV_SIZE = 1024
+PROMPT = '\n> '
+# 'show stat' type mask selecting servers only
+STAT_TYPE_SERVER = 4
 ACTION_CHOICES = ['enabled', 'disabled']
 WAIT_RETRIES=25
 WAIT_INTERVAL=5
@@ -145,6 +165,10 @@ WAIT_INTERVAL=5
 class TimeoutException(Exception):
   pass
 
+class SessionClosed(Exception):
+  pass
+
+
 class HAProxy(object):
     """
     Used for communicating with HAProxy through its local UNIX socket interface.
@@ -162,6 +186,7 @@ class HAProxy(object):
 
         self.state = self.module.params['state']
         self.host = self.module.params['host']
+        self.hosts = self.module.params['hosts'] or [self.host]
         self.backend = self.module.params['backend']
         self.weight = self.module.params['weight']
         self.socket = self.module.params['socket']
@@ -171,26 +196,115 @@ class HAProxy(object):
         self.wait_retries = self.module.params['wait_retries']
         self.wait_interval = self.module.params['wait_interval']
         self.command_results = {}
+        self.client = None
+        self.stats = {}
+        self.stat_keys = []
+        self.backends = ()
 
-    def execute(self, cmd, timeout=200, capture_output=True):
+    def connect(self):
         """
-        Executes a HAProxy command by sending a message to a HAProxy's local
-        UNIX socket and waiting up to 'timeout' milliseconds for the response.
+        Open the UNIX socket and switch it to interactive mode, so that a
+        single session serves every command of the task.
         """
         self.client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         self.client.connect(self.socket)
-        self.client.sendall('%s\n' % cmd)
+        self.client.sendall('prompt\n')
+        self._read_response()
+
+    def close(self):
+        if self.client is not None:
+            try:
+                self.client.sendall('quit\n')
+            except socket.error:
+                pass
+            self.client.close()
+            self.client = None
+
+    def _read_response(self):
+        """
+        Read until HAProxy prints the prompt that ends every response in
+        interactive mode. Raises SessionClosed if the connection is closed
+        first.
+        """
         result = ''
-        buf = ''
-        buf = self.client.recv(RECV_SIZE)
-        while buf:
-            result += buf
+        while not (result.endswith(PROMPT) or result == PROMPT[1:]):
             buf = self.client.recv(RECV_SIZE)
+            if not buf:
+                self.client.close()
+                self.client = None
+                raise SessionClosed('connection closed before the prompt')
+            result += buf
+        if result.endswith(PROMPT):
+            result = result[:-len(PROMPT)]
+        else:
+            result = ''
+        return result
+
+    def _send(self, cmd):
+        if self.client is None:
+            self.connect()
+        self.client.sendall('%s\n' % cmd)
+        return self._read_response()
+
+    def execute(self, cmd, timeout=200, capture_output=True, resend=True):
+        """
+        Executes a HAProxy command by sending a message to a HAProxy's local
+        UNIX socket and waiting up to 'timeout' milliseconds for the response.
+        HAProxy closes idle sessions after its 'stats timeout', so a command
+        that finds the session gone is sent once more on a new connection,
+        unless it is not safe to run twice ('resend' is False).
+        """
+        try:
+            result = self._send(cmd)
+        except (socket.error, SessionClosed):
+            e = get_exception()
+            self.close()
+            if not resend:
+                self.module.fail_json(
+                    msg="Lost the connection to %s while running '%s': %s" % (self.socket, cmd, e))
+            try:
+                result = self._send(cmd)
+            except (socket.error, SessionClosed):
+                e = get_exception()
+                self.close()
+                self.module.fail_json(
+                    msg="Unable to run '%s' on %s: %s" % (cmd, self.socket, e))
         if capture_output:
             self.capture_command_output(cmd, result.strip())
-        self.client.close()
         return result
 
+    def _parse_stat(self, data):
+        data = data.lstrip('# ')
+        return csv.DictReader(data.splitlines())
+
+    def load_stats(self):
+        """
+        Read 'show stat' once and index the rows by (pxname, svname).
+        """
+        self.stats = {}
+        self.stat_keys = []
+        backends = []
+        for row in self._parse_stat(self.execute('show stat', 200, False)):
+            self.stats[(row['pxname'], row['svname'])] = row
+            self.stat_keys.append((row['pxname'], row['svname']))
+            if row['svname'] == 'BACKEND':
+                backends.append(row['pxname'])
+        self.backends = tuple(backends)
+
+    def refresh_stats(self, keys):
+        """
+        Re-read only the given (pxname, svname) server rows, using
+        'show stat <iid> <type> <sid>'.
+        """
+        for key in keys:
+            row = self.stats.get(key)
+            if row is None:
+                continue
+            cmd = 'show stat %s %d %s' % (row['iid'], STAT_TYPE_SERVER, row['sid'])
+            for new_row in self._parse_stat(self.execute(cmd, 200, False)):
+                if (new_row['pxname'], new_row['svname']) == key:
+                    self.stats[key] = new_row
+
 
     def capture_command_output(self, cmd, output):
         """
@@ -209,14 +323,14 @@ class HAProxy(object):
         Discover all entries with svname = 'BACKEND' and return a list of their corresponding
         pxnames
         """
-        data = self.execute('show stat', 200, False).lstrip('# ')
-        r = csv.DictReader(data.splitlines())
-        return tuple(map(lambda d: d['pxname'], filter(lambda d: d['svname'] == 'BACKEND', r)))
+        if not self.stats:
+            self.load_stats()
+        return self.backends
 
 
-    def execute_for_backends(self, cmd, pxname, svname, wait_for_status = None):
+    def execute_for_backends(self, cmds, pxname, svname, wait_for_status = None):
         """
-        Run some command on the specified backends. If no backends are provided they will
+        Run some commands on the specified backends. If no backends are provided they will
         be discovered automatically (all backends)
         """
         # Discover backends if none are given
@@ -232,39 +346,45 @@ class HAProxy(object):
             if (self.fail_on_not_found or self.wait) and state is None:
                 self.module.fail_json(msg="The specified backend '%s/%s' was not found!" % (backend, svname))
 
-            self.execute(Template(cmd).substitute(pxname = backend, svname = svname))
-            if self.wait:
-                self.wait_until_status(backend, svname, wait_for_status)
+            # One command per request, as every one of them ends with a prompt
+            for cmd, resend in cmds:
+                self.execute(Template(cmd).substitute(pxname = backend, svname = svname), resend=resend)
+
+        # Wait for all backends at once, so that they converge in parallel
+        if self.wait:
+            self.wait_until_status(backends, svname, wait_for_status)
 
 
     def get_state_for(self, pxname, svname):
         """
         Find the state of specific services. When pxname is not set, get all backends for a specific host.
         Returns a list of dictionaries containing the status and weight for those services.
+        The state is read from the stats index, which is loaded on first use.
         """
-        data = self.execute('show stat', 200, False).lstrip('# ')
-        r = csv.DictReader(data.splitlines())
-        state = tuple(map(lambda d: { 'status': d['status'], 'weight': d['weight'] }, filter(lambda d: (pxname is None or d['pxname'] == pxname) and d['svname'] == svname, r)))
+        if not self.stats:
+            self.load_stats()
+        keys = [key for key in self.stat_keys if (pxname is None or key[0] == pxname) and key[1] == svname]
+        state = tuple([{ 'status': self.stats[key]['status'], 'weight': self.stats[key]['weight'] } for key in keys])
         return state or None
 
 
-    def wait_until_status(self, pxname, svname, status):
+    def wait_until_status(self, pxnames, svname, status):
         """
-        Wait for a service to reach the specified status. Try RETRIES times
-        with INTERVAL seconds of sleep in between. If the service has not reached
-        the expected status in that time, the module will fail. If the service was 
-        not found, the module will fail.
+        Wait for services to reach the specified status. Try RETRIES times
+        with INTERVAL seconds of sleep in between, refreshing only the rows
+        still being waited for. If a service has not reached the expected
+        status in that time, the module will fail.
         """
+        pending = [(pxname, svname) for pxname in pxnames]
         for i in range(1, self.wait_retries):
-            state = self.get_state_for(pxname, svname)
-
-            # We can assume there will only be 1 element in state because both svname and pxname are always set when we get here
-            if state[0]['status'] == status:
+            self.refresh_stats(pending)
+            pending = [key for key in pending if self.stats[key]['status'] != status]
+            if not pending:
                 return True
             else:
                 time.sleep(self.wait_interval)
 
-        self.module.fail_json(msg="server %s/%s not status '%s' after %d retries. Aborting." % (pxname, svname, status, self.wait_retries))
+        self.module.fail_json(msg="server %s not status '%s' after %d retries. Aborting." % (', '.join(['%s/%s' % key for key in pending]), status, self.wait_retries))
 
 
     def enabled(self, host, backend, weight):
@@ -273,10 +393,10 @@ class HAProxy(object):
         also supports to get current weight for server (default) and
         set the weight for haproxy backend server when provides.
         """
-        cmd = "get weight $pxname/$svname; enable server $pxname/$svname"
+        cmds = [("get weight $pxname/$svname", True), ("enable server $pxname/$svname", True)]
         if weight:
-            cmd += "; set weight $pxname/$svname %s" % weight
-        self.execute_for_backends(cmd, backend, host, 'UP')
+            cmds.append(("set weight $pxname/$svname %s" % weight, False))
+        self.execute_for_backends(cmds, backend, host, 'UP')
 
 
     def disabled(self, host, backend, shutdown_sessions):
@@ -285,10 +405,10 @@ class HAProxy(object):
         performed on the server until it leaves maintenance,
         also it shutdown sessions while disabling backend host server.
         """
-        cmd = "get weight $pxname/$svname; disable server $pxname/$svname"
+        cmds = [("get weight $pxname/$svname", True), ("disable server $pxname/$svname", True)]
         if shutdown_sessions:
-            cmd += "; shutdown sessions server $pxname/$svname"
-        self.execute_for_backends(cmd, backend, host, 'MAINT')
+            cmds.append(("shutdown sessions server $pxname/$svname", False))
+        self.execute_for_backends(cmds, backend, host, 'MAINT')
 
 
     def act(self):
@@ -296,20 +416,36 @@ class HAProxy(object):
         Figure out what you want to do from ansible, and then do it.
         """
         # Get the state before the run
-        state_before = self.get_state_for(self.backend, self.host)
-        self.command_results['state_before'] = state_before
+        self.load_stats()
+        state_before = {}
+        for host in self.hosts:
+            state_before[host] = self.get_state_for(self.backend, host)
 
         # toggle enable/disbale server
-        if self.state == 'enabled':
-            self.enabled(self.host, self.backend, self.weight)
-        elif self.state == 'disabled':
-            self.disabled(self.host, self.backend, self.shutdown_sessions)
+        for host in self.hosts:
+            if self.state == 'enabled':
+                self.enabled(host, self.backend, self.weight)
+            elif self.state == 'disabled':
+                self.disabled(host, self.backend, self.shutdown_sessions)
+            else:
+                self.module.fail_json(msg="unknown state specified: '%s'" % self.state)
+
+        # Get the state after the run, re-reading only the affected rows
+        self.refresh_stats([key for key in self.stat_keys
+                            if (self.backend is None or key[0] == self.backend) and key[1] in self.hosts])
+        state_after = {}
+        for host in self.hosts:
+            state_after[host] = self.get_state_for(self.backend, host)
+        self.close()
+
+        if self.module.params['hosts']:
+            self.command_results['state_before'] = state_before
+            self.command_results['state_after'] = state_after
         else:
-            self.module.fail_json(msg="unknown state specified: '%s'" % self.state)
-
-        # Get the state after the run
-        state_after = self.get_state_for(self.backend, self.host)
-        self.command_results['state_after'] = state_after
+            state_before = state_before[self.host]
+            state_after = state_after[self.host]
+            self.command_results['state_before'] = state_before
+            self.command_results['state_after'] = state_after
 
         # Report change status
         if state_before != state_after:
@@ -326,7 +462,8 @@ def main():
     module = AnsibleModule(
         argument_spec = dict(
             state = dict(required=True, default=None, choices=ACTION_CHOICES),
-            host=dict(required=True, default=None),
+            host=dict(required=False, default=None),
+            hosts=dict(required=False, default=None, type='list'),
             backend=dict(required=False, default=None),
             weight=dict(required=False, default=None),
             socket = dict(required=False, default=DEFAULT_SOCKET_LOCATION),
@@ -336,6 +473,8 @@ def main():
             wait_retries=dict(required=False, default=WAIT_RETRIES, type='int'),
             wait_interval=dict(required=False, default=WAIT_INTERVAL, type='int'),
         ),
+        required_one_of=[['host', 'hosts']],
+        mutually_exclusive=[['host', 'hosts']],
     )
 
     if not socket:
@@ -346,6 +485,7 @@ def main():
 
 # import module snippets
 from ansible.module_utils.basic import *
+from ansible.module_utils.pycompat24 import get_exception
 
 main()
 
@@ -30,8 +30,43 @@ requirements:
 options:
     host:
         description:
-            - Set to target snmp server (normally {{inventory_hostname}})
-        required: true
+            - Set to target snmp server (normally {{inventory_hostname}}).
+              Required unless C(hosts) is given.
+        required: false
+    hosts:
+        description:
+            - A list of snmp servers to poll concurrently. The facts of every
+              host are returned in C(ansible_facts.snmp_hosts), keyed by host.
+              Hosts that could not be polled are reported in C(failed_hosts);
+              the module only fails if no host could be polled.
+        required: false
+        version_added: "2.3"
+    max_workers:
+        description:
+            - Maximum number of hosts polled at the same time when C(hosts) is
+              used.
+        required: false
+        default: 10
+        version_added: "2.3"
+    max_repetitions:
+        description:
+            - Number of rows requested per GETBULK round trip when walking
+              tables. Higher values need fewer round trips on devices with
+              many interfaces, at the cost of larger responses.
+        required: false
+        default: 25
+        version_added: "2.3"
+    extra_tables:
+        description:
+            - Additional tables to retrieve, each with its own GETBULK walk
+              after the interface and address tables. Either one of the known names C(ifXTable)
+              (IF-MIB, including the 64 bit HC counters) and
+              C(entPhysicalTable) (ENTITY-MIB), or a numeric table entry OID.
+            - Rows are returned in C(ansible_snmp_tables), keyed by table name,
+              row index and column name (or column number for numeric OIDs).
+        required: false
+        default: []
+        version_added: "2.3"
     version:
         description:
             - SNMP Version to use, v2/v2c or v3
@@ -86,10 +121,24 @@ EXAMPLES = '''
     authkey=abc12345
     privkey=def6789
   delegate_to: localhost
+
+# Poll a list of switches concurrently, including 64 bit interface counters
+- snmp_facts:
+    hosts: "{{ groups['switches'] }}"
+    version: v2c
+    community: public
+    max_repetitions: 50
+    extra_tables:
+      - ifXTable
+      - entPhysicalTable
+  run_once: true
+  delegate_to: localhost
 '''
 
 from ansible.module_utils.basic import *
+from ansible.module_utils.pycompat24 import get_exception
 from collections import defaultdict
+import threading
 
 try:
     from pysnmp.entity.rfc3413.oneliner import cmdgen
@@ -128,6 +177,35 @@ class DefineOid(object):
         self.ipAdEntIfIndex = dp + "1.3.6.1.2.1.4.20.1.2"
         self.ipAdEntNetMask = dp + "1.3.6.1.2.1.4.20.1.3"
 
+# Tables known by name for extra_tables: entry OID and column names
+KNOWN_TABLES = {
+    'ifXTable': ("1.3.6.1.2.1.31.1.1.1", {
+        1: 'ifName',
+        6: 'ifHCInOctets',
+        7: 'ifHCInUcastPkts',
+        8: 'ifHCInMulticastPkts',
+        9: 'ifHCInBroadcastPkts',
+        10: 'ifHCOutOctets',
+        11: 'ifHCOutUcastPkts',
+        12: 'ifHCOutMulticastPkts',
+        13: 'ifHCOutBroadcastPkts',
+        15: 'ifHighSpeed',
+        18: 'ifAlias',
+    }),
+    'entPhysicalTable': ("1.3.6.1.2.1.47.1.1.1.1", {
+        2: 'entPhysicalDescr',
+        4: 'entPhysicalContainedIn',
+        5: 'entPhysicalClass',
+        7: 'entPhysicalName',
+        8: 'entPhysicalHardwareRev',
+        9: 'entPhysicalFirmwareRev',
+        10: 'entPhysicalSoftwareRev',
+        11: 'entPhysicalSerialNum',
+        12: 'entPhysicalMfgName',
+        13: 'entPhysicalModelName',
+    }),
+}
+
 
 def decode_hex(hexstring):
 
@@ -173,28 +251,28 @@ def lookup_operstatus(int_operstatus):
     else:
         return ""
 
-def main():
-    module = AnsibleModule(
-        argument_spec=dict(
-            host=dict(required=True),
-            version=dict(required=True, choices=['v2', 'v2c', 'v3']),
-            community=dict(required=False, default=False),
-            username=dict(required=False),
-            level=dict(required=False, choices=['authNoPriv', 'authPriv']),
-            integrity=dict(required=False, choices=['md5', 'sha']),
-            privacy=dict(required=False, choices=['des', 'aes']),
-            authkey=dict(required=False),
-            privkey=dict(required=False),
-            removeplaceholder=dict(required=False)),
-            required_together = ( ['username','level','integrity','authkey'],['privacy','privkey'],),
-        supports_check_mode=False)
-
-    m_args = module.params
-
-    if not has_pysnmp:
-        module.fail_json(msg='Missing required pysnmp module (check docs)')
+def column_index(oid, column):
+    """
+    Return the row index of oid if it belongs to the table column, None
+    otherwise. GETBULK responses run past the end of shorter columns, so
+    every value is checked against the column it was requested for.
+    """
+    if oid.startswith(column + '.'):
+        return oid[len(column) + 1:]
+    return None
+
+def resolve_tables(module, names):
+    tables = []
+    for name in names:
+        if name in KNOWN_TABLES:
+            tables.append((name, KNOWN_TABLES[name][0], KNOWN_TABLES[name][1]))
+        elif name.strip('.').replace('.', '').isdigit():
+            tables.append((name, name.strip('.'), {}))
+        else:
+            module.fail_json(msg='Unknown table %s, use one of %s or a numeric OID' % (name, ', '.join(KNOWN_TABLES.keys())))
+    return tables
 
-    cmdGen = cmdgen.CommandGenerator()
+def get_snmp_auth(module, m_args):
 
     # Verify that we receive a community when using snmp v2
     if m_args['version'] == "v2" or m_args['version'] == "v2c":
@@ -231,6 +309,28 @@ def main():
     else:
         snmp_auth = cmdgen.UsmUserData(m_args['username'], authKey=m_args['authkey'], privKey=m_args['privkey'], authProtocol=integrity_proto, privProtocol=privacy_proto)
 
+    return snmp_auth
+
+def bulk_walk(cmdGen, snmp_auth, host, max_repetitions, oids):
+    """
+    GETBULK walk of the given OIDs. Returns (varTable, error).
+    """
+    args = [snmp_auth, cmdgen.UdpTransportTarget((host, 161)), 0, max_repetitions]
+    for oid in oids:
+        args.append(cmdgen.MibVariable('.' + oid,))
+    errorIndication, errorStatus, errorIndex, varTable = cmdGen.bulkCmd(
+        *args, **dict(lookupMib=False)
+    )
+    if errorIndication:
+        return None, str(errorIndication)
+    return varTable, None
+
+def gather_facts(snmp_auth, host, max_repetitions, tables):
+    """
+    Poll one host. Returns (facts, error); error is None on success.
+    """
+    cmdGen = cmdgen.CommandGenerator()
+
     # Use p to prefix OIDs with a dot for polling
     p = DefineOid(dotprefix=True)
     # Use v without a prefix to use with return values
@@ -242,7 +342,7 @@ def main():
 
     errorIndication, errorStatus, errorIndex, varBinds = cmdGen.getCmd(
         snmp_auth,
-        cmdgen.UdpTransportTarget((m_args['host'], 161)),
+        cmdgen.UdpTransportTarget((host, 161)),
         cmdgen.MibVariable(p.sysDescr,),
         cmdgen.MibVariable(p.sysObjectId,),
         cmdgen.MibVariable(p.sysUpTime,),
@@ -254,7 +354,7 @@ def main():
 
 
     if errorIndication:
-        module.fail_json(msg=str(errorIndication))
+        return None, str(errorIndication)
 
     for oid, val in varBinds:
         current_oid = oid.prettyPrint()
@@ -272,76 +372,86 @@ def main():
         elif current_oid == v.sysLocation:
             results['ansible_syslocation'] = current_val
 
-    errorIndication, errorStatus, errorIndex, varTable = cmdGen.nextCmd(
-        snmp_auth,
-        cmdgen.UdpTransportTarget((m_args['host'], 161)),
-        cmdgen.MibVariable(p.ifIndex,),
-        cmdgen.MibVariable(p.ifDescr,),
-        cmdgen.MibVariable(p.ifMtu,),
-        cmdgen.MibVariable(p.ifSpeed,),
-        cmdgen.MibVariable(p.ifPhysAddress,),
-        cmdgen.MibVariable(p.ifAdminStatus,),
-        cmdgen.MibVariable(p.ifOperStatus,),
-        cmdgen.MibVariable(p.ipAdEntAddr,),
-        cmdgen.MibVariable(p.ipAdEntIfIndex,),
-        cmdgen.MibVariable(p.ipAdEntNetMask,),
-
-        cmdgen.MibVariable(p.ifAlias,),
-        lookupMib=False
-    )
-
-
-    if errorIndication:
-        module.fail_json(msg=str(errorIndication))
+    # Walk the interface and address tables in a single GETBULK walk
+    # fetching max_repetitions rows per round trip
+    columns = [v.ifIndex, v.ifDescr, v.ifMtu, v.ifSpeed, v.ifPhysAddress,
+               v.ifAdminStatus, v.ifOperStatus, v.ipAdEntAddr,
+               v.ipAdEntIfIndex, v.ipAdEntNetMask, v.ifAlias]
+    varTable, error = bulk_walk(cmdGen, snmp_auth, host, max_repetitions, columns)
+    if error:
+        return None, error
 
     interface_indexes = []
 
     all_ipv4_addresses = []
     ipv4_networks = Tree()
+    extra_tables = Tree()
 
     for varBinds in varTable:
         for oid, val in varBinds:
             current_oid = oid.prettyPrint()
             current_val = val.prettyPrint()
-            if v.ifIndex in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['ifindex'] = current_val
-                interface_indexes.append(ifIndex)
-            if v.ifDescr in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['name'] = current_val
-            if v.ifMtu in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['mtu'] = current_val
-            if v.ifMtu in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['speed'] = current_val
-            if v.ifPhysAddress in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['mac'] = decode_mac(current_val)
-            if v.ifAdminStatus in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['adminstatus'] = lookup_adminstatus(int(current_val))
-            if v.ifOperStatus in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['operstatus'] = lookup_operstatus(int(current_val))
-            if v.ipAdEntAddr in current_oid:
-                curIPList = current_oid.rsplit('.', 4)[-4:]
-                curIP = ".".join(curIPList)
-                ipv4_networks[curIP]['address'] = current_val
-                all_ipv4_addresses.append(current_val)
-            if v.ipAdEntIfIndex in current_oid:
-                curIPList = current_oid.rsplit('.', 4)[-4:]
-                curIP = ".".join(curIPList)
-                ipv4_networks[curIP]['interface'] = current_val
-            if v.ipAdEntNetMask in current_oid:
-                curIPList = current_oid.rsplit('.', 4)[-4:]
-                curIP = ".".join(curIPList)
-                ipv4_networks[curIP]['netmask'] = current_val
-
-            if v.ifAlias in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['description'] = current_val
+            index = column_index(current_oid, v.ifIndex)
+            if index is not None:
+                ifIndex = int(index)
+                if ifIndex not in interface_indexes:
+                    results['ansible_interfaces'][ifIndex]['ifindex'] = current_val
+                    interface_indexes.append(ifIndex)
+                continue
+            index = column_index(current_oid, v.ifDescr)
+            if index is not None:
+                results['ansible_interfaces'][int(index)]['name'] = current_val
+                continue
+            index = column_index(current_oid, v.ifMtu)
+            if index is not None:
+                results['ansible_interfaces'][int(index)]['mtu'] = current_val
+                continue
+            index = column_index(current_oid, v.ifSpeed)
+            if index is not None:
+                results['ansible_interfaces'][int(index)]['speed'] = current_val
+                continue
+            index = column_index(current_oid, v.ifPhysAddress)
+            if index is not None:
+                results['ansible_interfaces'][int(index)]['mac'] = decode_mac(current_val)
+                continue
+            index = column_index(current_oid, v.ifAdminStatus)
+            if index is not None:
+                results['ansible_interfaces'][int(index)]['adminstatus'] = lookup_adminstatus(int(current_val))
+                continue
+            index = column_index(current_oid, v.ifOperStatus)
+            if index is not None:
+                results['ansible_interfaces'][int(index)]['operstatus'] = lookup_operstatus(int(current_val))
+                continue
+            index = column_index(current_oid, v.ipAdEntAddr)
+            if index is not None:
+                if index not in ipv4_networks:
+                    all_ipv4_addresses.append(current_val)
+                ipv4_networks[index]['address'] = current_val
+                continue
+            index = column_index(current_oid, v.ipAdEntIfIndex)
+            if index is not None:
+                ipv4_networks[index]['interface'] = current_val
+                continue
+            index = column_index(current_oid, v.ipAdEntNetMask)
+            if index is not None:
+                ipv4_networks[index]['netmask'] = current_val
+                continue
+            index = column_index(current_oid, v.ifAlias)
+            if index is not None:
+                results['ansible_interfaces'][int(index)]['description'] = current_val
+
+    # Each extra table is walked on its own, so that a wide table does not
+    # keep the columns above running past their end on every round trip
+    for name, entry, names in tables:
+        varTable, error = bulk_walk(cmdGen, snmp_auth, host, max_repetitions, [entry])
+        if error:
+            return None, error
+        for varBinds in varTable:
+            for oid, val in varBinds:
+                index = column_index(oid.prettyPrint(), entry)
+                if index is not None and '.' in index:
+                    column, row = index.split('.', 1)
+                    extra_tables[name][row][names.get(int(column), column)] = val.prettyPrint()
 
     interface_to_ipv4 = {}
     for ipv4_network in ipv4_networks:
@@ -361,6 +471,94 @@ def main():
 
     results['ansible_all_ipv4_addresses'] = all_ipv4_addresses
 
+    if tables:
+        results['ansible_snmp_tables'] = extra_tables
+
+    return results, None
+
+def gather_facts_for_hosts(snmp_auth, hosts, max_repetitions, tables, max_workers):
+    """
+    Poll several hosts concurrently, each with its own command generator,
+    with at most max_workers hosts in flight.
+    """
+    pending = list(hosts)
+    facts = {}
+    errors = {}
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            lock.acquire()
+            try:
+                if not pending:
+                    return
+                host = pending.pop(0)
+            finally:
+                lock.release()
+            try:
+                result, error = gather_facts(snmp_auth, host, max_repetitions, tables)
+            except Exception:
+                result, error = None, str(get_exception())
+            lock.acquire()
+            try:
+                if error is None:
+                    facts[host] = result
+                else:
+                    errors[host] = error
+            finally:
+                lock.release()
+
+    threads = []
+    for i in range(max(1, min(max_workers, len(pending)))):
+        t = threading.Thread(target=worker)
+        t.setDaemon(True)
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+
+    return facts, errors
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            host=dict(required=False),
+            hosts=dict(required=False, type='list'),
+            max_workers=dict(required=False, default=10, type='int'),
+            max_repetitions=dict(required=False, default=25, type='int'),
+            extra_tables=dict(required=False, default=[], type='list'),
+            version=dict(required=True, choices=['v2', 'v2c', 'v3']),
+            community=dict(required=False, default=False),
+            username=dict(required=False),
+            level=dict(required=False, choices=['authNoPriv', 'authPriv']),
+            integrity=dict(required=False, choices=['md5', 'sha']),
+            privacy=dict(required=False, choices=['des', 'aes']),
+            authkey=dict(required=False),
+            privkey=dict(required=False),
+            removeplaceholder=dict(required=False)),
+            required_together = ( ['username','level','integrity','authkey'],['privacy','privkey'],),
+            required_one_of = [['host', 'hosts']],
+            mutually_exclusive = [['host', 'hosts']],
+        supports_check_mode=False)
+
+    m_args = module.params
+
+    if not has_pysnmp:
+        module.fail_json(msg='Missing required pysnmp module (check docs)')
+
+    snmp_auth = get_snmp_auth(module, m_args)
+    tables = resolve_tables(module, m_args['extra_tables'])
+
+    if m_args['hosts']:
+        facts, errors = gather_facts_for_hosts(snmp_auth, m_args['hosts'], m_args['max_repetitions'], tables, m_args['max_workers'])
+        if not facts:
+            module.fail_json(msg='Unable to poll any host', failed_hosts=errors)
+        module.exit_json(ansible_facts=dict(snmp_hosts=facts), failed_hosts=errors)
+
+    results, error = gather_facts(snmp_auth, m_args['host'], m_args['max_repetitions'], tables)
+    if error:
+        module.fail_json(msg=error)
+
     module.exit_json(ansible_facts=results)
 
 
@@ -22,11 +22,18 @@
 __author__ = 'cschmidt'
 
 from lxml import etree
+import copy
 import os
 import hashlib
-import sys
+import shutil
+import tempfile
+import threading
 import posixpath
 import urlparse
+try:
+    import queue
+except ImportError:
+    import Queue as queue
 from ansible.module_utils.basic import *
 from ansible.module_utils.urls import *
 try:
@@ -115,6 +122,30 @@ options:
         default: 'yes'
         choices: ['yes', 'no']
         version_added: "1.9.3"
+    artifacts:
+        description:
+            - A list of artifacts to download in one task. Each item is a dictionary with C(group_id), C(artifact_id)
+              and C(dest), and optionally C(version), C(classifier) and C(extension), which default to the module
+              parameters of the same name.
+            - Artifacts are downloaded in parallel by up to C(max_workers) threads. An artifact requested for several
+              destinations is downloaded only once.
+        required: false
+        default: null
+        version_added: "2.3"
+    max_workers:
+        description:
+            - Number of artifacts downloaded concurrently when C(artifacts) is used.
+        required: false
+        default: 4
+        version_added: "2.3"
+    cache_dir:
+        description:
+            - Directory of a content addressed cache shared by all tasks on the host. Downloaded artifacts are stored
+              there under their MD5 checksum and later requests for an artifact with the same checksum are copied
+              from the cache instead of being downloaded again.
+        required: false
+        default: null
+        version_added: "2.3"
 '''
 
 EXAMPLES = '''
@@ -129,6 +160,16 @@ EXAMPLES = '''
 
 # Download a WAR File to the Tomcat webapps directory to be deployed
 - maven_artifact: group_id=com.company artifact_id=web-app extension=war repository_url=https://repo.company.com/maven dest=/var/lib/tomcat7/webapps/web-app.war
+
+# Download several artifacts in parallel, reusing a host-wide cache
+- maven_artifact:
+    repository_url: https://repo.company.com/maven
+    cache_dir: /var/cache/maven-artifacts
+    max_workers: 8
+    artifacts:
+      - { group_id: com.company, artifact_id: core, version: 1.2.0, dest: /opt/app1/lib/ }
+      - { group_id: com.company, artifact_id: core, version: 1.2.0, dest: /opt/app2/lib/ }
+      - { group_id: com.company, artifact_id: web-app, extension: war, dest: /var/lib/tomcat7/webapps/web-app.war }
 '''
 
 class Artifact(object):
@@ -198,13 +239,59 @@ class Artifact(object):
             return None
 
 
+CHUNK_SIZE = 64 * 1024
+
+
+class WorkerError(Exception):
+    pass
+
+
+class WorkerModule(object):
+    """Module stand-in for worker threads.
+
+    fetch_url and atomic_move report errors through fail_json, which prints
+    a result and exits; in a worker that would race the result written by
+    the main thread. fetch_url failures are raised as WorkerError instead,
+    and the atomic_move calls are recorded in moves for the main thread to
+    carry out.
+    """
+
+    def __init__(self, module, moves):
+        self._module = module
+        self.moves = moves
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+    def atomic_move(self, src, dest):
+        self.moves.append((src, dest))
+
+    def fail_json(self, **kwargs):
+        raise WorkerError(kwargs.get('msg', 'unknown error'))
+
+    def exit_json(self, **kwargs):
+        raise WorkerError('exit_json called from a worker thread')
+
+
 class MavenDownloader:
-    def __init__(self, module, base="http://repo1.maven.org/maven2"):
+    def __init__(self, module, base="http://repo1.maven.org/maven2", cache_dir=None):
         self.module = module
         if base.endswith("/"):
             base = base.rstrip("/")
         self.base = base
         self.user_agent = "Maven Artifact Downloader/1.0"
+        self.cache_dir = cache_dir
+
+        # Hack to add parameters in the way that fetch_url expects
+        self.module.params['url_username'] = self.module.params.get('username', '')
+        self.module.params['url_password'] = self.module.params.get('password', '')
+        self.module.params['http_agent'] = self.module.params.get('user_agent', None)
+
+    def for_worker(self, moves):
+        """Return a copy of this downloader for use in a worker thread."""
+        worker = copy.copy(self)
+        worker.module = WorkerModule(self.module, moves)
+        return worker
 
     def _find_latest_version_available(self, artifact):
         path = "/%s/maven-metadata.xml" % (artifact.path(False))
@@ -251,11 +338,6 @@ class MavenDownloader:
 
         req_timeout = self.module.params.get('timeout')
 
-        # Hack to add parameters in the way that fetch_url expects
-        self.module.params['url_username'] = self.module.params.get('username', '')
-        self.module.params['url_password'] = self.module.params.get('password', '')
-        self.module.params['http_agent'] = self.module.params.get('user_agent', None)
-
         response, info = fetch_url(self.module, url_to_use, timeout=req_timeout)
         if info['status'] != 200:
             raise ValueError(failmsg + " because of " + info['msg'] + "for URL " + url_to_use)
@@ -263,39 +345,91 @@ class MavenDownloader:
             return f(response)
 
 
-    def download(self, artifact, filename=None):
-        filename = artifact.get_filename(filename)
-        if not artifact.version or artifact.version == "latest":
-            artifact = Artifact(artifact.group_id, artifact.artifact_id, self._find_latest_version_available(artifact),
-                                artifact.classifier, artifact.extension)
-
-        url = self.find_uri_for_artifact(artifact)
-        if not self.verify_md5(filename, url + ".md5"):
-            response = self._request(url, "Failed to download artifact " + str(artifact), lambda r: r)
-            if response:
-                f = open(filename, 'w')
-                # f.write(response.read())
-                self._write_chunks(response, f, report_hook=self.chunk_report)
-                f.close()
-                return True
-            else:
-                return False
+    def fetch(self, artifact, url, filenames):
+        """Make every file in filenames a copy of the artifact at url.
+
+        The remote checksum is fetched once; files that already match it are
+        left alone and the artifact is downloaded at most once, or copied from
+        the cache. Returns the list of files that were changed.
+
+        Repositories need not publish checksums; without one every file is
+        downloaded again and the cache is not used.
+        """
+        try:
+            remote_md5 = self._remote_md5(url + ".md5")
+        except ValueError:
+            remote_md5 = None
+        if remote_md5:
+            outdated = [f for f in filenames if not (os.path.exists(f) and self._local_md5(f) == remote_md5)]
+            if not outdated:
+                return []
         else:
-            return True
-
-    def chunk_report(self, bytes_so_far, chunk_size, total_size):
-        percent = float(bytes_so_far) / total_size
-        percent = round(percent * 100, 2)
-        sys.stdout.write("Downloaded %d of %d bytes (%0.2f%%)\r" %
-                         (bytes_so_far, total_size, percent))
-
-        if bytes_so_far >= total_size:
-            sys.stdout.write('\n')
-
-    def _write_chunks(self, response, file, chunk_size=8192, report_hook=None):
-        total_size = response.info().getheader('Content-Length').strip()
-        total_size = int(total_size)
+            outdated = list(filenames)
+
+        cached = self._cache_path(remote_md5)
+        if cached and os.path.exists(cached):
+            for filename in outdated:
+                self._copy(cached, filename)
+            return outdated
+
+        # Copies are taken from the download itself, as in a worker thread
+        # atomic_move only happens once the pool is done
+        tmp = self._download_to(url, os.path.dirname(outdated[0]), remote_md5, str(artifact))
+        if cached:
+            self._copy(tmp, cached)
+        for filename in outdated[1:]:
+            self._copy(tmp, filename)
+        self.module.atomic_move(tmp, outdated[0])
+        return outdated
+
+    def _download_to(self, url, directory, expected_md5, name):
+        """Stream url into a temporary file in directory, hashing it on the way."""
+        response = self._request(url, "Failed to download artifact " + name, lambda r: r)
+        self._makedirs(directory)
+        fd, tmp = tempfile.mkstemp(dir=directory or '.')
+        f = os.fdopen(fd, 'wb')
+        try:
+            try:
+                md5 = self._write_chunks(response, f)[1]
+            finally:
+                f.close()
+        except Exception:
+            os.remove(tmp)
+            raise
+        if expected_md5 and md5 != expected_md5:
+            os.remove(tmp)
+            raise ValueError("Checksum mismatch for artifact %s: expected %s, got %s" % (name, expected_md5, md5))
+        return tmp
+
+    def _cache_path(self, md5):
+        if not (self.cache_dir and md5):
+            return None
+        return os.path.join(self.cache_dir, md5[:2], md5)
+
+    def _makedirs(self, directory):
+        if directory and not os.path.exists(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # Another worker may have created it meanwhile
+                if not os.path.isdir(directory):
+                    raise
+
+    def _copy(self, source, dest):
+        """Atomically place a copy of source at dest."""
+        directory = os.path.dirname(dest)
+        self._makedirs(directory)
+        fd, tmp = tempfile.mkstemp(dir=directory or '.')
+        os.close(fd)
+        shutil.copyfile(source, tmp)
+        self.module.atomic_move(tmp, dest)
+
+    def _write_chunks(self, response, file, chunk_size=CHUNK_SIZE, report_hook=None):
+        total_size = response.info().getheader('Content-Length')
+        if total_size:
+            total_size = int(total_size.strip())
         bytes_so_far = 0
+        md5 = hashlib.md5()
 
         while 1:
             chunk = response.read(chunk_size)
@@ -305,28 +439,104 @@ class MavenDownloader:
                 break
 
             file.write(chunk)
-            if report_hook:
+            md5.update(chunk)
+            if report_hook and total_size:
                 report_hook(bytes_so_far, chunk_size, total_size)
 
-        return bytes_so_far
+        return bytes_so_far, md5.hexdigest()
 
-    def verify_md5(self, file, remote_md5):
-        if not os.path.exists(file):
-            return False
-        else:
-            local_md5 = self._local_md5(file)
-            remote = self._request(remote_md5, "Failed to download MD5", lambda r: r.read())
-            return local_md5 == remote
+    def _remote_md5(self, url):
+        # Checksum files may carry the file name after the checksum
+        remote = self._request(url, "Failed to download MD5", lambda r: r.read())
+        fields = remote.split()
+        if fields:
+            return fields[0].lower()
+        return None
 
     def _local_md5(self, file):
         md5 = hashlib.md5()
         f = open(file, 'rb')
-        for chunk in iter(lambda: f.read(8192), ''):
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), ''):
             md5.update(chunk)
         f.close()
         return md5.hexdigest()
 
 
+def download_artifacts(module, downloader, items, max_workers):
+    """Download a list of artifacts with a bounded pool of worker threads."""
+    defaults = module.params
+    jobs = {}
+    order = []
+    results = []
+    for item in items:
+        if not isinstance(item, dict):
+            module.fail_json(msg="Each item in artifacts must be a dictionary")
+        try:
+            artifact = Artifact(item.get('group_id'), item.get('artifact_id'),
+                                item.get('version', defaults['version']),
+                                item.get('classifier', defaults['classifier']),
+                                item.get('extension', defaults['extension']))
+        except ValueError as e:
+            module.fail_json(msg=e.args[0])
+        dest = item.get('dest')
+        if not dest:
+            module.fail_json(msg="dest must be set for artifact %s" % artifact)
+        dest = os.path.expanduser(dest)
+        if os.path.isdir(dest):
+            dest = posixpath.join(dest, "%s-%s.%s" % (artifact.artifact_id, artifact.version, artifact.extension))
+        result = dict(dest=dest, group_id=artifact.group_id, artifact_id=artifact.artifact_id,
+                      version=artifact.version, classifier=artifact.classifier, extension=artifact.extension,
+                      changed=False)
+        results.append(result)
+        # The same coordinates deployed to several places are fetched once
+        key = str(artifact)
+        if key not in jobs:
+            jobs[key] = (artifact, [])
+            order.append(key)
+        jobs[key][1].append(result)
+
+    work = queue.Queue()
+    for key in order:
+        work.put(jobs[key])
+    errors = []
+    moves = []
+
+    def worker():
+        thread_downloader = downloader.for_worker(moves)
+        while True:
+            try:
+                artifact, job_results = work.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                url = thread_downloader.find_uri_for_artifact(artifact)
+                changed = thread_downloader.fetch(artifact, url, [r['dest'] for r in job_results])
+                for r in job_results:
+                    r['changed'] = r['dest'] in changed
+            except Exception as e:
+                errors.append("%s: %s" % (artifact, e))
+
+    threads = []
+    for i in range(max(1, min(max_workers, len(order)))):
+        t = threading.Thread(target=worker)
+        t.daemon = True
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+
+    # Downloads are put in place from here, where a failing atomic_move may
+    # write the module result
+    for src, dest in moves:
+        module.atomic_move(src, dest)
+
+    if errors:
+        module.fail_json(msg="Unable to download some artifacts: %s" % "; ".join(errors), artifacts=results)
+
+    changed = len([r for r in results if r['changed']]) > 0
+    module.exit_json(changed=changed, artifacts=results)
+
+
 def main():
     module = AnsibleModule(
         argument_spec = dict(
@@ -342,6 +552,9 @@ def main():
             timeout = dict(default=10, type='int'),
             dest = dict(type="path", default=None),
             validate_certs = dict(required=False, default=True, type='bool'),
+            artifacts = dict(type='list', default=None),
+            max_workers = dict(type='int', default=4),
+            cache_dir = dict(type='path', default=None),
         )
     )
 
@@ -368,31 +581,24 @@ def main():
         repository_url = "http://repo1.maven.org/maven2"
 
     #downloader = MavenDownloader(module, repository_url, repository_username, repository_password)
-    downloader = MavenDownloader(module, repository_url)
+    downloader = MavenDownloader(module, repository_url, module.params["cache_dir"])
+
+    if module.params["artifacts"] is not None:
+        download_artifacts(module, downloader, module.params["artifacts"], module.params["max_workers"])
 
     try:
         artifact = Artifact(group_id, artifact_id, version, classifier, extension)
     except ValueError as e:
         module.fail_json(msg=e.args[0])
 
-    prev_state = "absent"
     if os.path.isdir(dest):
         dest = posixpath.join(dest, artifact_id + "-" + version + "." + extension)
-    if os.path.lexists(dest) and downloader.verify_md5(dest, downloader.find_uri_for_artifact(artifact) + '.md5'):
-        prev_state = "present"
-    else:
-        path = os.path.dirname(dest)
-        if not os.path.exists(path):
-            os.makedirs(path)
-
-    if prev_state == "present":
-        module.exit_json(dest=dest, state=state, changed=False)
 
     try:
-        if downloader.download(artifact, dest):
-            module.exit_json(state=state, dest=dest, group_id=group_id, artifact_id=artifact_id, version=version, classifier=classifier, extension=extension, repository_url=repository_url, changed=True)
-        else:
-            module.fail_json(msg="Unable to download the artifact")
+        # The checksum is fetched and the local file hashed only once
+        if not downloader.fetch(artifact, downloader.find_uri_for_artifact(artifact), [dest]):
+            module.exit_json(dest=dest, state=state, changed=False)
+        module.exit_json(state=state, dest=dest, group_id=group_id, artifact_id=artifact_id, version=version, classifier=classifier, extension=extension, repository_url=repository_url, changed=True)
     except ValueError as e:
         module.fail_json(msg=e.args[0])
 
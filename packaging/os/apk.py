@@ -99,39 +99,70 @@ def update_package_db(module):
     else:
         module.fail_json(msg="could not update package db")
 
-def query_package(module, name):
-    cmd = "%s -v info --installed %s" % (APK_PATH, name)
-    rc, stdout, stderr = module.run_command(cmd, check_rc=False)
-    if rc == 0:
-        return True
-    else:
-        return False
+def split_package(package):
+    # "name-1.2.3-r0" -> ("name", "1.2.3-r0"); virtual packages created with
+    # "apk add --virtual" carry a timestamp version instead: "name-20160101.123456"
+    match = re.match(r'^(.+)-([^-]+-r\d+|\d{8}\.\d{6})$', package)
+    if match:
+        return match.group(1), match.group(2)
+    return package, None
 
-def query_latest(module, name):
-    cmd = "%s version %s" % (APK_PATH, name)
+def get_package_index(module):
+    # One "apk info -v" for the installed packages and one "apk version -l <"
+    # for the outdated ones answer every query below from memory
+    index = dict(installed={}, outdated={}, depends={})
+    cmd = "%s info -v" % (APK_PATH)
     rc, stdout, stderr = module.run_command(cmd, check_rc=False)
-    search_pattern = "(%s)-[\d\.\w]+-[\d\w]+\s+(.)\s+[\d\.\w]+-[\d\w]+\s+" % (name)
-    match = re.search(search_pattern, stdout)
-    if match and match.group(2) == "<":
-        return False
-    return True
-
-def query_virtual(module, name):
-    cmd = "%s -v info --description %s" % (APK_PATH, name)
+    if rc != 0:
+        module.fail_json(msg="failed to list installed packages", stderr=stderr)
+    for line in stdout.splitlines():
+        name, version = split_package(line.strip())
+        if version:
+            index['installed'][name] = version
+    cmd = "%s version -l '<'" % (APK_PATH)
+    rc, stdout, stderr = module.run_command(cmd, check_rc=False)
+    for line in stdout.splitlines():
+        fields = line.split()
+        if len(fields) >= 2 and fields[1] == '<':
+            name, version = split_package(fields[0])
+            index['outdated'][name] = version
+    return index
+
+def load_dependencies(module, index, names):
+    # Fetch the dependencies of all the given packages with a single call
+    names = [name for name in names if name not in index['depends']]
+    if not names:
+        return
+    cmd = "%s -v info --depends %s" % (APK_PATH, " ".join(names))
     rc, stdout, stderr = module.run_command(cmd, check_rc=False)
-    search_pattern = "^%s: virtual meta package" % (name)
-    if re.search(search_pattern, stdout):
+    current = None
+    for line in stdout.splitlines():
+        line = line.strip()
+        if line.endswith(' depends on:'):
+            current = split_package(line[:-len(' depends on:')])[0]
+            index['depends'][current] = []
+        elif line and current is not None:
+            index['depends'][current].append(re.split('[<>=~]', line)[0])
+        else:
+            current = None
+    for name in names:
+        index['depends'].setdefault(name, [])
+
+def query_package(module, index, name):
+    return name in index['installed']
+
+def query_latest(module, index, name):
+    return name not in index['outdated']
+
+def query_virtual(module, index, name):
+    version = index['installed'].get(name)
+    if version and re.match(r'^\d{8}\.\d{6}$', version):
         return True
     return False
 
-def get_dependencies(module, name):
-    cmd = "%s -v info --depends %s" % (APK_PATH, name)
-    rc, stdout, stderr = module.run_command(cmd, check_rc=False)
-    dependencies = stdout.split()
-    if len(dependencies) > 1:
-        return dependencies[1:]
-    else:
-        return []
+def get_dependencies(module, index, name):
+    load_dependencies(module, index, [name])
+    return index['depends'][name]
 
 def upgrade_packages(module):
     if module.check_mode:
@@ -149,24 +180,27 @@ def install_packages(module, names, state):
     upgrade = False
     to_install = []
     to_upgrade = []
+    index = get_package_index(module)
+    if state == 'latest':
+        load_dependencies(module, index, [name for name in names if query_virtual(module, index, name)])
     for name in names:
         # Check if virtual package
-        if query_virtual(module, name):
+        if query_virtual(module, index, name):
             # Get virtual package dependencies
-            dependencies = get_dependencies(module, name)
+            dependencies = get_dependencies(module, index, name)
             for dependency in dependencies:
-                if state == 'latest' and not query_latest(module, dependency):
+                if state == 'latest' and not query_latest(module, index, dependency):
                     to_upgrade.append(dependency)
         else:
-            if not query_package(module, name):
+            if not query_package(module, index, name):
                 to_install.append(name)
-            elif state == 'latest' and not query_latest(module, name):
+            elif state == 'latest' and not query_latest(module, index, name):
                 to_upgrade.append(name)
     if to_upgrade:
         upgrade = True
     if not to_install and not upgrade:
         module.exit_json(changed=False, msg="package(s) already installed")
-    packages = " ".join(to_install) + " ".join(to_upgrade)
+    packages = " ".join(to_install + to_upgrade)
     if upgrade:
         if module.check_mode:
             cmd = "%s add --upgrade --simulate %s" % (APK_PATH, packages)
@@ -184,8 +218,9 @@ def install_packages(module, names, state):
 
 def remove_packages(module, names):
     installed = []
+    index = get_package_index(module)
     for name in names:
-        if query_package(module, name):
+        if query_package(module, index, name):
             installed.append(name)
     if not installed:
         module.exit_json(changed=False, msg="package(s) already removed")
@@ -32,7 +32,10 @@ author:
     - "Indrajit Raychaudhuri (@indrajitr)"
     - "'Aaron Bull Schaefer (@elasticdog)' <aaron@elasticdog.com>"
     - "Afterburn"
-notes: []
+notes:
+    - The local and sync package databases are read once per task, and all
+      packages of a task are installed, upgraded or removed in a single
+      pacman transaction.
 requirements: []
 options:
     name:
@@ -118,38 +121,64 @@ import os
 import re
 import sys
 
-def get_version(pacman_output):
-    """Take pacman -Qi or pacman -Si output and get the Version"""
-    lines = pacman_output.split('\n')
-    for line in lines:
-        if 'Version' in line:
-            return line.split(':')[1].strip()
-    return None
-
-def query_package(module, pacman_path, name, state="present"):
-    """Query the package status in both the local system and the repository. Returns a boolean to indicate if the package is installed, a second boolean to indicate if the package is up-to-date and a third boolean to indicate whether online information were available"""
-    if state == "present":
-        lcmd = "%s -Qi %s" % (pacman_path, name)
-        lrc, lstdout, lstderr = module.run_command(lcmd, check_rc=False)
-        if lrc != 0:
-            # package is not installed locally
-            return False, False, False
-
-        # get the version installed locally (if any)
-        lversion = get_version(lstdout)
-
-        rcmd = "%s -Si %s" % (pacman_path, name)
-        rrc, rstdout, rstderr = module.run_command(rcmd, check_rc=False)
-        # get the version in the repository
-        rversion = get_version(rstdout)
-
-        if rrc == 0:
-            # Return True to indicate that the package is installed locally, and the result of the version number comparison
-            # to determine if the package is up-to-date.
-            return True, (lversion == rversion), False
+def get_package_index(module, pacman_path, names):
+    """Read the local and sync package databases once. Returns two dicts mapping package names to versions, the first for installed packages (pacman -Q) and the second for packages available in the repositories (pacman -Sl), and a third dict mapping those of names that are only provided by an installed package to its name"""
+    local = {}
+    rc, stdout, stderr = module.run_command("%s -Q" % pacman_path, check_rc=False)
+    for line in stdout.split('\n'):
+        fields = line.split()
+        if len(fields) >= 2:
+            local[fields[0]] = fields[1]
+
+    provided = {}
+    missing = [name for name in names if name not in local]
+    if missing:
+        # A single pacman -Qi resolves every name satisfied through "provides"
+        rc, stdout, stderr = module.run_command("%s -Qi %s" % (pacman_path, " ".join(missing)), check_rc=False)
+        provider = None
+        key = None
+        for line in stdout.split('\n'):
+            if line[:1].strip():
+                fields = line.split(':', 1)
+                key = fields[0].strip()
+                value = fields[-1]
+            else:
+                # continuation of a wrapped field
+                value = line
+            if key == 'Name':
+                provider = value.strip()
+            elif key == 'Provides' and provider:
+                for dep in value.split():
+                    dep = re.split('[<>=]', dep, 1)[0]
+                    if dep in missing and dep not in provided:
+                        provided[dep] = provider
+
+    sync = {}
+    rc, stdout, stderr = module.run_command("%s -Sl" % pacman_path, check_rc=False)
+    for line in stdout.split('\n'):
+        fields = line.split()
+        # "repo name version [installed]"; the first repository listed wins
+        if len(fields) >= 3 and fields[1] not in sync:
+            sync[fields[1]] = fields[2]
+
+    return local, sync, provided
+
+def query_package(module, index, name, state="present"):
+    """Query the package status in both the local system and the repository using the index from get_package_index. Returns a boolean to indicate if the package is installed, a second boolean to indicate if the package is up-to-date and a third boolean to indicate whether online information were available"""
+    local, sync, provided = index
+    # name may be satisfied by an installed package that provides it
+    name = provided.get(name, name)
+    if name not in local:
+        # package is not installed locally
+        return False, False, False
+
+    if name in sync:
+        # Return True to indicate that the package is installed locally, and the result of the version number comparison
+        # to determine if the package is up-to-date.
+        return True, (local[name] == sync[name]), False
 
     # package is installed but cannot fetch remote Version. Last True stands for the error
-        return True, True, True
+    return True, True, True
 
 
 def update_package_db(module, pacman_path):
@@ -183,7 +212,7 @@ def upgrade(module, pacman_path):
     else:
         module.exit_json(changed=False, msg='Nothing to upgrade')
 
-def remove_packages(module, pacman_path, packages):
+def remove_packages(module, pacman_path, index, packages):
     if module.params["recurse"] or module.params["force"]:
         if module.params["recurse"]:
             args = "Rs"
@@ -194,37 +223,35 @@ def remove_packages(module, pacman_path, packages):
     else:
         args = "R"
 
-    remove_c = 0
-    # Using a for loop incase of error, we can report the package that failed
+    # Query the packages first, to see if we even need to remove
+    to_remove = []
     for package in packages:
-        # Query the package first, to see if we even need to remove
-        installed, updated, unknown = query_package(module, pacman_path, package)
-        if not installed:
-            continue
+        installed, updated, unknown = query_package(module, index, package)
+        if installed and package not in to_remove:
+            to_remove.append(package)
 
-        cmd = "%s -%s %s --noconfirm" % (pacman_path, args, package)
-        rc, stdout, stderr = module.run_command(cmd, check_rc=False)
-
-        if rc != 0:
-            module.fail_json(msg="failed to remove %s" % (package))
+    if not to_remove:
+        module.exit_json(changed=False, msg="package(s) already absent")
 
-        remove_c += 1
-
-    if remove_c > 0:
+    # Remove everything in a single transaction
+    cmd = "%s -%s %s --noconfirm" % (pacman_path, args, " ".join(to_remove))
+    rc, stdout, stderr = module.run_command(cmd, check_rc=False)
 
-        module.exit_json(changed=True, msg="removed %s package(s)" % remove_c)
+    if rc != 0:
+        module.fail_json(msg="failed to remove %s" % " ".join(to_remove), stdout=stdout, stderr=stderr)
 
-    module.exit_json(changed=False, msg="package(s) already absent")
+    module.exit_json(changed=True, msg="removed %s package(s)" % len(to_remove))
 
 
-def install_packages(module, pacman_path, state, packages, package_files):
-    install_c = 0
+def install_packages(module, pacman_path, index, state, packages, package_files):
     package_err = []
     message = ""
+    to_install = []
+    to_install_files = []
 
     for i, package in enumerate(packages):
         # if the package is installed and state == present or state == latest and is up-to-date then skip
-        installed, updated, latestError = query_package(module, pacman_path, package)
+        installed, updated, latestError = query_package(module, index, package)
         if latestError and state == 'latest':
             package_err.append(package)
 
@@ -232,17 +259,23 @@ def install_packages(module, pacman_path, state, packages, package_files):
             continue
 
         if package_files[i]:
-            params = '-U %s' % package_files[i]
-        else:
-            params = '-S %s' % package
+            if package_files[i] not in to_install_files:
+                to_install_files.append(package_files[i])
+        elif package not in to_install:
+            to_install.append(package)
+
+    # One transaction per source: repositories with -S, package files with -U
+    for params, targets in (('-S', to_install), ('-U', to_install_files)):
+        if not targets:
+            continue
 
-        cmd = "%s %s --noconfirm --needed" % (pacman_path, params)
+        cmd = "%s %s %s --noconfirm --needed" % (pacman_path, params, " ".join(targets))
         rc, stdout, stderr = module.run_command(cmd, check_rc=False)
 
         if rc != 0:
-            module.fail_json(msg="failed to install %s" % (package))
+            module.fail_json(msg="failed to install %s" % " ".join(targets), stdout=stdout, stderr=stderr)
 
-        install_c += 1
+    install_c = len(to_install) + len(to_install_files)
 
     if state == 'latest' and len(package_err) > 0:
         message = "But could not ensure 'latest' state for %s package(s) as remote version could not be fetched." % (package_err)
@@ -252,10 +285,10 @@ def install_packages(module, pacman_path, state, packages, package_files):
 
     module.exit_json(changed=False, msg="package(s) already installed. %s" % (message))
 
-def check_packages(module, pacman_path, packages, state):
+def check_packages(module, pacman_path, index, packages, state):
     would_be_changed = []
     for package in packages:
-        installed, updated, unknown = query_package(module, pacman_path, package)
+        installed, updated, unknown = query_package(module, index, package)
         if ((state in ["present", "latest"] and not installed) or
                 (state == "absent" and installed) or
                 (state == "latest" and not updated)):
@@ -270,18 +303,20 @@ def check_packages(module, pacman_path, packages, state):
 
 
 def expand_package_groups(module, pacman_path, pkgs):
-    expanded = []
+    """Replace group names in pkgs by their members, querying all groups with a single pacman -Sg call"""
+    groups = {}
+    cmd = "%s -Sg %s" % (pacman_path, " ".join(pkgs))
+    rc, stdout, stderr = module.run_command(cmd, check_rc=False)
+    for line in stdout.split('\n'):
+        fields = line.split()
+        if len(fields) == 2:
+            groups.setdefault(fields[0], []).append(fields[1])
 
+    expanded = []
     for pkg in pkgs:
-        cmd = "%s -Sgq %s" % (pacman_path, pkg)
-        rc, stdout, stderr = module.run_command(cmd, check_rc=False)
-
-        if rc == 0:
+        if pkg in groups:
             # A group was found matching the name, so expand it
-            for name in stdout.split('\n'):
-                name = name.strip()
-                if name:
-                    expanded.append(name)
+            expanded.extend(groups[pkg])
         else:
             expanded.append(pkg)
 
@@ -303,6 +338,9 @@ def main():
 
     pacman_path = module.get_bin_path('pacman', True)
 
+    # pacman -Qi field names are localized
+    module.run_command_environ_update = dict(LANG='C', LC_ALL='C', LC_MESSAGES='C', LC_CTYPE='C')
+
     p = module.params
 
     # normalize the state parameter
@@ -335,13 +373,15 @@ def main():
             else:
                 pkg_files.append(None)
 
+        index = get_package_index(module, pacman_path, pkgs)
+
         if module.check_mode:
-            check_packages(module, pacman_path, pkgs, p['state'])
+            check_packages(module, pacman_path, index, pkgs, p['state'])
 
         if p['state'] in ['present', 'latest']:
-            install_packages(module, pacman_path, p['state'], pkgs, pkg_files)
+            install_packages(module, pacman_path, index, p['state'], pkgs, pkg_files)
         elif p['state'] == 'absent':
-            remove_packages(module, pacman_path, pkgs)
+            remove_packages(module, pacman_path, index, pkgs)
 
 # import module snippets
 from ansible.module_utils.basic import *
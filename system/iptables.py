@@ -18,11 +18,25 @@
 # You should have received a copy of the GNU General Public License
 # along with this software.  If not, see <http://www.gnu.org/licenses/>.
 
+import random
+import re
+import time
+
 BINS = dict(
     ipv4='iptables',
     ipv6='ip6tables',
 )
 
+SAVE_BINS = dict(
+    ipv4='iptables-save',
+    ipv6='ip6tables-save',
+)
+
+RESTORE_BINS = dict(
+    ipv4='iptables-restore',
+    ipv6='ip6tables-restore',
+)
+
 DOCUMENTATION = '''
 ---
 module: iptables
@@ -291,6 +305,26 @@ options:
         ACCEPT, DROP, QUEUE, RETURN. Only built in chains can have policies.
         This parameter requires the chain parameter. Ignores all other
         parameters."
+  rules:
+    version_added: "2.3"
+    description:
+      - "A list of rules to converge in a single transaction. Each item is
+        a dictionary accepting the same rule options as the module itself
+        (including C(table), C(chain), C(state) and C(action)); options not
+        given in an item are taken from the module parameters; C(flush),
+        C(policy) and C(ip_version) can not be set per item. The desired
+        rules are loaded into temporary scratch chains and read back with
+        iptables-save, so they are compared in the form the kernel prints
+        them, and all changes are applied atomically with one
+        C(iptables-restore --noflush) call. Scratch chains that an
+        interrupted run left in the same tables more than an hour ago are
+        removed then and listed in C(reaped_chains), without affecting
+        C(changed). In check mode no chain is created
+        and each rule is looked up with C(iptables -C) instead. Rules added
+        with C(action=insert) keep their relative order at the top of the
+        chain."
+    required: false
+    default: null
 '''
 
 EXAMPLES = '''
@@ -311,6 +345,16 @@ EXAMPLES = '''
 
 # Tag all outbound tcp packets with DSCP DiffServ class CS1
 - iptables: chain=OUTPUT jump=DSCP table=mangle set_dscp_mark_class=CS1 protocol=tcp
+
+# Converge many rules with one iptables-save and one iptables-restore call
+- iptables:
+    chain: INPUT
+    rules:
+      - { protocol: tcp, destination_port: 22, jump: ACCEPT }
+      - { protocol: tcp, destination_port: 443, jump: ACCEPT }
+      - { source: 10.0.0.0/8, jump: DROP, state: absent }
+      - { table: nat, chain: PREROUTING, protocol: tcp, destination_port: 80, jump: REDIRECT, to_ports: 8600 }
+  become: yes
 '''
 
 
@@ -417,6 +461,248 @@ def set_chain_policy(iptables_path, module, params):
     module.run_command(cmd, check_rc=True)
 
 
+# Options that apply to the whole call and can not be set per item.
+BULK_EXCLUDED = ('rules', 'flush', 'policy', 'ip_version')
+
+# Scratch chains bulk_rules loads the desired rules into are named after a
+# random per-run token and start with a comment rule recording that token
+# and their creation time; only chains carrying both are ever removed.
+SCRATCH_RE = re.compile(r'^ansible-([0-9a-f]{8})-\d+$')
+SCRATCH_MARK_RE = re.compile(r'^-m comment --comment "?ansible-scratch:([0-9a-f]{8}):(\d+)"?$')
+# Age after which a scratch chain is known to be left over by a killed run
+SCRATCH_MAX_AGE = 3600
+
+
+def quote_argument(arg):
+    if arg and not [c for c in arg if c.isspace() or c in '"\'\\']:
+        return arg
+    return '"%s"' % arg.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def rule_line(tokens):
+    return ' '.join([quote_argument(t) for t in tokens])
+
+
+def read_tables(module, save_path, tables):
+    """Return {table: {chain: [rule line, ...]}} from iptables-save."""
+    result = {}
+    for table in tables:
+        cmd = [save_path, '-t', table]
+        rc, out, err = module.run_command(cmd, check_rc=True)
+        chains = {}
+        for line in out.splitlines():
+            if line.startswith(':'):
+                chains.setdefault(line[1:].split()[0], [])
+            elif line.startswith('-A '):
+                chain, rule = (line[3:].split(None, 1) + [''])[:2]
+                chains.setdefault(chain, []).append(rule)
+        result[table] = chains
+    return result
+
+
+def restore_tables(module, restore_path, tables, check_rc=True):
+    """Feed {table: [line, ...]} to iptables-restore --noflush at once."""
+    lines = []
+    for name in sorted(tables):
+        if tables[name]:
+            lines.append('*%s' % name)
+            lines.extend(tables[name])
+            lines.append('COMMIT')
+    if lines:
+        module.run_command(
+            [restore_path, '--noflush'],
+            data='\n'.join(lines) + '\n',
+            check_rc=check_rc)
+
+
+def validate_rule(module, item):
+    """Check a rules item against the argument spec and return its params."""
+    if not isinstance(item, dict):
+        module.fail_json(msg="Each item in rules must be a dictionary.")
+    spec = module.argument_spec
+    unknown = [k for k in item if k not in spec or k in BULK_EXCLUDED]
+    if unknown:
+        module.fail_json(
+            msg="Unsupported rule options: %s" % ', '.join(sorted(unknown)))
+    params = {}
+    for name, value in item.items():
+        if value is None:
+            params[name] = value
+            continue
+        if spec[name].get('type', 'str') == 'list':
+            if isinstance(value, basestring):
+                value = [x.strip() for x in value.split(',')]
+            elif isinstance(value, (int, float)):
+                value = [str(value)]
+            elif not isinstance(value, list):
+                module.fail_json(
+                    msg="Rule option %s must be a list." % name)
+            value = [str(x) for x in value]
+        else:
+            if isinstance(value, (int, float)) and \
+                    not isinstance(value, bool):
+                value = str(value)
+            elif not isinstance(value, basestring):
+                module.fail_json(
+                    msg="Rule option %s must be a string." % name)
+        choices = spec[name].get('choices')
+        if choices and value not in choices:
+            module.fail_json(
+                msg="Value of rule option %s must be one of: %s, got: %s" %
+                (name, ', '.join(choices), value))
+        params[name] = value
+    return params
+
+
+def is_stale_scratch(chain, rules):
+    """Tell whether chain is a scratch chain of an earlier run that was killed.
+
+    The chain name and its marker rule must carry the same token, and the
+    marker must be older than SCRATCH_MAX_AGE, so chains of runs still in
+    progress, possibly in another PID namespace, are left alone.
+    """
+    match = SCRATCH_RE.match(chain)
+    if not match or not rules:
+        return False
+    mark = SCRATCH_MARK_RE.match(rules[0])
+    return bool(mark) and mark.group(1) == match.group(1) and \
+        time.time() - int(mark.group(2)) > SCRATCH_MAX_AGE
+
+
+def bulk_rules(module, ip_version):
+    """Converge the C(rules) list with a few save and restore calls.
+
+    iptables-save prints rules in its own canonical form (numeric ICMP
+    types and ports, masked networks, ...), so the desired rules are first
+    loaded into scratch chains and read back from the kernel; the saved
+    text is then compared with the existing chains as is. In check mode
+    the kernel is not changed and each rule is looked up with 'iptables -C'
+    instead.
+    """
+    defaults = dict(module.params)
+    for name in BULK_EXCLUDED:
+        del defaults[name]
+    token = '%08x' % random.getrandbits(32)
+    mark = '-m comment --comment ansible-scratch:%s:%d' % (token, time.time())
+    items = []
+    for item in module.params['rules']:
+        params = dict(defaults)
+        params.update(validate_rule(module, item))
+        if params['chain'] is None:
+            module.fail_json(msg="Every item in rules requires a chain.")
+        params['tokens'] = construct_rule(params)
+        params['scratch'] = 'ansible-%s-%d' % (token, len(items))
+        params['saved'] = None
+        items.append(params)
+
+    iptables_path = module.get_bin_path(BINS[ip_version], True)
+    save_path = module.get_bin_path(SAVE_BINS[ip_version], True)
+    restore_path = module.get_bin_path(RESTORE_BINS[ip_version], True)
+    load = {}
+    cleanup = {}
+    for params in items:
+        load.setdefault(params['table'], []).insert(
+            0, ':%s - [0:0]' % params['scratch'])
+        load[params['table']].append(
+            '-A %s %s' % (params['scratch'], mark))
+        load[params['table']].append(
+            '-A %s %s' % (params['scratch'], rule_line(params['tokens'])))
+        cleanup.setdefault(params['table'], []).extend([
+            '-F %s' % params['scratch'],
+            '-X %s' % params['scratch']])
+
+    if module.check_mode:
+        saved = read_tables(module, save_path, load.keys())
+    else:
+        restore_tables(module, restore_path, load)
+        try:
+            saved = read_tables(module, save_path, load.keys())
+        finally:
+            restore_tables(module, restore_path, cleanup, check_rc=False)
+        for params in items:
+            # Drop the marker rule; a single rule may expand to several,
+            # e.g. for a list of sources.
+            params['saved'] = saved[params['table']].pop(params['scratch'], [])[1:]
+
+    tables = {}
+    changes = {}
+    reaped = []
+    for name, chains in saved.items():
+        tables[name] = dict(chains=chains, delete=[], insert=[], append=[])
+        # Scratch chains left behind by a run that was killed
+        for chain in list(chains):
+            if is_stale_scratch(chain, chains[chain]):
+                del chains[chain]
+                reaped.append(dict(table=name, chain=chain))
+                changes.setdefault(name, []).extend(
+                    ['-F %s' % chain, '-X %s' % chain])
+
+    results = []
+    changed = False
+    checked = {}
+    for params in items:
+        table = tables[params['table']]
+        chain = params['chain']
+        should_be_present = (params['state'] == 'present')
+        if chain not in table['chains']:
+            if should_be_present:
+                module.fail_json(
+                    msg="Chain %s does not exist in table %s." %
+                    (chain, params['table']))
+            entries = []
+        else:
+            entries = table['chains'][chain]
+
+        if params['saved'] is None:
+            key = (params['table'], chain, rule_line(params['tokens']))
+            if key not in checked:
+                checked[key] = bool(entries) and \
+                    check_present(iptables_path, module, params)
+            rule_is_present = checked[key]
+            checked[key] = should_be_present
+        else:
+            rule_is_present = bool(params['saved']) and \
+                not [r for r in params['saved'] if r not in entries]
+
+            if should_be_present and not rule_is_present:
+                line = rule_line(params['tokens'])
+                if params['action'] == 'insert':
+                    table['insert'].append((chain, line))
+                    entries[0:0] = params['saved']
+                else:
+                    table['append'].append((chain, line))
+                    entries.extend(params['saved'])
+            elif not should_be_present and rule_is_present:
+                # Remove a single occurrence, as 'iptables -D' would.
+                for rule in params['saved']:
+                    table['delete'].append((chain, rule))
+                    entries.remove(rule)
+        rule_changed = (rule_is_present != should_be_present)
+        changed = changed or rule_changed
+        results.append(dict(
+            changed=rule_changed,
+            table=params['table'],
+            chain=chain,
+            rule=' '.join(params['tokens']),
+            state=params['state'],
+        ))
+
+    if not module.check_mode:
+        for name, table in tables.items():
+            lines = changes.setdefault(name, [])
+            for chain, rule in table['delete']:
+                lines.append('-D %s %s' % (chain, rule))
+            positions = {}
+            for chain, rule in table['insert']:
+                positions[chain] = positions.get(chain, 0) + 1
+                lines.append('-I %s %d %s' % (chain, positions[chain], rule))
+            for chain, rule in table['append']:
+                lines.append('-A %s %s' % (chain, rule))
+        restore_tables(module, restore_path, changes)
+
+    return changed, results, reaped
+
+
 def main():
     module = AnsibleModule(
         supports_check_mode=True,
@@ -469,10 +755,13 @@ def main():
                 default=None,
                 type='str',
                 choices=['ACCEPT', 'DROP', 'QUEUE', 'RETURN']),
+            rules=dict(required=False, default=None, type='list'),
         ),
         mutually_exclusive=(
             ['set_dscp_mark', 'set_dscp_mark_class'],
             ['flush', 'policy'],
+            ['flush', 'rules'],
+            ['policy', 'rules'],
         ),
     )
     args = dict(
@@ -489,6 +778,12 @@ def main():
     ip_version = module.params['ip_version']
     iptables_path = module.get_bin_path(BINS[ip_version], True)
 
+    # Converge a list of rules in one transaction
+    if module.params['rules'] is not None:
+        args['changed'], args['rules'], args['reaped_chains'] = \
+            bulk_rules(module, ip_version)
+        module.exit_json(**args)
+
     # Check if chain option is required
     if args['flush'] is False and args['chain'] is None:
         module.fail_json(
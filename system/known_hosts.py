@@ -32,8 +32,8 @@ options:
   name:
     aliases: [ 'host' ]
     description:
-      - The host to add or remove (must match a host specified in key)
-    required: true
+      - The host to add or remove (must match a host specified in key). Required unless C(entries) is given.
+    required: false
     default: null
   key:
     description:
@@ -57,6 +57,16 @@ options:
     choices: [ "present", "absent" ]
     required: no
     default: present
+  entries:
+    description:
+      - A list of host keys to manage in one pass. Each item is a dictionary with C(name), C(key) and optionally
+        C(state) and C(hash_host), which default to the module parameters of the same name.
+      - The file is parsed once in-process (hashed C(|1|) host fields are matched with HMAC-SHA1 and
+        C(@cert-authority)/C(@revoked) markers are kept), every change is applied in memory and the result is
+        written back with a single atomic rewrite. C(ssh-keygen) is not used in this mode.
+    required: no
+    default: null
+    version_added: "2.3"
 requirements: [ ]
 author: "Matthew Vernon (@mcv21)"
 '''
@@ -67,6 +77,19 @@ EXAMPLES = '''
   known_hosts: path='/etc/ssh/ssh_known_hosts'
                name='foo.com.invalid'
                key="{{ lookup('file', 'pubkeys/foo.com.invalid') }}"
+
+# Manage many keys with a single read and a single rewrite of the file
+- name: tell the host about all of our servers
+  known_hosts:
+    path: /etc/ssh/ssh_known_hosts
+    hash_host: yes
+    entries:
+      - name: foo.com.invalid
+        key: "{{ lookup('file', 'pubkeys/foo.com.invalid') }}"
+      - name: bar.com.invalid
+        key: "{{ lookup('file', 'pubkeys/bar.com.invalid') }}"
+      - name: old.com.invalid
+        state: absent
 '''
 
 # Makes sure public host keys are present or absent in the given known_hosts
@@ -79,12 +102,23 @@ EXAMPLES = '''
 #    path = the known_hosts file to edit (default: ~/.ssh/known_hosts)
 #    hash_host = yes|no (default: no) hash the hostname in the known_hosts file
 #    state = absent|present (default: present)
+#    entries = list of dicts with name, key, state and hash_host, managed in
+#              a single pass without ssh-keygen
 
 import os
 import os.path
 import tempfile
 import errno
 import re
+import base64
+import struct
+import hmac
+
+try:
+    import hashlib
+    HAS_HASHLIB = True
+except ImportError:
+    HAS_HASHLIB = False
 from ansible.module_utils.pycompat24 import get_exception
 from ansible.module_utils.basic import *
 
@@ -273,10 +307,13 @@ def normalize_known_hosts_key(key):
     replaced by the provided host. Also, any spurious information gets removed
     from the end (like the username@host tag usually present in hostkeys, but
     absent in known_hosts files)
+    Returns None if the key has too few fields to be a known_hosts line.
     '''
     k=key.strip() #trim trailing newline
     k=key.split()
     d = dict()
+    if not k or len(k) < (k[0][0] == '@' and 4 or 3):
+        return None
     #The optional "marker" field, used for @cert-authority or @revoked
     if k[0][0] == '@':
         d['options'] = k[0]
@@ -289,20 +326,267 @@ def normalize_known_hosts_key(key):
         d['key']=k[2]
     return d
 
+def require_hashlib(module):
+    '''Fail if hashed hostnames cannot be computed (python 2.4 has no hashlib).'''
+    if not HAS_HASHLIB:
+        module.fail_json(msg="hashlib is required to match or write hashed known_hosts entries")
+
+def hash_hostname(host, salt=None):
+    '''Return the |1|salt|hash form of host, as written by ssh-keygen -H.'''
+    if salt is None:
+        salt = os.urandom(20)
+    digest = hmac.new(salt, host.encode('utf-8'), hashlib.sha1).digest()
+    return '|1|%s|%s' % (base64.b64encode(salt).decode('ascii'),
+                         base64.b64encode(digest).decode('ascii'))
+
+class KnownHostsFile(object):
+    '''
+    In-process view of a known_hosts file.
+
+    The file is read once; plain host patterns are indexed by name and
+    hashed entries by salt and digest, so looking up a host costs one
+    HMAC per distinct salt instead of an ssh-keygen run. Lines removed
+    from the file are kept as None so line numbers stay stable until
+    the whole file is written back by save().
+    '''
+
+    def __init__(self, module, path):
+        self.module = module
+        self.path = path
+        self.lines = []
+        self.by_name = {}
+        self.by_salt = {}
+        try:
+            inf = open(path, 'r')
+        except IOError:
+            e = get_exception()
+            if e.errno != errno.ENOENT:
+                module.fail_json(msg="Failed to read %s: %s" % (path, str(e)))
+        else:
+            try:
+                for line in inf:
+                    if not line.endswith('\n'):
+                        line += '\n'
+                    self.lines.append(line)
+                    self._index(len(self.lines) - 1)
+            finally:
+                inf.close()
+
+    def _index(self, lnum):
+        fields = self.lines[lnum].split()
+        if not fields or fields[0][0] == '#':
+            return
+        if fields[0][0] == '@':
+            fields = fields[1:]
+        if len(fields) < 3:
+            # Truncated lines are kept in the file but never matched
+            return
+        hosts = fields[0]
+        if hosts.startswith('|1|'):
+            try:
+                salt, digest = hosts[3:].split('|', 1)
+                salt = base64.b64decode(salt)
+                digest = base64.b64decode(digest)
+            except (ValueError, TypeError):
+                return
+            self.by_salt.setdefault(salt, {}).setdefault(digest, []).append(lnum)
+        else:
+            for pattern in hosts.split(','):
+                self.by_name.setdefault(pattern, []).append(lnum)
+
+    def find(self, host):
+        '''Return the line numbers (0-based) of the live entries for host.'''
+        found = list(self.by_name.get(host, []))
+        if self.by_salt:
+            require_hashlib(self.module)
+        name = host.encode('utf-8')
+        for salt, digests in self.by_salt.items():
+            mac = hmac.new(salt, name, hashlib.sha1)
+            found.extend(digests.get(mac.digest(), []))
+        # Entries may have been replaced since they were indexed
+        found = [lnum for lnum in set(found) if self._matches(lnum, host)]
+        found.sort()
+        return found
+
+    def _matches(self, lnum, host):
+        if self.lines[lnum] is None:
+            return False
+        k = self.entry(lnum)
+        if k is None:
+            return False
+        hosts = k['host']
+        if hosts.startswith('|1|'):
+            salt = base64.b64decode(hosts[3:].split('|', 1)[0])
+            return hash_hostname(host, salt) == hosts
+        return host in hosts.split(',')
+
+    def entry(self, lnum):
+        return normalize_known_hosts_key(self.lines[lnum])
+
+    def remove(self, lnum):
+        self.lines[lnum] = None
+
+    def replace(self, lnum, line):
+        self.lines[lnum] = line
+        self._index(lnum)
+
+    def add(self, line):
+        self.lines.append(line)
+        self._index(len(self.lines) - 1)
+
+    def save(self):
+        '''Atomically replace the file with the current lines.'''
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path))
+            outf = os.fdopen(fd, 'w')
+            try:
+                for line in self.lines:
+                    if line is not None:
+                        outf.write(line)
+            finally:
+                outf.close()
+            self.module.atomic_move(tmp_path, self.path)
+        except (IOError, OSError):
+            e = get_exception()
+            self.module.fail_json(msg="Failed to write to file %s: %s" % \
+                                      (self.path, str(e)))
+
+def same_key(a, b):
+    return a.get('options') == b.get('options') and \
+        a['type'] == b['type'] and a['key'] == b['key']
+
+def check_key(module, host, key):
+    '''
+    Check a supplied key line in-process, as sanity_check does with
+    ssh-keygen: it must have a host, key type and base64 key blob naming
+    the same key type, and its host field must match host.
+    '''
+    k = normalize_known_hosts_key(key)
+    if k is None:
+        module.fail_json(msg="Invalid key for %s: expected '[marker] host keytype key'" % host)
+    try:
+        blob = base64.b64decode(k['key'])
+    except (ValueError, TypeError):
+        blob = ''
+    # The blob starts with the key type as a length-prefixed string
+    keytype = k['type'].encode('utf-8')
+    if len(blob) < 4 or struct.unpack('>I', blob[:4])[0] != len(keytype) or \
+            blob[4:4 + len(keytype)] != keytype:
+        module.fail_json(msg="Invalid %s key for %s" % (k['type'], host))
+    if not host_in_key(module, host, k):
+        module.fail_json(msg="Host parameter %s does not match host field in supplied key" % host)
+
+def host_in_key(module, host, k):
+    '''Check that the host field of a normalized supplied key matches host.'''
+    if k['host'].startswith('|1|'):
+        require_hashlib(module)
+        salt = k['host'][3:].split('|', 1)[0]
+        try:
+            salt = base64.b64decode(salt)
+        except (ValueError, TypeError):
+            return False
+        return hash_hostname(host, salt) == k['host']
+    return host in k['host'].split(',')
+
+def replace_host_field(key, host_field):
+    '''Return the key line with its host field (after an optional marker) replaced.'''
+    fields = key.split(None, 1)
+    if fields[0].startswith('@'):
+        rest = fields[1].split(None, 1)
+        return '%s %s %s' % (fields[0], host_field, rest[1])
+    return '%s %s' % (host_field, fields[1])
+
+def enforce_entries(module, params):
+    '''
+    Apply every item of params['entries'] to one in-memory copy of the
+    known_hosts file and write it back once.
+    '''
+    path = params['path']
+    kh = KnownHostsFile(module, path)
+    results = []
+    changed = False
+
+    for item in params['entries']:
+        if not isinstance(item, dict):
+            module.fail_json(msg="Each item in entries must be a dictionary")
+        host = item.get('name', item.get('host'))
+        key = item.get('key')
+        state = item.get('state', params['state'])
+        hash_host = module.boolean(item.get('hash_host', params['hash_host']))
+        if not host:
+            module.fail_json(msg="Each item in entries requires a name")
+        if state not in ('present', 'absent'):
+            module.fail_json(msg="Invalid state '%s' for %s" % (state, host))
+        if key is None and state != 'absent':
+            module.fail_json(msg="No key specified when adding %s" % host)
+        if key and key[-1] != '\n':
+            key += '\n'
+        if key is not None:
+            check_key(module, host, key)
+
+        found = kh.find(host)
+        entry_changed = False
+        if key is None:
+            # Remove every key for the host, as ssh-keygen -R would
+            for lnum in found:
+                kh.remove(lnum)
+            entry_changed = bool(found)
+        else:
+            new_key = normalize_known_hosts_key(key)
+            same = [l for l in found if same_key(kh.entry(l), new_key)]
+            same_type = [l for l in found
+                         if kh.entry(l)['type'] == new_key['type'] and
+                         kh.entry(l).get('options') == new_key.get('options')]
+            if state == 'absent':
+                for lnum in same_type:
+                    kh.remove(lnum)
+                entry_changed = bool(same_type)
+            elif not same:
+                # Write the supplied line as given, aliases and comment
+                # included; only a plain host field gets hashed
+                line = key
+                if hash_host and not new_key['host'].startswith('|1|'):
+                    require_hashlib(module)
+                    host_field = hash_hostname(host)
+                    if same_type and kh.entry(same_type[0])['host'].startswith('|1|'):
+                        host_field = kh.entry(same_type[0])['host']
+                    line = replace_host_field(key, host_field)
+                if same_type:
+                    kh.replace(same_type[0], line)
+                else:
+                    kh.add(line)
+                entry_changed = True
+
+        changed = changed or entry_changed
+        results.append(dict(name=host, state=state, changed=entry_changed))
+
+    if changed and not module.check_mode:
+        kh.save()
+
+    params['changed'] = changed
+    params['entries'] = results
+    return params
+
 def main():
 
     module = AnsibleModule(
         argument_spec = dict(
-            name      = dict(required=True,  type='str', aliases=['host']),
+            name      = dict(required=False, type='str', aliases=['host']),
             key       = dict(required=False,  type='str'),
             path      = dict(default="~/.ssh/known_hosts", type='path'),
             hash_host = dict(required=False, type='bool' ,default=False),
             state     = dict(default='present', choices=['absent','present']),
+            entries   = dict(required=False, type='list'),
             ),
+        required_one_of = [['name', 'entries']],
+        mutually_exclusive = [['name', 'entries'], ['key', 'entries']],
         supports_check_mode = True
         )
 
-    results = enforce_state(module,module.params)
+    if module.params['entries'] is not None:
+        results = enforce_entries(module,module.params)
+    else:
+        results = enforce_state(module,module.params)
     module.exit_json(**results)
 
 main()
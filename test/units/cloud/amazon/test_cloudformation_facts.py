@@ -0,0 +1,58 @@
+import datetime
+import unittest
+
+from module_loader import load_module
+
+
+class FakeClient(object):
+    """ Returns stack events, most recent first, two per page like boto3 does """
+
+    def __init__(self, timestamps):
+        self.events = [{'EventId': str(i), 'Timestamp': ts} for i, ts in enumerate(timestamps)]
+        self.pages = 0
+
+    def describe_stack_events(self, StackName, NextToken=None):
+        self.pages += 1
+        start = int(NextToken or 0)
+        response = {'StackEvents': self.events[start:start + 2]}
+        if start + 2 < len(self.events):
+            response['NextToken'] = str(start + 2)
+        return response
+
+
+class TestSince(unittest.TestCase):
+
+    def setUp(self):
+        self.module = load_module('cloud/amazon/cloudformation_facts.py')
+        self.utc = self.module.FixedOffset(0)
+
+    def test_parse_since_without_offset_is_utc(self):
+        since = self.module.parse_since('2016-11-30T12:00:00')
+        self.assertEqual(since, datetime.datetime(2016, 11, 30, 12, 0, tzinfo=self.utc))
+
+    def test_parse_since_keeps_offset(self):
+        since = self.module.parse_since('2016-11-30T14:00:00+02:00')
+        self.assertEqual(since, datetime.datetime(2016, 11, 30, 12, 0, tzinfo=self.utc))
+
+    def test_parse_since_fraction_and_compact_offset(self):
+        since = self.module.parse_since('2016-11-30T07:00:00.25-0500')
+        self.assertEqual(since, datetime.datetime(2016, 11, 30, 12, 0, 0, 250000, tzinfo=self.utc))
+
+    def test_parse_since_epoch(self):
+        since = self.module.parse_since('1480507200')
+        self.assertEqual(since, datetime.datetime(2016, 11, 30, 12, 0, tzinfo=self.utc))
+
+    def test_parse_since_rejects_garbage(self):
+        self.assertRaises(ValueError, self.module.parse_since, 'yesterday')
+
+    def test_events_stop_at_naive_since(self):
+        timestamps = [datetime.datetime(2016, 11, 30, 12, minute, tzinfo=self.utc) for minute in (50, 40, 30, 20, 10, 0)]
+        manager = self.module.CloudFormationServiceManager.__new__(self.module.CloudFormationServiceManager)
+        manager.client = FakeClient(timestamps)
+        events = manager.describe_stack_events('stack', since=self.module.parse_since('2016-11-30 12:25:00'))
+        self.assertEqual([event['EventId'] for event in events], ['0', '1', '2'])
+        self.assertEqual(manager.client.pages, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import xml.sax
+
+from module_loader import load_module
+
+# Sample response of the DescribeTags API documentation, with a second ELB
+DESCRIBE_TAGS_RESPONSE = b'''<DescribeTagsResponse xmlns="http://elasticloadbalancing.amazonaws.com/doc/2012-06-01/">
+  <DescribeTagsResult>
+    <TagDescriptions>
+      <member>
+        <Tags>
+          <member>
+            <Value>my-test-project</Value>
+            <Key>project</Key>
+          </member>
+          <member>
+            <Value>test</Value>
+            <Key>department</Key>
+          </member>
+        </Tags>
+        <LoadBalancerName>my-test-loadbalancer</LoadBalancerName>
+      </member>
+      <member>
+        <LoadBalancerName>my-other-loadbalancer</LoadBalancerName>
+        <Tags>
+          <member>
+            <Key>empty</Key>
+            <Value></Value>
+          </member>
+        </Tags>
+      </member>
+    </TagDescriptions>
+  </DescribeTagsResult>
+  <ResponseMetadata>
+    <RequestId>07b1ecbc-1100-11e3-acaf-dd7edEXAMPLE</RequestId>
+  </ResponseMetadata>
+</DescribeTagsResponse>'''
+
+
+class FakeResultSet(list):
+    """ Collects the marked elements, as boto.resultset.ResultSet does """
+
+    def __init__(self, markers):
+        list.__init__(self)
+        self.markers = markers
+
+    def startElement(self, name, attrs, connection):
+        for marker, cls in self.markers:
+            if name == marker:
+                obj = cls(connection)
+                self.append(obj)
+                return obj
+        return None
+
+    def endElement(self, name, value, connection):
+        pass
+
+
+class FakeXmlHandler(xml.sax.ContentHandler):
+    """ Drives the element handlers the way boto.handler.XmlHandler does """
+
+    def __init__(self, root, connection):
+        xml.sax.ContentHandler.__init__(self)
+        self.connection = connection
+        self.nodes = [('root', root)]
+        self.current_text = ''
+
+    def startElement(self, name, attrs):
+        self.current_text = ''
+        node = self.nodes[-1][1].startElement(name, attrs, self.connection)
+        if node is not None:
+            self.nodes.append((name, node))
+
+    def endElement(self, name):
+        self.nodes[-1][1].endElement(name, self.current_text, self.connection)
+        if self.nodes[-1][0] == name:
+            self.nodes.pop()
+        self.current_text = ''
+
+    def characters(self, content):
+        self.current_text += content
+
+
+class FakeConnection(object):
+    """ Parses the canned response the way AWSQueryConnection.get_list does """
+
+    def __init__(self, body):
+        self.body = body
+        self.calls = []
+
+    def get_list(self, action, params, markers):
+        self.calls.append((action, params))
+        rs = FakeResultSet(markers)
+        xml.sax.parseString(self.body, FakeXmlHandler(rs, self))
+        return rs
+
+
+class TestDescribeTags(unittest.TestCase):
+
+    def setUp(self):
+        self.module = load_module('cloud/amazon/ec2_elb_facts.py')
+
+    def test_parse_describe_tags_response(self):
+        connection = FakeConnection(DESCRIBE_TAGS_RESPONSE)
+        descriptions = connection.get_list('DescribeTags', {},
+                                           [('member', self.module.ElbTagDescription)])
+        tags = dict((d.load_balancer_name, dict(d.tags)) for d in descriptions)
+        self.assertEqual(tags, {
+            'my-test-loadbalancer': {'project': 'my-test-project', 'department': 'test'},
+            'my-other-loadbalancer': {'empty': ''},
+        })
+
+    def test_get_tags_batches_names(self):
+        info = self.module.ElbInformation.__new__(self.module.ElbInformation)
+        info.connection = FakeConnection(DESCRIBE_TAGS_RESPONSE)
+        tags = info._get_tags(['my-test-loadbalancer', 'my-other-loadbalancer'])
+        self.assertEqual(tags['my-test-loadbalancer'], {'project': 'my-test-project', 'department': 'test'})
+        self.assertEqual(len(info.connection.calls), 1)
+        self.assertEqual(info.connection.calls[0][1], {
+            'LoadBalancerNames.member.1': 'my-test-loadbalancer',
+            'LoadBalancerNames.member.2': 'my-other-loadbalancer',
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the shared helpers next to this file importable from the test modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,26 @@
+import os
+import unittest
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+
+
+def load_module(path):
+    """
+    Import a module file of this repository, given relative to its root, by
+    its file name. The test is skipped when a dependency imported at the
+    module level, such as ansible, is missing.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    path = os.path.join(REPO_ROOT, path)
+    try:
+        try:
+            import importlib.util
+        except ImportError:
+            import imp
+            return imp.load_source(name, path)
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    except ImportError as e:
+        raise unittest.SkipTest('unable to import %s: %s' % (path, e))